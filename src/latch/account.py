@@ -8,8 +8,8 @@ except ImportError:
 
 from typing import Iterator, List, Literal, Optional, TypedDict, Union, overload
 
-import gql
 import graphql.language as l
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 from latch_sdk_gql.utils import _GqlJsonValue, _json_value, _name_node, _parse_selection
 from typing_extensions import Self, TypeAlias
@@ -99,7 +99,7 @@ class Account:
         Always makes a network request.
         """
         data: _Account = execute(
-            gql.gql("""
+            parse_document("""
             query AccountQuery($ownerId: BigInt!) {
                 accountInfo(id: $ownerId) {
                     catalogProjectsByOwnerId(
@@ -4,9 +4,9 @@ from dataclasses import dataclass
 from typing import List, Optional
 
 import click
-import gql
 
 from latch_cli.utils.path import normalize_path
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 pod_name_regex = re.compile(
@@ -96,7 +96,7 @@ def rename_current_execution(name: str):
         return
 
     execute(
-        gql.gql("""
+        parse_document("""
             mutation RenameExecution($argName: String!, $argToken: String!) {
                 renameExecutionByToken(input: {argToken: $argToken, argName: $argName}) {
                     clientMutationId
@@ -124,7 +124,7 @@ def add_execution_results(results: List[str]):
     ]
 
     execute(
-        gql.gql("""
+        parse_document("""
             mutation addExecutionResults(
                 $argToken: String!,
                 $argPaths: [String]!
@@ -146,7 +146,7 @@ def report_nextflow_used_storage(used_bytes: int):
         return
 
     execute(
-        gql.gql("""
+        parse_document("""
             mutation updateNextflowStorageSize(
                 $argToken: String!,
                 $argUsedStorageBytes: BigInt!
@@ -185,7 +185,7 @@ def get_execution_metadata(token: Optional[str] = None) -> ExecutionMetadata:
         )
 
     res = execute(
-        gql.gql(
+        parse_document(
             """
             query GetExecutionMetadata($token: String!) {
                 executionCreatorByToken(token: $token) {
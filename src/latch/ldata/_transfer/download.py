@@ -1,6 +1,7 @@
 import json
+import os
 import time
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from contextlib import closing
 from dataclasses import dataclass
 from itertools import repeat
@@ -14,7 +15,6 @@ from latch_cli.constants import Units
 from latch_cli.utils import get_auth_header, human_readable_time, with_si_suffix
 from latch_cli.utils.path import normalize_path
 from latch_sdk_config.latch import config as latch_config
-from latch_sdk_config.user import user_config
 
 from .manager import TransferStateManager
 from .node import get_node_data
@@ -43,45 +43,20 @@ class DownloadResult:
     total_time: float
 
 
-def download(
-    src: str,
-    dest: Path,
-    progress: Progress,
-    verbose: bool,
-    confirm_overwrite: bool = True,
-) -> DownloadResult:
-    if not dest.parent.exists():
-        raise ValueError(
-            f"invalid copy destination {dest}. Parent directory {dest.parent} does"
-            " not exist."
-        )
-
-    normalized = normalize_path(src)
-    data = get_node_data(src)
-    assert src in data.data
-    node_data = data.data[src]
-
-    can_have_children = node_data.type in {
-        LDataNodeType.account_root,
-        LDataNodeType.dir,
-        LDataNodeType.mount,
-        LDataNodeType.mount_gcp,
-        LDataNodeType.mount_azure,
-    }
-
-    if can_have_children:
-        endpoint = latch_config.api.data.get_signed_urls_recursive
-    else:
-        endpoint = latch_config.api.data.get_signed_url
-
-    egress_source: Optional[dict[str, str]] = None
-
+def get_egress_source() -> Optional[dict[str, str]]:
     try:
         pod_id = Path("/root/.latch/id").read_text("utf-8")
-        egress_source = {"pod_id": pod_id}
+        return {"pod_id": pod_id}
     except OSError:
-        pass
+        return None
 
+
+def request_signed_urls(
+    endpoint: str,
+    src: str,
+    normalized: str,
+    egress_source: Optional[dict[str, str]] = None,
+) -> Dict:
     res = http_session.post(
         endpoint,
         headers={"Authorization": get_auth_header()},
@@ -113,7 +88,41 @@ def download(
             )
         raise RuntimeError(f"{msg} with code {res.status_code}: {res.json()['error']}")
 
-    json_data = res.json()
+    return res.json()
+
+
+def download(
+    src: str,
+    dest: Path,
+    progress: Progress,
+    verbose: bool,
+    confirm_overwrite: bool = True,
+) -> DownloadResult:
+    if not dest.parent.exists():
+        raise ValueError(
+            f"invalid copy destination {dest}. Parent directory {dest.parent} does"
+            " not exist."
+        )
+
+    normalized = normalize_path(src)
+    data = get_node_data(src)
+    assert src in data.data
+    node_data = data.data[src]
+
+    can_have_children = node_data.type in {
+        LDataNodeType.account_root,
+        LDataNodeType.dir,
+        LDataNodeType.mount,
+        LDataNodeType.mount_gcp,
+        LDataNodeType.mount_azure,
+    }
+
+    if can_have_children:
+        endpoint = latch_config.api.data.get_signed_urls_recursive
+    else:
+        endpoint = latch_config.api.data.get_signed_url
+
+    json_data = request_signed_urls(endpoint, src, normalized, get_egress_source())
     if can_have_children:
         dir_data: GetSignedUrlsRecursiveData = json_data["data"]
 
@@ -258,3 +267,92 @@ def download_file(job: DownloadJob, progress_bars: ProgressBars) -> int:
                 )
 
         return int(total_bytes)
+
+
+@dataclass(frozen=True)
+class RemoteDownloadJob:
+    src: str
+    dest: Path
+
+
+def download_remote_file(
+    job: RemoteDownloadJob,
+    progress_bars: ProgressBars,
+    egress_source: Optional[dict[str, str]] = None,
+) -> int:
+    json_data = request_signed_urls(
+        latch_config.api.data.get_signed_url,
+        job.src,
+        normalize_path(job.src),
+        egress_source,
+    )
+    file_data: GetSignedUrlData = json_data["data"]
+
+    # do not clobber the existing file if the download fails
+    tmp = job.dest.with_name(f".{job.dest.name}.latch-partial")
+    try:
+        res = download_file(DownloadJob(file_data["url"], tmp), progress_bars)
+        os.replace(tmp, job.dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return res
+
+
+def download_jobs(
+    jobs: List[RemoteDownloadJob],
+    *,
+    progress: Progress,
+    verbose: bool = False,
+    cores: Optional[int] = None,
+) -> Dict[Path, BaseException]:
+    """Download many individual files in parallel.
+
+    A failed file does not stop the others from downloading.
+
+    Returns:
+        The error raised for each file that failed to download.
+    """
+    errors: Dict[Path, BaseException] = {}
+    num_files = len(jobs)
+    if num_files == 0:
+        return errors
+
+    if cores is None:
+        cores = get_max_workers()
+
+    if progress == Progress.none:
+        num_bars = 0
+        show_total_progress = False
+    elif progress == Progress.total:
+        num_bars = 0
+        show_total_progress = True
+    else:
+        num_bars = min(cores, num_files)
+        show_total_progress = True
+
+    egress_source = get_egress_source()
+
+    with TransferStateManager() as manager:
+        progress_bars: ProgressBars
+        with closing(
+            manager.ProgressBars(
+                num_bars, show_total_progress=show_total_progress, verbose=verbose
+            )
+        ) as progress_bars:
+            progress_bars.set_total(num_files, "Copying Files")
+
+            with ProcessPoolExecutor(max_workers=cores) as executor:
+                futs = {
+                    executor.submit(
+                        download_remote_file, job, progress_bars, egress_source
+                    ): job.dest
+                    for job in jobs
+                }
+
+                for fut in as_completed(futs):
+                    exc = fut.exception()
+                    if exc is not None:
+                        errors[futs[fut]] = exc
+
+    return errors
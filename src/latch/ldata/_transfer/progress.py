@@ -87,6 +87,13 @@ class ProgressBars:
         self.usage[key] = amount
         return amount
 
+    def fail_usage(self, key: str) -> bool:
+        # a failed key never reaches zero pending parts, returns true only for
+        # the first failure so the task bar is released once
+        first = self.usage.get(key, 0) >= 0
+        self.usage[key] = -1
+        return first
+
     def set_total(self, total: int, desc: Optional[str] = None):
         if self.total_bar is None:
             return
@@ -1,9 +1,9 @@
 from textwrap import dedent
 
-import gql
 from gql.transport.exceptions import TransportQueryError
 
 from latch.ldata.type import LatchPathError, LDataNodeType
+from latch_sdk_gql.documents import parse_document
 
 from .node import get_node_data
 from .utils import query_with_retry
@@ -33,7 +33,7 @@ def remote_copy(src: str, dst: str, create_parents: bool = False) -> None:
 
     try:
         query_with_retry(
-            gql.gql("""
+            parse_document("""
             mutation Copy(
                 $argSrcNode: BigInt!
                 $argDstParent: BigInt!
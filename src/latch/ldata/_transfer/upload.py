@@ -10,8 +10,8 @@ from dataclasses import dataclass
 from http.client import HTTPException
 from multiprocessing.managers import DictProxy, ListProxy
 from pathlib import Path
-from queue import Queue
-from typing import TYPE_CHECKING, List, Optional, TypedDict
+from queue import Empty, Queue
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sized, TypedDict
 
 from typing_extensions import TypeAlias
 
@@ -32,7 +32,7 @@ if TYPE_CHECKING:
     PathQueueType: TypeAlias = "Queue[Optional[Path]]"
     LatencyQueueType: TypeAlias = "Queue[Optional[float]]"
     PartsBySrcType: TypeAlias = DictProxy[Path, ListProxy["CompletedPart"]]
-    UploadInfoBySrcType: TypeAlias = DictProxy[Path, "StartUploadReturnType"]
+    VersionBySrcType: TypeAlias = DictProxy[Path, str]
 
 
 class StartUploadData(TypedDict):
@@ -53,6 +53,14 @@ class UploadResult:
     total_time: float
 
 
+def get_ingress_source() -> Optional[dict[str, str]]:
+    try:
+        pod_id = Path("/root/.latch/id").read_text("utf-8")
+        return {"pod_id": pod_id}
+    except OSError:
+        return None
+
+
 def upload(
     src: str,  # pathlib.Path strips trailing slashes but we want to keep them here as they determine cp behavior
     dest: str,
@@ -108,19 +116,10 @@ def upload(
         num_bars = cores
         show_total_progress = True
 
-    ingress_source: Optional[dict[str, str]] = None
-
-    try:
-        pod_id = Path("/root/.latch/id").read_text("utf-8")
-        ingress_source = {"pod_id": pod_id}
-    except OSError:
-        pass
+    ingress_source = get_ingress_source()
 
     with ProcessPoolExecutor(max_workers=cores) as exec:
         with TransferStateManager() as man:
-            parts_by_src: "PartsBySrcType" = man.dict()
-            upload_info_by_src: "UploadInfoBySrcType" = man.dict()
-
             if src_path.is_dir():
                 if dest_data.exists() and not src.endswith("/"):
                     normalized = urljoins(normalized, src_path.name)
@@ -128,10 +127,6 @@ def upload(
                 jobs: List[UploadJob] = []
                 total_bytes = 0
 
-                throttle: Throttle = man.Throttle()
-                latency_q: "LatencyQueueType" = man.Queue()
-                throttle_listener = exec.submit(throttler, throttle, latency_q)
-
                 for dir_path, _, file_names in os.walk(src_path, followlinks=True):
                     for file_name in file_names:
                         rel_path = Path(dir_path) / file_name
@@ -142,7 +137,6 @@ def upload(
                             print(f"WARNING: file {rel_path} not found, skipping...")
                             continue
 
-                        parts_by_src[rel_path] = man.list()
                         jobs.append(
                             UploadJob(
                                 rel_path,
@@ -154,85 +148,20 @@ def upload(
 
                 num_files = len(jobs)
 
-                url_generation_bar: ProgressBars
-                with closing(
-                    man.ProgressBars(0, show_total_progress=(progress != Progress.none))
-                ) as url_generation_bar:
-                    url_generation_bar.set_total(num_files, "Generating URLs")
-
-                    start_upload_futs: List[
-                        Future[Optional[StartUploadReturnType]]
-                    ] = []
-
-                    start = time.monotonic()
-                    for job in jobs:
-                        start_upload_futs.append(
-                            exec.submit(
-                                start_upload,
-                                job.src,
-                                job.dest,
-                                url_generation_bar,
-                                throttle,
-                                latency_q,
-                                chunk_size_mib,
-                                ingress_source,
-                            )
-                        )
-
-                    for fut in as_completed(start_upload_futs):
-                        res = fut.result()
-                        if res is not None:
-                            upload_info_by_src[res.src] = res
-
-                    latency_q.put(None)
-                    wait([throttle_listener])
-
-                chunk_upload_bars: ProgressBars
-                with closing(
-                    man.ProgressBars(
-                        min(num_bars, num_files),
-                        show_total_progress=show_total_progress,
-                        verbose=verbose,
-                    )
-                ) as chunk_upload_bars:
-                    chunk_upload_bars.set_total(num_files, "Uploading Files")
-
-                    # todo(ayush): async-ify
-                    chunk_futs: List[Future[CompletedPart]] = []
-                    for data in start_upload_futs:
-                        res = data.result()
-
-                        if res is None:
-                            chunk_upload_bars.update_total_progress(1)
-                            continue
-
-                        pbar_index = chunk_upload_bars.get_free_task_bar_index()
-                        chunk_upload_bars.set(
-                            pbar_index, res.src.stat().st_size, res.src.name
-                        )
-                        chunk_upload_bars.set_usage(str(res.src), res.part_count)
-
-                        for part_index, url in enumerate(res.urls):
-                            chunk_futs.append(
-                                exec.submit(
-                                    upload_file_chunk,
-                                    src=res.src,
-                                    url=url,
-                                    part_index=part_index,
-                                    part_size=res.part_size,
-                                    progress_bars=chunk_upload_bars,
-                                    pbar_index=pbar_index,
-                                    parts_by_source=parts_by_src,
-                                    upload_id=res.upload_id,
-                                    dest=res.dest,
-                                    ingress_source=ingress_source,
-                                )
-                            )
-
-                    for fut in as_completed(chunk_futs):
-                        exc = fut.exception()
-                        if exc is not None:
-                            raise exc
+                start = time.monotonic()
+                errors = upload_jobs(
+                    jobs,
+                    exec,
+                    man,
+                    num_bars=num_bars,
+                    show_progress=progress != Progress.none,
+                    show_total_progress=show_total_progress,
+                    verbose=verbose,
+                    chunk_size_mib=chunk_size_mib,
+                    ingress_source=ingress_source,
+                )
+                for exc in errors.values():
+                    raise exc
 
                 if progress != Progress.none:
                     print("\x1b[0GFinalizing uploads...")
@@ -298,6 +227,156 @@ def upload(
     return UploadResult(num_files, total_bytes, total_time)
 
 
+def upload_jobs(
+    jobs: Iterable[UploadJob],
+    exec: ProcessPoolExecutor,
+    man: TransferStateManager,
+    *,
+    num_bars: int,
+    show_progress: bool = True,
+    show_total_progress: bool = True,
+    verbose: bool = False,
+    chunk_size_mib: Optional[int] = None,
+    ingress_source: Optional[dict[str, str]] = None,
+    versions: Optional[Dict[Path, str]] = None,
+) -> Dict[Path, BaseException]:
+    """Upload many files, sending the parts of every file concurrently on `exec`.
+
+    `jobs` is consumed lazily and every file starts uploading as soon as it is
+    produced, so `jobs` can be a generator that is still discovering files. A
+    failed file does not stop the others from uploading.
+
+    If `versions` is given, the version ID of every non-empty file that was
+    uploaded is stored in it.
+
+    Returns:
+        The first error raised for each file that failed to upload.
+    """
+    errors: Dict[Path, BaseException] = {}
+
+    num_files: Optional[int] = None
+    if isinstance(jobs, Sized):
+        num_files = len(jobs)
+        if num_files == 0:
+            return errors
+
+        num_bars = min(num_bars, num_files)
+
+    parts_by_src: "PartsBySrcType" = man.dict()
+    version_by_src: "VersionBySrcType" = man.dict()
+
+    throttle: Throttle = man.Throttle()
+    latency_q: "LatencyQueueType" = man.Queue()
+    throttle_listener = exec.submit(throttler, throttle, latency_q)
+
+    url_generation_bar: ProgressBars
+    chunk_upload_bars: ProgressBars
+    with closing(
+        man.ProgressBars(0, show_total_progress=show_progress)
+    ) as url_generation_bar, closing(
+        man.ProgressBars(
+            num_bars, show_total_progress=show_total_progress, verbose=verbose
+        )
+    ) as chunk_upload_bars:
+        if num_files is not None:
+            url_generation_bar.set_total(num_files, "Generating URLs")
+            chunk_upload_bars.set_total(num_files, "Uploading Files")
+
+        start_upload_futs: Dict[Future[Optional[StartUploadReturnType]], Path] = {}
+        started: "Queue[Future[Optional[StartUploadReturnType]]]" = Queue()
+        chunk_futs: Dict[Future[CompletedPart], Path] = {}
+
+        def upload_parts(data: "Future[Optional[StartUploadReturnType]]") -> None:
+            exc = data.exception()
+            if exc is not None:
+                errors.setdefault(start_upload_futs[data], exc)
+                url_generation_bar.update_total_progress(1)
+                chunk_upload_bars.update_total_progress(1)
+                return
+
+            res = data.result()
+            if res is None:
+                chunk_upload_bars.update_total_progress(1)
+                return
+
+            pbar_index = chunk_upload_bars.get_free_task_bar_index()
+            chunk_upload_bars.set(pbar_index, res.src.stat().st_size, res.src.name)
+            chunk_upload_bars.set_usage(str(res.src), res.part_count)
+
+            for part_index, url in enumerate(res.urls):
+                fut = exec.submit(
+                    upload_file_chunk,
+                    src=res.src,
+                    url=url,
+                    part_index=part_index,
+                    part_size=res.part_size,
+                    progress_bars=chunk_upload_bars,
+                    pbar_index=pbar_index,
+                    parts_by_source=parts_by_src,
+                    upload_id=res.upload_id,
+                    dest=res.dest,
+                    ingress_source=ingress_source,
+                    version_by_source=version_by_src,
+                )
+                chunk_futs[fut] = res.src
+
+        try:
+            num_started = 0
+            num_handled = 0
+            for job in jobs:
+                num_started += 1
+                if num_files is None:
+                    url_generation_bar.set_total(num_started, "Generating URLs")
+                    chunk_upload_bars.set_total(num_started, "Uploading Files")
+
+                parts_by_src[job.src] = man.list()
+
+                fut = exec.submit(
+                    start_upload,
+                    job.src,
+                    job.dest,
+                    url_generation_bar,
+                    throttle,
+                    latency_q,
+                    chunk_size_mib,
+                    ingress_source,
+                )
+                start_upload_futs[fut] = job.src
+                fut.add_done_callback(started.put)
+
+                # send the parts of files whose URLs are ready without waiting for
+                # the rest of the jobs
+                while True:
+                    try:
+                        data = started.get_nowait()
+                    except Empty:
+                        break
+
+                    upload_parts(data)
+                    num_handled += 1
+
+            while num_handled < num_started:
+                upload_parts(started.get())
+                num_handled += 1
+        finally:
+            latency_q.put(None)
+            wait([throttle_listener])
+
+        for fut in as_completed(chunk_futs):
+            exc = fut.exception()
+            if exc is not None:
+                errors.setdefault(chunk_futs[fut], exc)
+
+    if versions is not None:
+        versions.update(
+            (src, version)
+            for src, version in version_by_src.items()
+            if src not in errors
+        )
+
+    return errors
+
+
 @dataclass(frozen=True)
 class StartUploadReturnType:
     upload_id: str
@@ -416,6 +495,7 @@ def upload_file_chunk(
     upload_id: Optional[str] = None,
     dest: Optional[str] = None,
     ingress_source: Optional[dict[str, str]] = None,
+    version_by_source: Optional["VersionBySrcType"] = None,
 ) -> CompletedPart:
     # todo(ayush): proper exception handling that aborts everything
     try:
@@ -456,16 +536,18 @@ def upload_file_chunk(
                     and parts_by_source is not None
                     and upload_id is not None
                 ):
-                    end_upload(
+                    version = end_upload(
                         dest=dest,
                         upload_id=upload_id,
                         parts=list(parts_by_source[src]),
                         ingress_source=ingress_source,
                     )
+                    if version_by_source is not None and version is not None:
+                        version_by_source[src] = version
 
         return ret
     except:
-        if progress_bars is not None:
+        if progress_bars is not None and progress_bars.fail_usage(str(src)):
             progress_bars.return_task_bar(pbar_index)
 
         raise
@@ -477,7 +559,9 @@ def end_upload(
     parts: List[CompletedPart],
     progress_bars: Optional[ProgressBars] = None,
     ingress_source: Optional[dict[str, str]] = None,
-):
+) -> Optional[str]:
+    """Complete a multipart upload and return the version ID of the new object."""
+
     res = http_session.post(
         latch_config.api.data.end_upload,
         headers={"Authorization": get_auth_header()},
@@ -511,6 +595,9 @@ def end_upload(
     if progress_bars is not None:
         progress_bars.update_total_progress(1)
 
+    data = res.json().get("data")
+    return None if data is None else data.get("version_id")
+
 
 def throttler(t: Throttle, q: "LatencyQueueType"):
     ema = 0
@@ -1,13 +1,16 @@
+import asyncio
 import os
 import time
 from typing import Any, Dict, Optional
+from urllib.parse import urlparse
 
 import requests
 import requests.adapters
 from gql.transport.exceptions import TransportClosed, TransportServerError
 from graphql.language import DocumentNode
+from latch_cli import tracing
 from latch_sdk_gql import JsonValue
-from latch_sdk_gql.execute import execute
+from latch_sdk_gql.execute import execute, execute_async
 
 http_session = requests.Session()
 
@@ -22,6 +25,25 @@ http_session.mount("https://", _adapter)
 http_session.mount("http://", _adapter)
 
 
+def _trace_response(res: requests.Response, *args: Any, **kwargs: Any) -> None:
+    if not tracing.enabled():
+        return
+
+    body = res.request.body
+    nbytes = len(body) if isinstance(body, (bytes, str)) else 0
+    nbytes += int(res.headers.get("Content-Length", 0))
+
+    tracing.record(
+        f"transfer {res.request.method} {urlparse(res.url).hostname}",
+        res.elapsed.total_seconds(),
+        nbytes=nbytes,
+        error=not res.ok,
+    )
+
+
+http_session.hooks["response"].append(_trace_response)
+
+
 # todo(rahul): move this function into latch_sdk_gql.execute
 def query_with_retry(
     document: DocumentNode,
@@ -53,6 +75,34 @@ def query_with_retry(
     raise RuntimeError("gql retries exceeded")
 
 
+async def query_with_retry_async(
+    document: DocumentNode,
+    variables: Optional[Dict[str, JsonValue]] = None,
+    *,
+    num_retries: int = 3,
+) -> Dict[str, Any]:
+    """
+    Asynchronous version of `query_with_retry`
+    """
+    err = None
+    attempt = 0
+    while attempt < num_retries:
+        attempt += 1
+        try:
+            data = await execute_async(document, variables)
+            return data
+        except (TransportServerError, TransportClosed) as e:
+            err = e
+
+        if attempt < num_retries:
+            await asyncio.sleep(2**attempt * 5)
+
+    if err is not None:
+        raise err
+
+    raise RuntimeError("gql retries exceeded")
+
+
 def get_max_workers() -> int:
     return 4
 
@@ -6,9 +6,8 @@ import warnings
 from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Type
+from typing import Any, Dict, Optional, Type
 
-import gql
 import xattr
 from flytekit import (
     Blob,
@@ -24,10 +23,11 @@ from latch_persistence import LatchPersistence
 
 from latch.ldata.type import LatchPathError, LDataNodeType
 from latch_cli.utils import urljoins
+from latch_sdk_gql.documents import parse_document
 
 from ._transfer.node import get_node_data as _get_node_data
 from ._transfer.remote_copy import remote_copy as _remote_copy
-from ._transfer.utils import query_with_retry
+from ._transfer.utils import query_with_retry, query_with_retry_async
 
 node_id_regex = re.compile(r"^latch://(?P<id>[0-9]+)\.node$")
 
@@ -42,6 +42,25 @@ _dir_types = {
 
 _download_idx = 0
 
+_get_node_metadata_query = parse_document("""
+query GetNodeData($path: String!) {
+    ldataResolvePathToNode(path: $path) {
+        path
+        ldataNode {
+            finalLinkTarget {
+                id
+                name
+                type
+                ldataObjectMeta {
+                    contentSize
+                    contentType
+                    versionId
+                }
+            }
+        }
+    }
+}""")
+
 
 @dataclass
 class _Cache:
@@ -93,28 +112,20 @@ class LPath:
 
         Always makes a network request.
         """
-        data = query_with_retry(
-            gql.gql("""
-            query GetNodeData($path: String!) {
-                ldataResolvePathToNode(path: $path) {
-                    path
-                    ldataNode {
-                        finalLinkTarget {
-                            id
-                            name
-                            type
-                            ldataObjectMeta {
-                                contentSize
-                                contentType
-                                versionId
-                            }
-                        }
-                    }
-                }
-            }"""),
-            {"path": self.path},
-        )["ldataResolvePathToNode"]
+        data = query_with_retry(_get_node_metadata_query, {"path": self.path})
+        self._set_metadata(data["ldataResolvePathToNode"])
+
+    async def fetch_metadata_async(self) -> None:
+        """Asynchronous version of :meth:`fetch_metadata`.
+
+        Always makes a network request.
+        """
+        data = await query_with_retry_async(
+            _get_node_metadata_query, {"path": self.path}
+        )
+        self._set_metadata(data["ldataResolvePathToNode"])
 
+    def _set_metadata(self, data: Optional[Dict[str, Any]]) -> None:
         if (
             data is None
             or data["ldataNode"] is None
@@ -183,7 +194,7 @@ class LPath:
 
         if self._cache.dir_size is None and load_if_missing:
             data = query_with_retry(
-                gql.gql("""
+                parse_document("""
                 query GetLDataSubtreeSize($nodeId: BigInt!) {
                     ldataGetSubtreeSizeRecursive(argNodeId: $nodeId)
                 }
@@ -221,7 +232,7 @@ class LPath:
         Always makes a network request.
         """
         data = query_with_retry(
-            gql.gql("""
+            parse_document("""
             query LDataChildren($argPath: String!) {
                 ldataResolvePathData(argPath: $argPath) {
                     finalLinkTarget {
@@ -257,7 +268,7 @@ class LPath:
         path = f"latch://{node.id}.node/{node.remaining}"
         path += "/" if not path.endswith("/") else ""
         query_with_retry(
-            gql.gql("""
+            parse_document("""
             mutation LDataMkdirP($path: String!) {
                 ldataMkdirp(input: { argPath: $path }) {
                     bigInt
@@ -276,7 +287,7 @@ class LPath:
         Always makes a network request.
         """
         query_with_retry(
-            gql.gql("""
+            parse_document("""
             mutation LDataRmr($nodeId: BigInt!) {
                 ldataRmr(input: { argNodeId: $nodeId }) {
                     clientMutationId
@@ -2,8 +2,8 @@ from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Iterator, List, Literal, Optional, TypedDict, Union, overload
 
-import gql
 import graphql.language as l
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 from latch_sdk_gql.utils import _GqlJsonValue, _json_value, _name_node, _parse_selection
 from typing_extensions import TypeAlias
@@ -52,7 +52,7 @@ class Project:
         Always makes a network request.
         """
         data = execute(
-            document=gql.gql("""
+            document=parse_document("""
                 query ProjectQuery($id: BigInt!) {
                     catalogProject(id: $id) {
                         id
@@ -1,10 +1,11 @@
 from __future__ import annotations  # avoid circular type imports
 
 import datetime
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import (
     TYPE_CHECKING,
     Dict,
+    Iterable,
     List,
     Literal,
     Optional,
@@ -14,11 +15,12 @@ from typing import (
 )
 
 import dateutil.parser as dp
-import gql
+from graphql import DocumentNode
 
 from latch.registry.upstream_types.types import DBType
 from latch.registry.upstream_types.values import DBValue
 from latch.utils import NotFoundError, current_workspace
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 if TYPE_CHECKING:  # avoid circular type imports
@@ -83,6 +85,62 @@ class _CatalogSample(TypedDict):
     catalogSampleColumnDataBySampleId: _ColumnDataConnection
 
 
+_sample_selection = """
+    id
+    name
+    creationTime
+    catalogEventsBySampleId(orderBy: TIME_DESC, first: 1) {
+        nodes {
+            time
+        }
+    }
+    catalogSampleColumnDataBySampleId {
+        nodes {
+            key
+            data
+        }
+    }
+    experiment {
+        id
+    }
+"""
+
+_experiment_selection = """
+    id
+    catalogExperimentColumnDefinitionsByExperimentId {
+        nodes {
+            type
+            key
+            def
+        }
+    }
+"""
+
+
+def _aliased_query(name: str, field: str, selection: str, count: int) -> DocumentNode:
+    """Query `field(id: $r{i})` aliased as `r{i}` for each `i < count`."""
+
+    var_defs = ", ".join(f"$r{i}: BigInt!" for i in range(count))
+    selections = "\n".join(
+        f"r{i}: {field}(id: $r{i}) {{ {selection} }}" for i in range(count)
+    )
+
+    # only depends on `count` so the parsed document is usually cached
+    return parse_document(f"query {name}({var_defs}) {{ {selections} }}")
+
+
+def _columns(nodes: List[_ColumnDefinition]) -> Dict[str, Column]:
+    # avoid circular type imports
+    from latch.registry.types import Column
+    from latch.registry.utils import to_python_type
+
+    # fixme(maximsmol): deal with defaults
+    return {
+        n["key"]: Column(n["key"], to_python_type(n["type"]["type"]), n["type"])
+        for n in nodes
+    }
+
+
 @dataclass
 class _Cache:
     """Internal cache class to organize information for a `Record`."""
@@ -120,12 +178,8 @@ class Record:
 
         Always makes a network request.
         """
-        # avoid circular type imports
-        from latch.registry.types import Column, InvalidValue
-        from latch.registry.utils import to_python_literal, to_python_type
-
         data: _CatalogSample = execute(
-            gql.gql("""
+            parse_document("""
             query RecordQuery($id: BigInt!) {
                 catalogSample(id: $id) {
                     id
@@ -163,6 +217,16 @@ class Record:
                 f"record does not exist or you lack permissions: id={self.id}"
             )
 
+        typeNodes = data["experiment"][
+            "catalogExperimentColumnDefinitionsByExperimentId"
+        ]["nodes"]
+        self._populate(data, _columns(typeNodes))
+
+    def _populate(self, data: _CatalogSample, columns: Dict[str, Column]) -> None:
+        # avoid circular type imports
+        from latch.registry.types import InvalidValue
+        from latch.registry.utils import to_python_literal
+
         self._cache.table_id = data["experiment"]["id"]
         self._cache.name = data["name"]
         self._cache.creation_time = dp.isoparse(data["creationTime"])
@@ -172,14 +236,7 @@ class Record:
         if len(events) > 0:
             self._cache.last_updated = dp.isoparse(events[0]["time"])
 
-        typeNodes = data["experiment"][
-            "catalogExperimentColumnDefinitionsByExperimentId"
-        ]["nodes"]
-        # fixme(maximsmol): deal with defaults
-        self._cache.columns = {
-            n["key"]: Column(n["key"], to_python_type(n["type"]["type"]), n["type"])
-            for n in typeNodes
-        }
+        self._cache.columns = columns
 
         valNodes = data["catalogSampleColumnDataBySampleId"]["nodes"]
         colVals = {n["key"]: n["data"] for n in valNodes}
@@ -205,6 +262,82 @@ class Record:
 
         self._cache.values = vals
 
+    @staticmethod
+    def load_many(records: Iterable[Record], *, batch_size: int = 100) -> None:
+        """(Re-)populate the caches of many records with a few network requests.
+
+        Equivalent to calling :meth:`load` on every record. Records are fetched
+        `batch_size` at a time with one aliased query per batch, plus one query
+        per batch for the column definitions of the tables involved.
+
+        Record instances with the same :attr:`id` share the loaded values.
+
+        Args:
+            records: Records to load.
+            batch_size: Maximum number of records fetched per request.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        by_id: Dict[str, List[Record]] = {}
+        for r in records:
+            by_id.setdefault(r.id, []).append(r)
+
+        ids = list(by_id.keys())
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i : i + batch_size]
+
+            res = execute(
+                _aliased_query(
+                    "RecordsQuery", "catalogSample", _sample_selection, len(batch)
+                ),
+                {f"r{j}": id for j, id in enumerate(batch)},
+            )
+
+            samples: List[_CatalogSample] = []
+            for j, id in enumerate(batch):
+                data = res[f"r{j}"]
+                if data is None:
+                    raise RecordNotFoundError(
+                        f"record does not exist or you lack permissions: id={id}"
+                    )
+
+                samples.append(data)
+
+            table_ids = list(dict.fromkeys(x["experiment"]["id"] for x in samples))
+            table_res = execute(
+                _aliased_query(
+                    "TableColumnsQuery",
+                    "catalogExperiment",
+                    _experiment_selection,
+                    len(table_ids),
+                ),
+                {f"r{j}": id for j, id in enumerate(table_ids)},
+            )
+
+            columns: Dict[str, Dict[str, Column]] = {}
+            for j, table_id in enumerate(table_ids):
+                table = table_res[f"r{j}"]
+                if table is None:
+                    raise NotFoundError(
+                        f"table does not exist or you lack permissions: id={table_id}"
+                    )
+
+                columns[table_id] = _columns(
+                    table["catalogExperimentColumnDefinitionsByExperimentId"]["nodes"]
+                )
+
+            for id, data in zip(batch, samples):
+                first, *rest = by_id[id]
+                first._populate(data, columns[data["experiment"]["id"]])
+
+                for r in rest:
+                    r._share_cache(first)
+
+    def _share_cache(self, other: Record) -> None:
+        for f in fields(_Cache):
+            setattr(self._cache, f.name, getattr(other._cache, f.name))
+
     # get_table_id
 
     @overload
@@ -0,0 +1,341 @@
+"""Persistent local snapshots of Registry tables.
+
+A snapshot is a SQLite database under `~/.latch/registry/<table_id>/` holding
+the raw values of every record in a table. Syncing only downloads records
+updated since the previous sync, and reads never make network requests.
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import dateutil.parser as dp
+from typing_extensions import Self, TypeAlias
+
+from latch.registry.record import Record
+from latch.registry.table import (
+    Table,
+    TableNotFoundError,
+    _AllRecordsNode,
+    _column,
+    _column_converters,
+    _list_records_keyset_query,
+    _sample_filter,
+)
+from latch.registry.types import Column, RecordFilter
+from latch.registry.upstream_types.values import DBValue
+from latch_sdk_config.user import user_config
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute
+
+# updates committed around the time of a sync can carry timestamps slightly
+# older than the newest update seen by that sync so re-fetch a short window
+_watermark_overlap = timedelta(minutes=5)
+
+_record_ids_query = parse_document("""
+    query TableRecordIds($id: BigInt!, $first: Int!, $after: Cursor) {
+        catalogExperiment(id: $id) {
+            catalogSamplesByExperimentId(
+                condition: { removed: false }
+                orderBy: PRIMARY_KEY_ASC
+                first: $first
+                after: $after
+            ) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                nodes {
+                    id
+                }
+            }
+        }
+    }
+""")
+
+_schema = """
+    create table if not exists meta (
+        key text primary key,
+        value text not null
+    );
+    create table if not exists records (
+        id text primary key,
+        name text not null,
+        creation_time text not null,
+        last_updated text,
+        cells text not null
+    );
+    create index if not exists records_name on records (name);
+"""
+
+# id, name, creation time, last update time, JSON list of (column key, value)
+_Row: TypeAlias = Tuple[str, str, str, Optional[str], str]
+
+
+def default_snapshot_path(table_id: str) -> Path:
+    return user_config.root / "registry" / table_id / "snapshot.sqlite"
+
+
+def _rows(nodes: List[_AllRecordsNode]) -> List[_Row]:
+    # there is one node per (record, column) pair
+    meta: Dict[str, Tuple[str, str, Optional[str]]] = {}
+    cells: Dict[str, List[Tuple[str, DBValue]]] = {}
+    for node in nodes:
+        if node["id"] not in meta:
+            meta[node["id"]] = (node["name"], node["creationTime"], node["lastUpdated"])
+            cells[node["id"]] = []
+
+        if node["key"] is not None:
+            cells[node["id"]].append((node["key"], node["data"]))
+
+    return [(id, *meta[id], json.dumps(cells[id])) for id in meta]
+
+
+def _nodes(rows: Sequence[_Row]) -> List[_AllRecordsNode]:
+    res: List[_AllRecordsNode] = []
+    for id, name, creation_time, last_updated, cells_json in rows:
+        cells = json.loads(cells_json)
+        if len(cells) == 0:
+            # keep records without any values
+            cells = [(None, None)]
+
+        res.extend(
+            {
+                "id": id,
+                "name": name,
+                "creationTime": creation_time,
+                "lastUpdated": last_updated,
+                "key": key,
+                "data": data,
+            }
+            for key, data in cells
+        )
+
+    return res
+
+
+class TableSnapshot:
+    """Local copy of a Registry :class:`~latch.registry.table.Table`.
+
+    :meth:`Table.sync_snapshot <latch.registry.table.Table.sync_snapshot>` is
+    the typical way to get a :class:`TableSnapshot`.
+
+    Args:
+        table: Table to mirror.
+        path:
+            SQLite database to store the snapshot in. Defaults to
+            `~/.latch/registry/<table_id>/snapshot.sqlite`.
+    """
+
+    def __init__(self, table: Table, *, path: Optional[Path] = None):
+        self.table = table
+        self.path = path if path is not None else default_snapshot_path(table.id)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # let other processes read the previous snapshot while syncing
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.executescript(_schema)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("select value from meta where key = ?", (key,))
+        res = row.fetchone()
+        return None if res is None else res[0]
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "insert or replace into meta (key, value) values (?, ?)", (key, value)
+        )
+
+    def get_watermark(self) -> Optional[datetime]:
+        """Get the time of the newest record update included in the snapshot.
+
+        Returns:
+            Watermark of the snapshot or `None` if it was never synced.
+        """
+        res = self._get_meta("watermark")
+        return None if res is None else dp.isoparse(res)
+
+    def get_last_synced(self) -> Optional[datetime]:
+        """Get the time of the last successful :meth:`sync`.
+
+        Returns:
+            Time of the last sync or `None` if the snapshot was never synced.
+        """
+        res = self._get_meta("last_synced")
+        return None if res is None else dp.isoparse(res)
+
+    def get_columns(self) -> Dict[str, Column]:
+        """Get the columns of the table at the time of the last :meth:`sync`.
+
+        Returns:
+            Mapping between column keys and :class:`columns <latch.registry.types.Column>`.
+        """
+        res = self._get_meta("columns")
+        if res is None:
+            raise ValueError(
+                f"snapshot of table {self.table.id} has never been synced: {self.path}"
+            )
+
+        return {k: _column(k, t) for k, t in json.loads(res).items()}
+
+    def sync(self, *, page_size: int = 1000, full: bool = False) -> int:
+        """Download records updated since the last sync.
+
+        Records deleted from the table are removed from the snapshot. All
+        records are re-downloaded on the first sync, if `full` is set, or if
+        the column definitions changed since the last sync.
+
+        The snapshot is updated in one transaction so concurrent readers see
+        either the previous or the new snapshot.
+
+        Args:
+            page_size: Number of records requested per page.
+            full: If true, discard the snapshot and download every record.
+
+        Returns:
+            Number of records downloaded.
+        """
+        started = datetime.now(timezone.utc)
+
+        self.table.load()
+        cols = self.table.get_columns()
+        cols_json = json.dumps(
+            {k: c.upstream_type for k, c in cols.items()}, sort_keys=True
+        )
+
+        watermark = self.get_watermark()
+        if full or cols_json != self._get_meta("columns"):
+            watermark = None
+
+        if watermark is None:
+            query = _list_records_keyset_query()
+        else:
+            where = RecordFilter(updated_after=watermark - _watermark_overlap)
+            query = _list_records_keyset_query(_sample_filter(where, cols))
+
+        num_records = 0
+        newest = watermark
+        with self._conn:
+            if watermark is None:
+                self._conn.execute("delete from records")
+
+            for nodes in self.table._list_record_nodes_keyset(page_size, query=query):
+                rows = _rows(nodes)
+                self._conn.executemany(
+                    "insert or replace into records values (?, ?, ?, ?, ?)", rows
+                )
+                num_records += len(rows)
+
+                for _, _, creation_time, last_updated, _ in rows:
+                    cur = dp.isoparse(
+                        last_updated if last_updated is not None else creation_time
+                    )
+                    if newest is None or cur > newest:
+                        newest = cur
+
+            if watermark is not None:
+                self._delete_removed(page_size)
+
+            self._set_meta("columns", cols_json)
+            self._set_meta("last_synced", started.isoformat())
+            if newest is not None:
+                self._set_meta("watermark", newest.isoformat())
+
+        return num_records
+
+    def _delete_removed(self, page_size: int) -> None:
+        # deletions leave no trace in the update times so compare the full ID
+        # list, which is much smaller than the values
+        live: Set[str] = set()
+
+        cursor: Optional[str] = None
+        while True:
+            data = execute(
+                _record_ids_query,
+                {"id": self.table.id, "first": max(page_size, 10000), "after": cursor},
+            )["catalogExperiment"]
+            if data is None:
+                raise TableNotFoundError(
+                    f"table does not exist or you lack permissions: id={self.table.id}"
+                )
+
+            conn = data["catalogSamplesByExperimentId"]
+            live.update(str(x["id"]) for x in conn["nodes"])
+
+            if not conn["pageInfo"]["hasNextPage"]:
+                break
+
+            cursor = conn["pageInfo"]["endCursor"]
+
+        local = [row[0] for row in self._conn.execute("select id from records")]
+        self._conn.executemany(
+            "delete from records where id = ?", ((x,) for x in local if x not in live)
+        )
+
+    def __len__(self) -> int:
+        return self._conn.execute("select count(*) from records").fetchone()[0]
+
+    def list_records(self, *, page_size: int = 1000) -> Iterator[Dict[str, Record]]:
+        """List the records in the snapshot. Makes no network requests.
+
+        Args:
+            page_size:
+                Maximum size of a page of records. The last page may be shorter
+                than this value.
+
+        Yields:
+            Pages of records. Each page is a mapping between record IDs and
+            :class:`records <latch.registry.record.Record>`.
+        """
+        cols = self.get_columns()
+        converters = _column_converters(cols)
+
+        rows = self._conn.execute(
+            "select id, name, creation_time, last_updated, cells from records"
+            " order by cast(id as integer)"
+        )
+        while True:
+            page: List[_Row] = rows.fetchmany(page_size)
+            if len(page) == 0:
+                break
+
+            yield self.table._parse_records_page(_nodes(page), cols, converters)
+
+    def get_record(self, name: str) -> Optional[Record]:
+        """Get a record from the snapshot by name. Makes no network requests.
+
+        Args:
+            name: Name of the record.
+
+        Returns:
+            The record or `None` if the snapshot has no record with this name.
+        """
+        cols = self.get_columns()
+
+        rows: List[_Row] = self._conn.execute(
+            "select id, name, creation_time, last_updated, cells from records"
+            " where name = ?",
+            (name,),
+        ).fetchall()
+        if len(rows) == 0:
+            return None
+
+        page = self.table._parse_records_page(
+            _nodes(rows), cols, _column_converters(cols)
+        )
+        return next(iter(page.values()))
+
+    def __repr__(self):
+        return f"TableSnapshot(table={self.table.id}, path={self.path})"
@@ -1,10 +1,22 @@
+import asyncio
+import csv
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
 from inspect import isclass
+from math import isnan, nan
+from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
     Dict,
+    Iterable,
     Iterator,
     List,
     Literal,
@@ -12,6 +24,7 @@ from typing import (
     Tuple,
     Type,
     TypedDict,
+    TypeVar,
     Union,
     cast,
     get_args,
@@ -20,16 +33,17 @@ from typing import (
 )
 
 import dateutil.parser as dp
-import gql
 import gql.transport.exceptions
 import graphql.language as l
 from typing_extensions import TypeAlias
 
+from latch.ldata.path import LPath
 from latch.registry.record import NoSuchColumnError, Record
 from latch.registry.types import (
     Column,
     InvalidValue,
     LinkedRecordType,
+    RecordFilter,
     RecordValue,
     RegistryEnumDefinition,
     RegistryPythonType,
@@ -38,16 +52,19 @@ from latch.registry.types import (
 from latch.registry.upstream_types.types import DBType, RegistryType
 from latch.registry.upstream_types.values import DBValue, EmptyCell, UnresolvedBlobValue
 from latch.registry.utils import (
+    Converter,
     RegistryTransformerException,
     _get_unresolved_blobs_in_update,
-    to_python_literal,
+    to_python_literal_converter,
     to_python_type,
     to_registry_literal,
+    to_registry_literal_converter,
 )
 from latch.types.directory import LatchDir
 from latch.types.file import LatchFile
 from latch.utils import NotFoundError
-from latch_sdk_gql.execute import execute
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute, execute_async
 from latch_sdk_gql.utils import (
     _GqlJsonValue,
     _json_value,
@@ -59,6 +76,11 @@ from latch_sdk_gql.utils import (
 
 from ..types.json import JsonValue
 
+if TYPE_CHECKING:  # avoid circular type imports
+    from latch.registry.snapshot import TableSnapshot
+
+T = TypeVar("T")
+
 
 class _AllRecordsNode(TypedDict):
     id: str
@@ -92,6 +114,380 @@ class _Cache:
 class TableNotFoundError(NotFoundError): ...
 
 
+def _column(key: str, db_type: DBType) -> Column:
+    py_type = to_python_type(db_type["type"])
+    if db_type["allowEmpty"]:
+        py_type = Union[py_type, EmptyCell]
+
+    return Column(key, py_type, db_type)
+
+
+def _column_converters(cols: Dict[str, Column]) -> Dict[str, Converter]:
+    return {
+        k: to_python_literal_converter(col.upstream_type["type"])
+        for k, col in cols.items()
+    }
+
+
+def _prefetch(it: Iterator[T], depth: int) -> Iterator[T]:
+    """Consume `it` on a background thread, staying up to `depth` items ahead.
+
+    The background thread stops, and closes `it`, once the returned generator
+    is closed or garbage collected.
+    """
+
+    q: "queue.Queue[Tuple[bool, object]]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item: Tuple[bool, object]) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def produce() -> None:
+        try:
+            for x in it:
+                if not put((True, x)):
+                    return
+        except Exception as e:
+            put((False, e))
+            return
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+        put((False, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            ok, x = q.get()
+            if not ok:
+                if x is not None:
+                    raise cast(Exception, x)
+                return
+
+            yield cast(T, x)
+    finally:
+        stop.set()
+
+
+def _linked_records(values: Iterable[object], res: List[Record]) -> None:
+    for x in values:
+        if isinstance(x, Record):
+            res.append(x)
+        elif isinstance(x, list):
+            _linked_records(x, res)
+
+
+def _load_links(records: List[Record], depth: int, loaded: Dict[str, Record]) -> None:
+    """Load records linked from `records`, following links up to `depth` hops.
+
+    `loaded` maps IDs to already loaded records and is updated in place.
+    """
+
+    for _ in range(depth):
+        links: List[Record] = []
+        for r in records:
+            _linked_records((r.get_values(load_if_missing=False) or {}).values(), links)
+
+        missing = [x for x in links if x.id not in loaded]
+        Record.load_many(missing)
+
+        for x in missing:
+            loaded.setdefault(x.id, x)
+
+        for x in links:
+            if x._cache.values is None:
+                x._share_cache(loaded[x.id])
+
+        records = missing
+        if len(records) == 0:
+            break
+
+
+def _arrow_type(registry_type: RegistryType, pa):
+    if "array" in registry_type:
+        return pa.list_(_arrow_type(registry_type["array"], pa))
+
+    if "union" in registry_type:
+        return pa.string()
+
+    primitive = registry_type["primitive"]
+    if primitive == "integer":
+        return pa.int64()
+    if primitive == "number":
+        return pa.float64()
+    if primitive == "boolean":
+        return pa.bool_()
+    if primitive == "date":
+        return pa.date32()
+    if primitive == "datetime":
+        return pa.timestamp("us", tz="UTC")
+    if primitive == "null":
+        return pa.null()
+
+    # string, enum, link and blob values are all stored by their identifier
+    return pa.string()
+
+
+def _arrow_value(value: object, registry_type: RegistryType) -> object:
+    if value is None or isinstance(value, (InvalidValue, EmptyCell)):
+        return None
+
+    if "array" in registry_type:
+        return [_arrow_value(x, registry_type["array"]) for x in cast(list, value)]
+
+    if isinstance(value, Enum):
+        # members are numbered by `Enum`, the name is the registry value
+        value = value.name
+    elif isinstance(value, Record):
+        value = value.id
+    elif isinstance(value, (LatchFile, LatchDir)):
+        value = value.remote_path
+    elif isinstance(value, LPath):
+        value = value.path
+
+    if "union" in registry_type:
+        return str(value)
+
+    return value
+
+
+def _missing_to_none(xs: Iterable[object]) -> List[object]:
+    return [None if isinstance(x, float) and isnan(x) else x for x in xs]
+
+
+def _tabular_columns(data) -> Dict[str, List[object]]:
+    """Convert tabular data to per-column lists with `None` for missing values.
+
+    `NaN` is missing regardless of the type of `data`.
+    """
+
+    module = type(data).__module__
+    if module.startswith("pandas"):
+        res: Dict[str, List[object]] = {}
+        for k in data.columns:
+            series = data[k]
+            res[str(k)] = [
+                None if missing else x
+                for x, missing in zip(
+                    series.astype(object).tolist(), series.isna().tolist()
+                )
+            ]
+
+        return res
+
+    if module.startswith("pyarrow"):
+        return {
+            name: _missing_to_none(data.column(name).to_pylist())
+            for name in data.column_names
+        }
+
+    if isinstance(data, dict):
+        return {str(k): _missing_to_none(v) for k, v in data.items()}
+
+    raise TypeError(
+        "expected a pandas DataFrame, a pyarrow Table or a mapping of columns, got"
+        f" {type(data).__name__}"
+    )
+
+
+def _read_delimited(path: Path, delimiter: str) -> Dict[str, List[object]]:
+    with path.open(newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+
+        header = next(reader, None)
+        if header is None:
+            return {}
+
+        columns: List[List[object]] = [[] for _ in header]
+        for row in reader:
+            for i, xs in enumerate(columns):
+                x = row[i] if i < len(row) else ""
+                xs.append(x if x != "" else None)
+
+    return dict(zip(header, columns))
+
+
+_list_records_query = parse_document("""
+    query TableQuery(
+        $id: BigInt!,
+        $argLimit: BigInt!,
+        $argOffset: BigInt!
+    ) {
+        catalogExperiment(id: $id) {
+            allSamplesJoinInfoPaginated(
+                argLimit: $argLimit,
+                argOffset: $argOffset
+            ) {
+                nodes {
+                    id
+                    name
+                    creationTime
+                    lastUpdated
+                    key
+                    data
+                }
+            }
+        }
+    }
+""")
+
+_list_records_keyset_template = """
+    query TableKeysetQuery($id: BigInt!, $first: Int!, $after: Cursor${vars}) {
+        catalogExperiment(id: $id) {
+            catalogSamplesByExperimentId(
+                condition: { removed: false }
+                orderBy: PRIMARY_KEY_ASC
+                first: $first
+                after: $after
+                ${sample_filter}
+            ) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                nodes {
+                    id
+                    name
+                    creationTime
+                    catalogEventsBySampleId(orderBy: TIME_DESC, first: 1) {
+                        nodes {
+                            time
+                        }
+                    }
+                    catalogSampleColumnDataBySampleId${cell_filter} {
+                        nodes {
+                            key
+                            data
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+def _list_records_keyset_query(
+    sample_filter: Optional[Dict[str, JsonValue]] = None,
+    columns: Optional[List[str]] = None,
+) -> Tuple[l.DocumentNode, Dict[str, JsonValue]]:
+    """Build the keyset pagination query and the variables for the filters.
+
+    Filters are passed as variables so that only a few distinct documents are
+    ever parsed.
+    """
+
+    query = _list_records_keyset_template
+    decls = ""
+    variables: Dict[str, JsonValue] = {}
+
+    if sample_filter is not None:
+        decls += ", $filter: CatalogSampleFilter"
+        query = query.replace("${sample_filter}", "filter: $filter")
+        variables["filter"] = cast(JsonValue, sample_filter)
+    else:
+        query = query.replace("${sample_filter}", "")
+
+    if columns is not None:
+        decls += ", $keys: [String!]!"
+        query = query.replace("${cell_filter}", "(filter: {key: {in: $keys}})")
+        variables["keys"] = cast(JsonValue, columns)
+    else:
+        query = query.replace("${cell_filter}", "")
+
+    return parse_document(query.replace("${vars}", decls)), variables
+
+
+def _has_array(registry_type: RegistryType) -> bool:
+    if "array" in registry_type:
+        return True
+
+    if "union" in registry_type:
+        return any(_has_array(x) for x in registry_type["union"].values())
+
+    return False
+
+
+def _sample_filter(
+    where: RecordFilter, cols: Dict[str, Column]
+) -> Optional[Dict[str, JsonValue]]:
+    """Translate `where` into a `catalogSamples` connection filter."""
+
+    conds: List[JsonValue] = []
+
+    if where.names is not None:
+        conds.append({"name": {"in": list(where.names)}})
+    if where.name_prefix is not None:
+        conds.append({"name": {"startsWith": where.name_prefix}})
+
+    if where.created_after is not None:
+        conds.append(
+            {"creationTime": {"greaterThanOrEqualTo": where.created_after.isoformat()}}
+        )
+    if where.created_before is not None:
+        conds.append({"creationTime": {"lessThan": where.created_before.isoformat()}})
+
+    # the last update is the newest event, or the creation time if there are none
+    if where.updated_after is not None:
+        t = where.updated_after.isoformat()
+        conds.append({
+            "or": [
+                {"creationTime": {"greaterThanOrEqualTo": t}},
+                {
+                    "catalogEventsBySampleId": {
+                        "some": {"time": {"greaterThanOrEqualTo": t}}
+                    }
+                },
+            ]
+        })
+    if where.updated_before is not None:
+        t = where.updated_before.isoformat()
+        conds.append({
+            "creationTime": {"lessThan": t},
+            "catalogEventsBySampleId": {
+                "none": {"time": {"greaterThanOrEqualTo": t}}
+            },
+        })
+
+    def value_cond(key: str, value: RegistryPythonValue) -> JsonValue:
+        col = cols.get(key)
+        if col is None:
+            raise NoSuchColumnError(key)
+
+        registry_type = col.upstream_type["type"]
+        data = to_registry_literal(value, registry_type)
+
+        # containment matches scalars exactly and tolerates extra keys in
+        # stored objects, but a list contains every sublist of itself
+        op = "equalTo" if _has_array(registry_type) else "contains"
+        return {
+            "catalogSampleColumnDataBySampleId": {
+                "some": {"key": {"equalTo": key}, "data": {op: cast(JsonValue, data)}}
+            }
+        }
+
+    for k, v in where.values.items():
+        conds.append(value_cond(k, v))
+
+    for k, vs in where.values_in.items():
+        conds.append({"or": [value_cond(k, v) for v in vs]})
+
+    if len(conds) == 0:
+        return None
+
+    return {"and": conds}
+
+
 @dataclass(frozen=True)
 class Table:
     """Registry table. Contains :class:`records <latch.registry.record.Record>`.
@@ -118,7 +514,7 @@ class Table:
         Always makes a network request.
         """
         data = execute(
-            gql.gql("""
+            parse_document("""
                 query TableQuery($id: BigInt!) {
                     catalogExperiment(id: $id) {
                         id
@@ -150,11 +546,7 @@ class Table:
             "catalogExperimentColumnDefinitionsByExperimentId"
         ]["nodes"]
         for x in columns:
-            py_type = to_python_type(x["type"]["type"])
-            if x["type"]["allowEmpty"]:
-                py_type = Union[py_type, EmptyCell]
-
-            cur = Column(x["key"], py_type, x["type"])
+            cur = _column(x["key"], x["type"])
             self._cache.columns[cur.key] = cur
 
     # get_project_id
@@ -241,13 +633,41 @@ class Table:
 
         return self._cache.columns
 
-    def list_records(self, *, page_size: int = 100) -> Iterator[Dict[str, Record]]:
+    def list_records(
+        self,
+        *,
+        page_size: int = 100,
+        pagination: Literal["offset", "keyset"] = "offset",
+        prefetch: int = 0,
+        prefetch_links: int = 0,
+        where: Optional[RecordFilter] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Record]]:
         """List Registry records contained in this table.
 
         Args:
             page_size:
                 Maximum size of a page of records. The last page may be shorter
                 than this value.
+            pagination:
+                `"offset"` pages by record offset. `"keyset"` pages by record ID
+                cursor which stays fast for pages deep into large tables.
+                Always `"keyset"` if `where` or `columns` are specified.
+            prefetch:
+                Number of pages to download ahead in the background while the
+                current page is being processed. `0` disables prefetching.
+            prefetch_links:
+                Number of hops of linked records to load in bulk for each page
+                (see :meth:`Record.load_many`). With `1`, the records linked
+                from each listed record are loaded; with `2`, the records those
+                link to are loaded as well, etc. `0` leaves linked records
+                unloaded.
+            where:
+                Only list records matching this filter. The filter is evaluated
+                by the server.
+            columns:
+                Only fetch values for these column keys. The returned records
+                only contain these columns.
 
         Yields:
             Pages of records. Each page is a mapping between record IDs and
@@ -256,35 +676,59 @@ class Table:
 
         cols = self.get_columns()
 
+        query: Optional[Tuple[l.DocumentNode, Dict[str, JsonValue]]] = None
+        if where is not None or columns is not None:
+            sample_filter = _sample_filter(where, cols) if where is not None else None
+
+            if columns is not None:
+                missing = [k for k in columns if k not in cols]
+                if len(missing) > 0:
+                    raise NoSuchColumnError(missing[0])
+
+                cols = {k: cols[k] for k in columns}
+
+            query = _list_records_keyset_query(sample_filter, columns)
+            pagination = "keyset"
+
+        converters = _column_converters(cols)
+
+        loaded: Dict[str, Record] = {}
+
+        pages = self._list_record_nodes(page_size, pagination, prefetch, query=query)
+        for nodes in pages:
+            page = self._parse_records_page(nodes, cols, converters)
+            if prefetch_links > 0:
+                _load_links(list(page.values()), prefetch_links, loaded)
+
+            yield page
+
+    def _list_record_nodes(
+        self,
+        page_size: int,
+        pagination: Literal["offset", "keyset"],
+        prefetch: int,
+        *,
+        query: Optional[Tuple[l.DocumentNode, Dict[str, JsonValue]]] = None,
+    ) -> Iterator[List[_AllRecordsNode]]:
+        if pagination == "keyset":
+            pages = self._list_record_nodes_keyset(page_size, query=query)
+        else:
+            pages = self._list_record_nodes_offset(page_size)
+
+        if prefetch > 0:
+            pages = _prefetch(pages, prefetch)
+
+        return pages
+
+    def _list_record_nodes_offset(
+        self, page_size: int
+    ) -> Iterator[List[_AllRecordsNode]]:
         offset = 0
         while True:
             data = execute(
-                gql.gql("""
-                    query TableQuery(
-                        $id: BigInt!,
-                        $argLimit: BigInt!,
-                        $argOffset: BigInt!
-                    ) {
-                        catalogExperiment(id: $id) {
-                            allSamplesJoinInfoPaginated(
-                                argLimit: $argLimit,
-                                argOffset: $argOffset
-                            ) {
-                                nodes {
-                                    id
-                                    name
-                                    creationTime
-                                    lastUpdated
-                                    key
-                                    data
-                                }
-                            }
-                        }
-                    }
-                """),
+                _list_records_query,
                 {"id": self.id, "argLimit": page_size, "argOffset": offset},
             )["catalogExperiment"]
-
             if data is None:
                 raise TableNotFoundError(
                     f"table does not exist or you lack permissions: id={self.id}"
@@ -292,46 +736,110 @@ class Table:
 
             nodes: List[_AllRecordsNode] = data["allSamplesJoinInfoPaginated"]["nodes"]
 
-            record_meta: Dict[str, RecordMeta] = {}
-            record_values: Dict[str, Dict[str, RecordValue]] = {}
+            num_records = len({x["id"] for x in nodes})
+            if num_records == 0:
+                break
 
-            for node in nodes:
-                record_meta[node["id"]] = RecordMeta(
-                    node["id"],
-                    node["name"],
-                    dp.isoparse(node["creationTime"]),
-                    dp.isoparse(node["lastUpdated"] if node["lastUpdated"] is not None else node["creationTime"]),
+            yield nodes
+
+            if num_records < page_size:
+                break
+
+            offset += page_size
+
+    def _list_record_nodes_keyset(
+        self,
+        page_size: int,
+        *,
+        query: Optional[Tuple[l.DocumentNode, Dict[str, JsonValue]]] = None,
+    ) -> Iterator[List[_AllRecordsNode]]:
+        if query is None:
+            query = _list_records_keyset_query()
+
+        document, variables = query
+
+        cursor: Optional[str] = None
+        while True:
+            data = execute(
+                document,
+                {**variables, "id": self.id, "first": page_size, "after": cursor},
+            )["catalogExperiment"]
+            if data is None:
+                raise TableNotFoundError(
+                    f"table does not exist or you lack permissions: id={self.id}"
                 )
-                vals = record_values.setdefault(node["id"], {})
 
-                col = cols.get(node["key"])
-                if col is None:
-                    continue
+            conn = data["catalogSamplesByExperimentId"]
+
+            nodes: List[_AllRecordsNode] = []
+            for sample in conn["nodes"]:
+                creation_time = sample["creationTime"]
+
+                events = sample["catalogEventsBySampleId"]["nodes"]
+                last_updated = events[0]["time"] if len(events) > 0 else None
 
-                # todo(maximsmol): in the future, allow storing or yielding values that failed to parse
-                vals[col.key] = to_python_literal(
-                    node["data"], col.upstream_type["type"]
+                cells = sample["catalogSampleColumnDataBySampleId"]["nodes"]
+                if len(cells) == 0:
+                    # keep records without any values
+                    cells = [{"key": None, "data": None}]
+
+                nodes.extend(
+                    {
+                        "id": sample["id"],
+                        "name": sample["name"],
+                        "creationTime": creation_time,
+                        "lastUpdated": last_updated,
+                        "key": cell["key"],
+                        "data": cell["data"],
+                    }
+                    for cell in cells
                 )
 
-            page: Dict[str, Record] = {}
-            for id, values in record_values.items():
-                for col in cols.values():
-                    if col.key in values:
-                        continue
+            if len(nodes) > 0:
+                yield nodes
 
-                    if not col.upstream_type["allowEmpty"]:
-                        values[col.key] = InvalidValue("")
+            if not conn["pageInfo"]["hasNextPage"]:
+                break
+
+            cursor = conn["pageInfo"]["endCursor"]
 
-                meta = record_meta[id]
+    async def list_records_async(
+        self, *, page_size: int = 100
+    ) -> AsyncIterator[Dict[str, Record]]:
+        """Asynchronous version of :meth:`list_records`.
 
-                cur = Record(id)
-                cur._cache.name = meta.name
-                cur._cache.creation_time = meta.creation_time
-                cur._cache.last_updated = meta.last_updated
-                cur._cache.values = values
-                cur._cache.columns = cols
-                page[id] = cur
+        Args:
+            page_size:
+                Maximum size of a page of records. The last page may be shorter
+                than this value.
 
+        Yields:
+            Pages of records. Each page is a mapping between record IDs and
+            :class:`records <latch.registry.record.Record>`.
+        """
+
+        cols = self.get_columns(load_if_missing=False)
+        if cols is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.load)
+            cols = self.get_columns()
+        converters = _column_converters(cols)
+
+        offset = 0
+        while True:
+            data = (
+                await execute_async(
+                    _list_records_query,
+                    {"id": self.id, "argLimit": page_size, "argOffset": offset},
+                )
+            )["catalogExperiment"]
+            if data is None:
+                raise TableNotFoundError(
+                    f"table does not exist or you lack permissions: id={self.id}"
+                )
+
+            page = self._parse_records_page(
+                data["allSamplesJoinInfoPaginated"]["nodes"], cols, converters
+            )
             if len(page) > 0:
                 yield page
 
@@ -342,9 +850,176 @@ class Table:
             else:
                 break
 
-    def get_dataframe(self):
+    def _parse_records_page(
+        self,
+        nodes: List[_AllRecordsNode],
+        cols: Dict[str, Column],
+        converters: Dict[str, Converter],
+    ) -> Dict[str, Record]:
+        record_meta: Dict[str, RecordMeta] = {}
+        record_values: Dict[str, Dict[str, RecordValue]] = {}
+
+        for node in nodes:
+            # there is one node per (record, column) pair
+            if node["id"] not in record_meta:
+                record_meta[node["id"]] = RecordMeta(
+                    node["id"],
+                    node["name"],
+                    dp.isoparse(node["creationTime"]),
+                    dp.isoparse(node["lastUpdated"] if node["lastUpdated"] is not None else node["creationTime"]),
+                )
+            vals = record_values.setdefault(node["id"], {})
+
+            convert = converters.get(node["key"])
+            if convert is None:
+                continue
+
+            # todo(maximsmol): in the future, allow storing or yielding values that failed to parse
+            vals[node["key"]] = convert(node["data"])
+
+        page: Dict[str, Record] = {}
+        for id, values in record_values.items():
+            for col in cols.values():
+                if col.key in values:
+                    continue
+
+                if not col.upstream_type["allowEmpty"]:
+                    values[col.key] = InvalidValue("")
+
+            meta = record_meta[id]
+
+            cur = Record(id)
+            cur._cache.name = meta.name
+            cur._cache.creation_time = meta.creation_time
+            cur._cache.last_updated = meta.last_updated
+            cur._cache.values = values
+            cur._cache.columns = cols
+            page[id] = cur
+
+        return page
+
+    def _iter_columns(
+        self,
+        cols: Dict[str, Column],
+        *,
+        chunk_rows: int,
+        page_size: int,
+        pagination: Literal["offset", "keyset"],
+        prefetch: int,
+        empty: object = None,
+    ) -> Iterator[Dict[str, List[object]]]:
+        """Yield chunks of at least `chunk_rows` records as per-column lists.
+
+        Values are converted directly from the GraphQL pages, without building
+        intermediate :class:`Record` objects. The last chunk may be shorter.
+        Cells without a value are set to `empty` in columns that allow empty
+        values, and to an :class:`InvalidValue` otherwise.
+        """
+
+        converters = _column_converters(cols)
+        missing: List[Tuple[str, object]] = [
+            (k, empty if col.upstream_type["allowEmpty"] else InvalidValue(""))
+            for k, col in cols.items()
+        ]
+
+        def new_chunk() -> Dict[str, List[object]]:
+            return {**{k: [] for k in cols}, "Name": []}
+
+        chunk = new_chunk()
+        for nodes in self._list_record_nodes(page_size, pagination, prefetch):
+            names = chunk["Name"]
+
+            # there is one node per (record, column) pair
+            row_of: Dict[str, int] = {}
+            for node in nodes:
+                row = row_of.get(node["id"])
+                if row is None:
+                    row = row_of[node["id"]] = len(names)
+                    names.append(node["name"])
+                    for k, x in missing:
+                        chunk[k].append(x)
+
+                convert = converters.get(node["key"])
+                if convert is None:
+                    continue
+
+                chunk[node["key"]][row] = convert(node["data"])
+
+            if len(names) >= chunk_rows:
+                yield chunk
+                chunk = new_chunk()
+
+        if len(chunk["Name"]) > 0:
+            yield chunk
+
+    def iter_dataframes(
+        self,
+        *,
+        chunk_rows: int = 10000,
+        page_size: int = 1000,
+        pagination: Literal["offset", "keyset"] = "offset",
+        prefetch: int = 0,
+    ):
+        """Iterate over pandas DataFrames of the records in this table.
+
+        Only one chunk of records is held in memory at a time.
+
+        Args:
+            chunk_rows:
+                Minimum number of records in each DataFrame. The last DataFrame
+                may be shorter. Chunks always end on a page boundary.
+            page_size:
+                Number of records requested per page.
+            pagination:
+                See :meth:`list_records`.
+            prefetch:
+                See :meth:`list_records`.
+
+        Yields:
+            DataFrames with one column per table column followed by a `Name`
+            column. Empty cells are NaN.
+        """
+
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                "pandas needs to be installed to use iter_dataframes. Install it"
+                " with `pip install pandas` or `pip install latch[pandas]`."
+            )
+
+        cols = self.get_columns()
+        for chunk in self._iter_columns(
+            cols,
+            chunk_rows=chunk_rows,
+            page_size=page_size,
+            pagination=pagination,
+            prefetch=prefetch,
+            empty=nan,
+        ):
+            yield pd.DataFrame(chunk, columns=list(chunk.keys()))
+
+    def get_dataframe(
+        self,
+        *,
+        page_size: int = 100,
+        pagination: Literal["offset", "keyset"] = "offset",
+        prefetch: int = 0,
+    ):
         """Get a pandas DataFrame of all records in this table.
 
+        Columns are built directly from the downloaded pages and concatenated
+        once at the end. Empty cells are NaN. Use :meth:`iter_dataframes` to
+        bound memory usage for large tables.
+
+        Args:
+            page_size:
+                Number of records requested per page.
+            pagination:
+                See :meth:`list_records`.
+            prefetch:
+                See :meth:`list_records`.
+
         Returns:
             DataFrame representing all records in this table.
         """
@@ -357,22 +1032,271 @@ class Table:
                 " `pip install pandas` or `pip install latch[pandas]`."
             )
 
-        records = []
-        for page in self.list_records():
-            for record in page.values():
-                full_record = record.get_values()
-                if full_record is not None:
-                    full_record["Name"] = record.get_name()
-                    records.append(full_record)
+        cols = self.get_columns()
 
-        if len(records) == 0:
-            cols = self.get_columns()
-            if cols is None:
-                return pd.DataFrame()
+        columns: Dict[str, List[object]] = {**{k: [] for k in cols}, "Name": []}
+        for chunk in self._iter_columns(
+            cols,
+            chunk_rows=page_size,
+            page_size=page_size,
+            pagination=pagination,
+            prefetch=prefetch,
+            empty=nan,
+        ):
+            for k, xs in chunk.items():
+                columns[k].extend(xs)
+
+        return pd.DataFrame(columns, columns=list(columns.keys()))
+
+    def get_arrow_table(
+        self,
+        *,
+        chunk_rows: int = 10000,
+        page_size: int = 1000,
+        pagination: Literal["offset", "keyset"] = "offset",
+        prefetch: int = 0,
+    ):
+        """Get a pyarrow Table of all records in this table.
+
+        Column types are derived from the Registry column types. Links are
+        stored as record IDs, blobs as `latch://` paths, enums as their member
+        names, and unions as strings. Invalid and missing values are null.
+
+        Args:
+            chunk_rows:
+                Number of records converted into each record batch.
+            page_size:
+                Number of records requested per page.
+            pagination:
+                See :meth:`list_records`.
+            prefetch:
+                See :meth:`list_records`.
+
+        Returns:
+            Arrow table with one column per table column followed by a `Name`
+            column.
+        """
+
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(
+                "pyarrow needs to be installed to use get_arrow_table. Install it"
+                " with `pip install pyarrow`."
+            )
+
+        cols = self.get_columns()
+
+        types = {k: col.upstream_type["type"] for k, col in cols.items()}
+        schema = pa.schema(
+            [
+                *((k, _arrow_type(t, pa)) for k, t in types.items()),
+                ("Name", pa.string()),
+            ]
+        )
+
+        batches = []
+        for chunk in self._iter_columns(
+            cols,
+            chunk_rows=chunk_rows,
+            page_size=page_size,
+            pagination=pagination,
+            prefetch=prefetch,
+        ):
+            arrays = [
+                pa.array(
+                    [_arrow_value(x, t) for x in chunk[k]], type=schema.field(k).type
+                )
+                for k, t in types.items()
+            ]
+            arrays.append(pa.array(chunk["Name"], type=pa.string()))
+
+            batches.append(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+        return pa.Table.from_batches(batches, schema=schema)
+
+    def upsert_dataframe(
+        self,
+        data,
+        *,
+        name_column: str = "Name",
+        atomic: bool = True,
+        max_chunk_records: int = 1000,
+        max_chunk_bytes: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        progress: Optional[Callable[["CommitChunkResult"], None]] = None,
+    ) -> List["CommitChunkResult"]:
+        """Update or create one record per row of a table of values.
+
+        Values are converted column by column with one compiled converter per
+        column. Strings are parsed into the column type, so CSV-like data can be
+        uploaded as-is, but other values are never converted to strings. Blob
+        values may be `latch://` paths, all of which are resolved with a single
+        request. Links are given as record IDs.
+
+        Missing values (`None`, `NaN`, `NaT`) leave the cell unchanged.
+
+        All rows are validated before anything is sent. Like
+        :meth:`TableUpdate.commit`, everything is sent in one atomic request by
+        default. Pass `atomic=False` to send large tables in concurrent chunks. See
+        :meth:`TableUpdate.commit` for the meaning of the commit arguments.
+
+        Args:
+            data:
+                A pandas DataFrame, a pyarrow Table, or a mapping from column
+                keys to equal-length lists of values.
+            name_column:
+                Column containing record names. Not uploaded as a value.
+
+        Returns:
+            One result per request that was sent.
+        """
+
+        columns = _tabular_columns(data)
+
+        names = columns.pop(name_column, None)
+        if names is None:
+            raise ValueError(f"missing record name column: {name_column!r}")
+
+        cols = self.get_columns()
+
+        db_columns: Dict[str, List[Optional[DBValue]]] = {}
+        for k, xs in columns.items():
+            col = cols.get(k)
+            if col is None:
+                raise NoSuchColumnError(k)
+
+            convert = to_registry_literal_converter(col.upstream_type["type"])
+
+            db_xs: List[Optional[DBValue]] = []
+            for name, x in zip(names, xs):
+                if x is None:
+                    db_xs.append(None)
+                    continue
+
+                try:
+                    db_xs.append(convert(x))
+                except RegistryTransformerException as e:
+                    raise RegistryTransformerException(
+                        f"record {name!r}, column {k!r}: {e}"
+                    ) from e
+
+            db_columns[k] = db_xs
+
+        upd = TableUpdate(self)
+        for i, name in enumerate(names):
+            if name is None:
+                raise ValueError(f"missing record name in row {i}")
+
+            values: Dict[str, DBValue] = {}
+            for k, xs in db_columns.items():
+                x = xs[i]
+                if x is not None:
+                    values[k] = x
+
+            upd.upsert_record_raw_unsafe(name=str(name), values=values)
+
+        return upd.commit(
+            atomic=atomic,
+            max_chunk_records=max_chunk_records,
+            max_chunk_bytes=max_chunk_bytes,
+            max_concurrency=max_concurrency,
+            progress=progress,
+        )
+
+    def upsert_file(
+        self,
+        path: Union[str, Path],
+        *,
+        format: Optional[Literal["csv", "tsv", "parquet"]] = None,
+        name_column: str = "Name",
+        atomic: bool = True,
+        max_chunk_records: int = 1000,
+        max_chunk_bytes: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        progress: Optional[Callable[["CommitChunkResult"], None]] = None,
+    ) -> List["CommitChunkResult"]:
+        """Update or create one record per row of a CSV, TSV or Parquet file.
+
+        Empty CSV cells leave the record value unchanged. Reading Parquet files
+        requires `pyarrow`. See :meth:`upsert_dataframe` for details.
+
+        Args:
+            path: Local file to import.
+            format:
+                File format. Inferred from the file extension if not specified.
+            name_column:
+                Column containing record names.
+
+        Returns:
+            One result per request that was sent.
+        """
+
+        path = Path(path)
+        if format is None:
+            suffix = path.suffix.lower()
+            if suffix in {".csv", ".tsv", ".parquet"}:
+                format = cast(Literal["csv", "tsv", "parquet"], suffix[1:])
+            elif suffix == ".pq":
+                format = "parquet"
+            else:
+                raise ValueError(
+                    f"cannot infer the format of {path}. Specify `format` explicitly."
+                )
 
-            return pd.DataFrame(columns=list(cols.keys()))
+        if format == "parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(
+                    "pyarrow needs to be installed to import parquet files. Install"
+                    " it with `pip install pyarrow`."
+                )
+
+            data = pq.read_table(path)
+        else:
+            data = _read_delimited(path, "\t" if format == "tsv" else ",")
+
+        return self.upsert_dataframe(
+            data,
+            name_column=name_column,
+            atomic=atomic,
+            max_chunk_records=max_chunk_records,
+            max_chunk_bytes=max_chunk_bytes,
+            max_concurrency=max_concurrency,
+            progress=progress,
+        )
+
+    def sync_snapshot(
+        self,
+        *,
+        path: Optional[Path] = None,
+        page_size: int = 1000,
+        full: bool = False,
+    ) -> "TableSnapshot":
+        """Create or update a persistent local snapshot of this table.
+
+        Only records updated since the previous sync are downloaded. Reads from
+        the returned snapshot do not make network requests.
+
+        Args:
+            path:
+                SQLite database to store the snapshot in. Defaults to
+                `~/.latch/registry/<table_id>/snapshot.sqlite`.
+            page_size:
+                Number of records requested per page.
+            full:
+                If true, discard the existing snapshot and download every record.
+
+        Returns:
+            The synced :class:`~latch.registry.snapshot.TableSnapshot`.
+        """
+        # avoid circular imports
+        from latch.registry.snapshot import TableSnapshot
 
-        return pd.DataFrame(records)
+        res = TableSnapshot(self, path=path)
+        res.sync(page_size=page_size, full=full)
+        return res
 
     @contextmanager
     def update(self, *, reload_on_commit: bool = True) -> Iterator["TableUpdate"]:
@@ -452,13 +1376,145 @@ class InvalidColumnTypeError(ValueError):
         self.invalid_type = invalid_type
 
 
+def _mutation_kind(
+    mut: _TableRecordsMutationData,
+) -> Literal["upsert_records", "delete_records", "upsert_columns"]:
+    if isinstance(mut, _TableRecordsUpsertData):
+        return "upsert_records"
+    if isinstance(mut, _TableRecordsDeleteData):
+        return "delete_records"
+    return "upsert_columns"
+
+
+def _mutation_size(mut: _TableRecordsMutationData) -> int:
+    if isinstance(mut, _TableRecordsUpsertData):
+        return len(json.dumps(mut.name)) + len(json.dumps(mut.values))
+    if isinstance(mut, _TableRecordsDeleteData):
+        return len(json.dumps(mut.name))
+    return len(json.dumps(mut.key)) + len(json.dumps(mut.type))
+
+
+def _mutation_runs(
+    mutations: List[_TableRecordsMutationData],
+) -> Iterator[List[_TableRecordsMutationData]]:
+    """Group consecutive mutations of the same kind."""
+
+    if len(mutations) == 0:
+        return
+
+    cur = [mutations[0]]
+    for mut in mutations[1:]:
+        if isinstance(mut, type(cur[0])):
+            cur.append(mut)
+            continue
+
+        yield cur
+        cur = [mut]
+
+    yield cur
+
+
+def _coalesce_mutations(
+    run: List[_TableRecordsMutationData],
+) -> List[_TableRecordsMutationData]:
+    """Merge mutations of the same record so chunks of a run are independent."""
+
+    if isinstance(run[0], _TableRecordsUpsertData):
+        values: Dict[str, Dict[str, DBValue]] = {}
+        for x in cast(List[_TableRecordsUpsertData], run):
+            values[x.name] = {**values.get(x.name, {}), **x.values}
+
+        return [_TableRecordsUpsertData(k, v) for k, v in values.items()]
+
+    if isinstance(run[0], _TableRecordsDeleteData):
+        names = dict.fromkeys(x.name for x in cast(List[_TableRecordsDeleteData], run))
+        return [_TableRecordsDeleteData(x) for x in names]
+
+    return run
+
+
+def _chunk_mutations(
+    run: List[_TableRecordsMutationData], max_records: int, max_bytes: int
+) -> List[Tuple[List[_TableRecordsMutationData], int]]:
+    """Split `run` into chunks, returned with their approximate size in bytes."""
+
+    res: List[Tuple[List[_TableRecordsMutationData], int]] = []
+
+    cur: List[_TableRecordsMutationData] = []
+    cur_bytes = 0
+    for mut in run:
+        size = _mutation_size(mut)
+        if len(cur) > 0 and (
+            len(cur) >= max_records or cur_bytes + size > max_bytes
+        ):
+            res.append((cur, cur_bytes))
+            cur = []
+            cur_bytes = 0
+
+        cur.append(mut)
+        cur_bytes += size
+
+    if len(cur) > 0:
+        res.append((cur, cur_bytes))
+
+    return res
+
+
+@dataclass(frozen=True)
+class CommitChunkResult:
+    """Outcome of one request sent by :meth:`TableUpdate.commit`."""
+
+    index: int
+    """Position of the request among all requests sent by the commit."""
+    kind: Literal["upsert_records", "delete_records", "upsert_columns"]
+    """Kind of the first mutation in the request."""
+    num_mutations: int
+    """Number of mutations in the request."""
+    num_bytes: Optional[int]
+    """Approximate size of the values sent in the request. `None` for atomic
+    commits, which are not measured."""
+    error: Optional[Exception] = None
+    """Exception raised by the request, if it failed."""
+
+    _mutations: List[_TableRecordsMutationData] = field(
+        default_factory=list, repr=False, hash=False, compare=False
+    )
+
+
+class PartialCommitError(RuntimeError):
+    """Failure of some requests of a non-atomic :meth:`TableUpdate.commit`.
+
+    Updates from the failed requests, and updates that were not sent because
+    of them, are left pending in the transaction.
+
+    Attributes:
+        results: Results of every request sent by the commit.
+        num_unsent: Number of updates that were not sent.
+    """
+
+    def __init__(self, results: List[CommitChunkResult], num_unsent: int = 0):
+        failed = [x for x in results if x.error is not None]
+        msg = (
+            f"{len(failed)} of {len(results)} requests failed. First error:"
+            f" {failed[0].error!r}"
+        )
+        if num_unsent > 0:
+            msg += f". {num_unsent} later updates were not sent"
+
+        super().__init__(msg)
+
+        self.results = results
+        self.num_unsent = num_unsent
+
+
 @dataclass(frozen=True)
 class TableUpdate:
     """Ongoing :class:`Table` update transaction.
 
     Groups requested updates to commit everything together in one network request.
 
-    Transactions are atomic. The entire transaction either commits or fails with an exception.
+    Transactions are atomic by default. The entire transaction either commits or fails with an exception.
+    See :meth:`commit` for committing large transactions in concurrent chunks.
     """
 
     _record_mutations: List[_TableRecordsMutationData] = field(
@@ -743,14 +1799,17 @@ class TableUpdate:
         if len(unresolved) == 0:
             return
 
+        # bulk imports often reference the same path from many records
+        paths = list(dict.fromkeys(data["remote_path"] for data in unresolved))
+
         try:
             res = execute(
-                gql.gql("""
+                parse_document("""
                     query ResolvePaths($argPaths: [String]!) {
                         fastLdataMultiResolvePath(argPaths: $argPaths)
                     }
                     """),
-                {"argPaths": [data["remote_path"] for data in unresolved]},
+                {"argPaths": paths},
             )["fastLdataMultiResolvePath"]
         except gql.transport.exceptions.TransportQueryError as e:
             assert e.errors is not None
@@ -758,8 +1817,9 @@ class TableUpdate:
             err = e.errors[0]
             raise ValueError(err["message"]) from e
 
-        for i, db_val in enumerate(unresolved):
-            data = res[i]
+        node_ids = dict(zip(paths, res))
+        for db_val in unresolved:
+            data = node_ids[db_val["remote_path"]]
 
             if data is None:
                 raise RegistryTransformerException(
@@ -771,24 +1831,13 @@ class TableUpdate:
 
     # transaction
 
-    def commit(self) -> None:
-        """Commit this table update transaction.
-
-        May be called multiple times.
-
-        All pending updates are committed with one network request.
-
-        Atomic. The entire transaction either commits or fails with an exception.
-        """
+    def _mutation_document(
+        self, record_mutations: List[_TableRecordsMutationData]
+    ) -> Tuple[l.DocumentNode, Dict[str, JsonValue]]:
         mutations: List[l.SelectionNode] = []
         vars: Dict[str, Tuple[l.TypeNode, JsonValue]] = {}
 
-        if len(self._record_mutations) == 0:
-            return
-
-        self._resolve_upsert_blobs()
-
-        def _add_record_data_selection(cur):
+        for cur in _mutation_runs(record_mutations):
             if isinstance(cur[0], _TableRecordsUpsertData):
                 self._add_record_upserts_selection(cur, mutations, vars)
             if isinstance(cur[0], _TableRecordsDeleteData):
@@ -796,17 +1845,6 @@ class TableUpdate:
             if isinstance(cur[0], _TableColumnUpsertData):
                 self._add_column_upserts_selection(cur, mutations, vars)
 
-        cur = [self._record_mutations[0]]
-        for mut in self._record_mutations[1:]:
-            if isinstance(mut, type(cur[0])):
-                cur.append(mut)
-                continue
-
-            _add_record_data_selection(cur)
-            cur = [mut]
-
-        _add_record_data_selection(cur)
-
         sel_set = l.SelectionSetNode()
         sel_set.selections = tuple(mutations)
 
@@ -826,12 +1864,149 @@ class TableUpdate:
             _var_def_node(k, t) for k, (t, _) in vars.items()
         )
 
-        # todo(maximsmol): catch errors here and raise appropriate Python exceptions
-        # 1. column upsert: already exists
-        execute(doc, {k: v for k, (_, v) in vars.items()})
+        return doc, {k: v for k, (_, v) in vars.items()}
+
+    def commit(
+        self,
+        *,
+        atomic: bool = True,
+        max_chunk_records: int = 1000,
+        max_chunk_bytes: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        progress: Optional[Callable[[CommitChunkResult], None]] = None,
+    ) -> List[CommitChunkResult]:
+        """Commit this table update transaction.
+
+        May be called multiple times.
+
+        By default, all pending updates are committed with one network request.
+        This is atomic: the entire transaction either commits or fails with an
+        exception.
+
+        With `atomic=False`, pending updates are split into chunks of at most
+        `max_chunk_records` mutations and roughly `max_chunk_bytes` of
+        serialized values, which are sent concurrently. Updates of the same
+        kind (record upserts, record deletes, column upserts) run in parallel
+        while different kinds run in the order they were requested. Repeated
+        upserts of the same record are merged. This is best-effort: successful
+        chunks stay committed and, if any chunk failed, updates of later kinds
+        are not sent since they may depend on the failed ones.
+        :class:`PartialCommitError` is then raised with the failed and unsent
+        updates left pending so that :meth:`commit` can be retried.
+
+        Args:
+            atomic:
+                If true, send everything in one request. If false, send
+                chunks concurrently with best-effort semantics.
+            max_chunk_records:
+                Maximum number of mutations per request. Ignored if `atomic`.
+            max_chunk_bytes:
+                Approximate maximum size of the values sent in one request.
+                A single mutation larger than this is sent on its own. Ignored
+                if `atomic`.
+            max_concurrency:
+                Maximum number of requests in flight. Ignored if `atomic`.
+            progress:
+                Called with the result of each request as soon as it finishes.
+                Called from worker threads if not `atomic`.
+
+        Returns:
+            One result per request that was sent.
+        """
+        if len(self._record_mutations) == 0:
+            return []
+
+        self._resolve_upsert_blobs()
+
+        if atomic:
+            doc, vars = self._mutation_document(self._record_mutations)
+
+            # todo(maximsmol): catch errors here and raise appropriate Python exceptions
+            # 1. column upsert: already exists
+            execute(doc, vars)
+
+            res = CommitChunkResult(
+                index=0,
+                kind=_mutation_kind(self._record_mutations[0]),
+                num_mutations=len(self._record_mutations),
+                num_bytes=None,
+                _mutations=list(self._record_mutations),
+            )
+            if progress is not None:
+                progress(res)
+
+            self.clear()
+            return [res]
+
+        if max_chunk_records < 1:
+            raise ValueError("max_chunk_records must be positive")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+
+        results: List[CommitChunkResult] = []
+        unsent: List[_TableRecordsMutationData] = []
+
+        def send(
+            index: int, chunk: List[_TableRecordsMutationData], num_bytes: int
+        ) -> None:
+            error: Optional[Exception] = None
+            try:
+                doc, vars = self._mutation_document(chunk)
+                execute(doc, vars)
+            except Exception as e:
+                error = e
+
+            res = CommitChunkResult(
+                index=index,
+                kind=_mutation_kind(chunk[0]),
+                num_mutations=len(chunk),
+                num_bytes=num_bytes,
+                error=error,
+                _mutations=chunk,
+            )
+            results.append(res)
+            if progress is not None:
+                progress(res)
+
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="latch-registry-commit"
+        ) as pool:
+            runs = list(_mutation_runs(self._record_mutations))
+            for run_idx, run in enumerate(runs):
+                chunks = _chunk_mutations(
+                    _coalesce_mutations(run), max_chunk_records, max_chunk_bytes
+                )
+
+                # different kinds of mutations may depend on each other so only
+                # chunks of the same run are sent concurrently, and nothing
+                # after a run with failures is sent
+                start = len(results)
+                futs = [
+                    pool.submit(send, start + i, chunk, num_bytes)
+                    for i, (chunk, num_bytes) in enumerate(chunks)
+                ]
+                for fut in futs:
+                    fut.result()
+
+                if any(x.error is not None for x in results):
+                    for x in runs[run_idx + 1 :]:
+                        unsent.extend(x)
+                    break
+
+        results.sort(key=lambda x: x.index)
 
         self.clear()
 
+        failed = [x for x in results if x.error is not None]
+        if len(failed) > 0:
+            for x in failed:
+                self._record_mutations.extend(x._mutations)
+            self._record_mutations.extend(unsent)
+
+            raise PartialCommitError(results, num_unsent=len(unsent))
+
+        return results
+
     def clear(self):
         """Remove pending updates.
 
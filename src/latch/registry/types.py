@@ -1,7 +1,18 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
-from typing import TYPE_CHECKING, Generic, List, Literal, Tuple, Type, TypeVar, Union
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generic,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from typing_extensions import TypeAlias
 
@@ -77,6 +88,35 @@ class Column:
     """
 
 
+@dataclass
+class RecordFilter:
+    """Server-side filter for :meth:`Table.list_records`.
+
+    Records must satisfy every condition that is set.
+    """
+
+    names: Optional[List[str]] = None
+    """Record names to include."""
+    name_prefix: Optional[str] = None
+    """Prefix of the record name."""
+    created_after: Optional[datetime] = None
+    """Inclusive lower bound on the creation time."""
+    created_before: Optional[datetime] = None
+    """Exclusive upper bound on the creation time."""
+    updated_after: Optional[datetime] = None
+    """Inclusive lower bound on the time of the last update."""
+    updated_before: Optional[datetime] = None
+    """Exclusive upper bound on the time of the last update."""
+    values: Dict[str, RegistryPythonValue] = field(default_factory=dict)
+    """Mapping between column keys and the exact value the column must have.
+
+    Array values match records whose list is equal to the given one, in the
+    same order.
+    """
+    values_in: Dict[str, List[RegistryPythonValue]] = field(default_factory=dict)
+    """Mapping between column keys and a list of allowed values."""
+
+
 RegistryEnumDefinitionArg = TypeVar("RegistryEnumDefinitionArg", bound=Tuple[str, ...])
 
 
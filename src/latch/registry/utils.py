@@ -1,10 +1,23 @@
 import json
 from datetime import date, datetime
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, List, Optional, Type, TypeVar, Union, cast
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
-import gql
 from dateutil.parser import parse
+from typing_extensions import TypeAlias
 
 from latch.ldata.path import LPath
 from latch.registry.record import Record
@@ -20,6 +33,7 @@ from latch.types.directory import LatchDir
 from latch.types.file import LatchFile
 from latch.utils import current_workspace
 from latch_sdk_config.user import user_config
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 if TYPE_CHECKING:
@@ -34,6 +48,11 @@ T = TypeVar("T")
 class RegistryTransformerException(ValueError): ...
 
 
+@lru_cache(maxsize=None)
+def _enum_type(members: Tuple[str, ...]) -> Type[Enum]:
+    return Enum("Enum", members)
+
+
 def to_python_type(registry_type: RegistryType) -> Type[RegistryPythonValue]:
     if "primitive" in registry_type:
         primitive = cast(PrimitiveType, registry_type)["primitive"]
@@ -53,7 +72,7 @@ def to_python_type(registry_type: RegistryType) -> Type[RegistryPythonValue]:
             return Record
         if primitive == "enum":
             members = cast(PrimitiveTypeEnum, registry_type)["members"]
-            return Enum("Enum", members)
+            return _enum_type(tuple(members))
         if primitive == "null":
             return type(None)
         if primitive == "boolean":
@@ -80,136 +99,209 @@ def to_python_type(registry_type: RegistryType) -> Type[RegistryPythonValue]:
     )
 
 
-def to_python_literal(registry_literal: DBValue, registry_type: RegistryType):
+def _parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # fromisoformat only accepts a subset of ISO 8601 before Python 3.11
+        return parse(value)
+
+
+def _parse_date(value: str) -> date:
+    if len(value) == 10:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+
+    return parse(value).date()
+
+
+Converter: TypeAlias = Callable[[DBValue], object]
+
+
+def to_python_literal_converter(registry_type: RegistryType) -> Converter:
+    """Compile `registry_type` into a function converting its values to python.
+
+    All type dispatch happens once, up front, so converting many values of the
+    same type (e.g. every cell of a column) only does the per-value work.
+    """
+
     if "array" in registry_type:
-        if type(registry_literal) is not list:
-            if "valid" in registry_literal and not registry_literal["valid"]:
-                return InvalidValue(registry_literal["rawValue"])
+        convert_item = to_python_literal_converter(registry_type["array"])
 
-            raise RegistryTransformerException(
-                f"{registry_literal} is not a list so it cannot be converted into a"
-                " list"
-            )
+        def convert_array(registry_literal: DBValue):
+            if type(registry_literal) is not list:
+                if "valid" in registry_literal and not registry_literal["valid"]:
+                    return InvalidValue(registry_literal["rawValue"])
 
-        return [
-            to_python_literal(sub_val, registry_type["array"])
-            for sub_val in registry_literal
-        ]
-    if "union" in registry_type:
-        tag = registry_literal["tag"]
-        sub_type = registry_type["union"].get(tag)
-        if sub_type is None:
-            raise RegistryTransformerException(
-                f"{registry_literal} cannot be converted to {registry_type} because its"
-                f" tag `{tag}` is not present."
-            )
+                raise RegistryTransformerException(
+                    f"{registry_literal} is not a list so it cannot be converted into"
+                    " a list"
+                )
+
+            return [convert_item(x) for x in registry_literal]
+
+        return convert_array
 
-        return to_python_literal(registry_literal["value"], sub_type)
+    if "union" in registry_type:
+        variants = {
+            tag: to_python_literal_converter(sub_type)
+            for tag, sub_type in registry_type["union"].items()
+        }
+
+        def convert_union(registry_literal: DBValue):
+            tag = registry_literal["tag"]
+            convert_variant = variants.get(tag)
+            if convert_variant is None:
+                raise RegistryTransformerException(
+                    f"{registry_literal} cannot be converted to {registry_type} because"
+                    f" its tag `{tag}` is not present."
+                )
 
-    if not registry_literal["valid"]:
-        return InvalidValue(registry_literal["rawValue"])
+            return convert_variant(registry_literal["value"])
 
-    value = registry_literal["value"]
+        return convert_union
 
     primitive = registry_type.get("primitive")
+
+    convert_value: Callable[[object], object]
     if primitive is None:
-        raise RegistryTransformerException(
-            f"cannot convert to python - malformed registry type: {registry_type}"
-        )
 
-    if primitive == "enum":
+        def convert_value(value):
+            raise RegistryTransformerException(
+                f"cannot convert to python - malformed registry type: {registry_type}"
+            )
+
+    elif primitive == "enum":
         if "members" not in registry_type:
+
+            def convert_value(value):
+                raise RegistryTransformerException(
+                    "cannot convert to python - malformed registry enum type without"
+                    f" members: {registry_type}"
+                )
+
+        else:
+            members = registry_type["members"]
+            enum_type = _enum_type(tuple(members))
+
+            def convert_value(value):
+                if value not in members:
+                    raise RegistryTransformerException(
+                        f"unable to convert {value} to any of the enum members {members}"
+                    )
+
+                return enum_type[value]
+
+    elif primitive == "blob":
+        blob_type = get_blob_nodetype(registry_type)
+
+        def convert_value(value):
+            if type(value) is not dict or "ldataNodeId" not in value:
+                raise RegistryTransformerException(
+                    f"cannot convert non-blob value {value} to blob type"
+                )
+
+            return blob_type(f"latch://{value['ldataNodeId']}.node")
+
+    elif primitive == "link":
+
+        def convert_value(value):
+            if "sampleId" not in value:
+                raise RegistryTransformerException(
+                    f"unable to convert {value} to Link as row id was not found"
+                )
+
+            return Record(str(value["sampleId"]))
+
+    elif primitive == "string":
+
+        def convert_value(value):
+            if isinstance(value, str):
+                return value
             raise RegistryTransformerException(
-                "cannot convert to python - malformed registry enum type without"
-                f" members: {registry_type}"
+                f"Cannot convert {value} to string as it is not a primitive string"
+                " literal"
             )
 
-        members = registry_type["members"]
-        if value not in members:
+    elif primitive == "number":
+
+        def convert_value(value):
+            if isinstance(value, (float, int)):
+                return float(value)
+
             raise RegistryTransformerException(
-                f"unable to convert {value} to any of the enum members {members}"
+                f"Cannot convert {value} ({type(value)}) to float as it is not a"
+                " primitive number literal"
             )
 
-        return to_python_type(registry_type)[value]
+    elif primitive == "integer":
+
+        def convert_value(value):
+            if isinstance(value, int):
+                return value
+            raise RegistryTransformerException(
+                f"Cannot convert {value} to integer as it is not a primitive integer"
+                " literal"
+            )
 
-    if primitive == "blob":
-        typ = get_blob_nodetype(registry_type)
+    elif primitive == "boolean":
 
-        if type(value) is not dict or "ldataNodeId" not in value:
+        def convert_value(value):
+            if isinstance(value, bool):
+                return value
             raise RegistryTransformerException(
-                f"cannot convert non-blob value {value} to blob type"
+                f"Cannot convert {value} to boolean as it is not a primitive boolean"
+                " literal"
             )
 
-        return typ(f"latch://{value['ldataNodeId']}.node")
+    elif primitive == "date":
 
-    if primitive == "link":
-        if "sampleId" not in value:
+        def convert_value(value):
+            if isinstance(value, str):
+                return _parse_date(value)
             raise RegistryTransformerException(
-                f"unable to convert {value} to Link as row id was not found"
+                f"Cannot convert {value} to date as it is not a primitive date literal"
             )
 
-        from latch.registry.record import Record
+    elif primitive == "datetime":
 
-        return Record(str(value["sampleId"]))
+        def convert_value(value):
+            if isinstance(value, str):
+                return _parse_datetime(value)
+            raise RegistryTransformerException(
+                f"Cannot convert {value} to datetime as it is not a primitive datetime"
+                " literal"
+            )
 
-    if primitive == "string":
-        if isinstance(value, str):
-            return value
-        raise RegistryTransformerException(
-            f"Cannot convert {value} to string as it is not a primitive string literal"
-        )
+    elif primitive == "null":
 
-    if primitive == "number":
-        if isinstance(value, float) or isinstance(value, int):
-            return float(value)
+        def convert_value(value):
+            if value is None:
+                return value
+            raise RegistryTransformerException(
+                f"Cannot convert {value} to None as it is not a primitive null literal"
+            )
 
-        raise RegistryTransformerException(
-            f"Cannot convert {value} ({type(value)}) to float as it is not a primitive"
-            " number literal"
-        )
+    else:
 
-    if primitive == "integer":
-        if isinstance(value, int):
-            return value
-        raise RegistryTransformerException(
-            f"Cannot convert {value} to integer as it is not a primitive integer"
-            " literal"
-        )
+        def convert_value(value):
+            raise ValueError(
+                f"primitive literal {value} cannot be converted to {registry_type}"
+            )
 
-    if primitive == "boolean":
-        if isinstance(value, bool):
-            return value
-        raise RegistryTransformerException(
-            f"Cannot convert {value} to boolean as it is not a primitive boolean"
-            " literal"
-        )
+    def convert_primitive(registry_literal: DBValue):
+        if not registry_literal["valid"]:
+            return InvalidValue(registry_literal["rawValue"])
 
-    if primitive == "date":
-        if isinstance(value, str):
-            return parse(value).date()
-        raise RegistryTransformerException(
-            f"Cannot convert {value} to date as it is not a primitive date literal"
-        )
+        return convert_value(registry_literal["value"])
 
-    if primitive == "datetime":
-        if isinstance(value, str):
-            return parse(value)
-        raise RegistryTransformerException(
-            f"Cannot convert {value} to datetime as it is not a primitive datetime"
-            " literal"
-        )
+    return convert_primitive
 
-    if primitive == "null":
-        if value is None:
-            return value
-        raise RegistryTransformerException(
-            f"Cannot convert {value} to None as it is not a primitive null literal"
-        )
 
-    raise ValueError(
-        f"primitive literal {registry_literal['value']} cannot be converted to"
-        f" {registry_type}"
-    )
+def to_python_literal(registry_literal: DBValue, registry_type: RegistryType):
+    return to_python_literal_converter(registry_type)(registry_literal)
 
 
 # same as to_registry_literal except no network request is made for blob types
@@ -343,7 +435,7 @@ def to_registry_literal(
 
             if ws_id is None:
                 data = execute(
-                    gql.gql("""
+                    parse_document("""
                     query nodeIdQ($argPath: String!) {
                         ldataResolvePath(
                             path: $argPath
@@ -357,7 +449,7 @@ def to_registry_literal(
                 )["ldataResolvePath"]
             else:
                 data = execute(
-                    gql.gql("""
+                    parse_document("""
                     query nodeIdQ($argPath: String!, $wsId: BigInt!) {
                         ldataResolvePathExt(
                             path: $argPath,
@@ -384,6 +476,240 @@ def to_registry_literal(
     return {"value": value, "valid": True}
 
 
+RegistryConverter: TypeAlias = Callable[[object], DBValue]
+
+
+def to_registry_literal_converter(registry_type: RegistryType) -> RegistryConverter:
+    """Compile `registry_type` into a function that converts tabular cells.
+
+    Accepts everything `to_registry_literal` does and additionally parses strings
+    (e.g. from CSV files) and numpy-derived values (e.g. integral floats in
+    integer columns with missing values). Values are never converted to
+    strings: string columns only accept strings and boolean columns only accept
+    `true` and `false` in any case. Blob paths are never resolved, see
+    `_get_unresolved_blobs_in_update`.
+    """
+
+    if "array" in registry_type:
+        convert_item = to_registry_literal_converter(registry_type["array"])
+
+        def convert_array(python_literal: object) -> DBValue:
+            if isinstance(python_literal, InvalidValue):
+                return {"valid": False, "rawValue": python_literal.raw_value}
+
+            if isinstance(python_literal, str):
+                try:
+                    python_literal = json.loads(python_literal)
+                except json.JSONDecodeError as e:
+                    raise RegistryTransformerException(
+                        f"unable to parse {python_literal!r} as a JSON list"
+                    ) from e
+            elif hasattr(python_literal, "tolist"):
+                # numpy arrays
+                python_literal = cast(Any, python_literal).tolist()
+
+            if not isinstance(python_literal, (list, tuple)):
+                raise RegistryTransformerException(
+                    "unable to convert non-list python literal to registry array literal"
+                )
+
+            return [convert_item(x) for x in python_literal]
+
+        return convert_array
+
+    if "union" in registry_type:
+        variants = [
+            (tag, to_registry_literal_converter(sub_type))
+            for tag, sub_type in registry_type["union"].items()
+        ]
+
+        def convert_union(python_literal: object) -> DBValue:
+            if isinstance(python_literal, InvalidValue):
+                return {"valid": False, "rawValue": python_literal.raw_value}
+
+            errors: Dict[str, str] = {}
+            for tag, convert_variant in variants:
+                try:
+                    return {"tag": tag, "value": convert_variant(python_literal)}
+                except RegistryTransformerException as e:
+                    errors[tag] = str(e)
+
+            raise RegistryTransformerException(
+                f"{python_literal} cannot be converted into any union members of"
+                f" {json.dumps(registry_type, indent=2)}:\n{json.dumps(errors, indent=2)}"
+            )
+
+        return convert_union
+
+    primitive = registry_type.get("primitive")
+
+    convert_value: Callable[[object], object]
+    if primitive == "string":
+
+        def convert_value(x):
+            if isinstance(x, str):
+                return x
+
+            raise RegistryTransformerException(
+                f"cannot convert non-string python literal to {primitive} registry"
+                " literal"
+            )
+
+    elif primitive == "integer":
+
+        def convert_value(x):
+            if isinstance(x, bool):
+                pass
+            elif isinstance(x, int):
+                return x
+            elif isinstance(x, float) and x.is_integer():
+                return int(x)
+            elif isinstance(x, str):
+                try:
+                    return int(x)
+                except ValueError:
+                    pass
+
+                try:
+                    f = float(x)
+                    if f.is_integer():
+                        return int(f)
+                except ValueError:
+                    pass
+
+            raise RegistryTransformerException(
+                f"unable to convert {x!r} to registry int literal"
+            )
+
+    elif primitive == "number":
+
+        def convert_value(x):
+            if isinstance(x, (int, float)) and not isinstance(x, bool):
+                return float(x)
+            if isinstance(x, str):
+                try:
+                    return float(x)
+                except ValueError:
+                    pass
+
+            raise RegistryTransformerException(
+                f"unable to convert {x!r} to registry number literal"
+            )
+
+    elif primitive == "boolean":
+
+        def convert_value(x):
+            if isinstance(x, bool):
+                return x
+            if isinstance(x, str):
+                if x.lower() == "true":
+                    return True
+                if x.lower() == "false":
+                    return False
+
+            raise RegistryTransformerException(
+                f"unable to convert {x!r} to registry boolean literal"
+            )
+
+    elif primitive == "date":
+
+        def convert_value(x):
+            if isinstance(x, datetime):
+                return x.date().isoformat()
+            if isinstance(x, date):
+                return x.isoformat()
+            if isinstance(x, str):
+                try:
+                    return _parse_date(x).isoformat()
+                except (ValueError, OverflowError):
+                    pass
+
+            raise RegistryTransformerException(
+                f"unable to convert {x!r} to registry date literal"
+            )
+
+    elif primitive == "datetime":
+
+        def convert_value(x):
+            # datetime is a subclass of date
+            if isinstance(x, date):
+                return x.isoformat()
+            if isinstance(x, str):
+                try:
+                    return _parse_datetime(x).isoformat()
+                except (ValueError, OverflowError):
+                    pass
+
+            raise RegistryTransformerException(
+                f"unable to convert {x!r} to registry datetime literal"
+            )
+
+    elif primitive == "null":
+
+        def convert_value(x):
+            if x is not None:
+                raise RegistryTransformerException(
+                    "unable to convert non-None python literal to registry null literal"
+                )
+
+            return None
+
+    elif primitive == "enum":
+        members = set(registry_type["members"])
+
+        def convert_value(x):
+            if isinstance(x, Enum):
+                x = x.name
+
+            if not isinstance(x, str) or x not in members:
+                raise RegistryTransformerException(
+                    f"unable to convert {x} to registry enum with members"
+                    f" {', '.join(registry_type['members'])}"
+                )
+
+            return x
+
+    elif primitive == "link":
+
+        def convert_value(x):
+            if isinstance(x, Record):
+                return {"sampleId": str(x.id)}
+            # record IDs, not names
+            if isinstance(x, (str, int)) and not isinstance(x, bool):
+                return {"sampleId": str(x)}
+            if isinstance(x, float) and x.is_integer():
+                return {"sampleId": str(int(x))}
+
+            raise RegistryTransformerException(
+                "cannot convert non-record python literal to registry link"
+            )
+
+    elif primitive == "blob":
+
+        def convert_value(x):
+            if isinstance(x, LPath):
+                return {"remote_path": x.path}
+            if isinstance(x, (LatchFile, LatchDir)):
+                return {"remote_path": x.remote_path}
+            if isinstance(x, str) and x.startswith("latch://"):
+                return {"remote_path": x}
+
+            raise RegistryTransformerException(
+                "cannot convert non-blob python literal to registry blob"
+            )
+
+    else:
+        raise RegistryTransformerException(f"malformed registry type: {registry_type}")
+
+    def convert_primitive(python_literal: object) -> DBValue:
+        if isinstance(python_literal, InvalidValue):
+            return {"valid": False, "rawValue": python_literal.raw_value}
+
+        return {"value": convert_value(python_literal), "valid": True}
+
+    return convert_primitive
+
+
 def get_blob_nodetype(
     registry_type: RegistryType,
 ) -> Union[Type[LatchFile], Type[LatchDir]]:
@@ -4,7 +4,6 @@ from pathlib import Path
 from typing import Annotated, Optional, TypedDict, Union, get_args, get_origin
 from urllib.parse import urlparse
 
-import gql
 from flytekit.core.annotation import FlyteAnnotation
 from flytekit.core.context_manager import FlyteContext, FlyteContextManager
 from flytekit.core.type_engine import (
@@ -26,6 +25,7 @@ from latch.types.file import LatchFile
 from latch.types.utils import format_path, is_valid_url
 from latch_cli.utils import urljoins
 from latch_cli.utils.path import normalize_path
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 
@@ -171,7 +171,7 @@ class LatchDir(FlyteDirectory):
             return ret
 
         res: Optional[IterdirLdataResolvePathData] = execute(
-            gql.gql("""
+            parse_document("""
             query LDataChildren($argPath: String!) {
                 ldataResolvePathData(argPath: $argPath) {
                     finalLinkTarget {
@@ -210,7 +210,7 @@ class LatchDir(FlyteDirectory):
         self._idempotent_set_path()
 
         res: Optional[NodeDescendantsLDataResolvePathData] = execute(
-            gql.gql("""
+            parse_document("""
                 query NodeDescendantsQuery($path: String!) {
                     ldataResolvePathData(argPath: $path) {
                         finalLinkTarget {
@@ -4,7 +4,6 @@ from pathlib import Path
 from typing import Annotated, Optional, Union, get_args, get_origin
 from urllib.parse import urlparse
 
-import gql
 from flytekit.core.annotation import FlyteAnnotation
 from flytekit.core.context_manager import FlyteContext, FlyteContextManager
 from flytekit.core.type_engine import (
@@ -20,6 +19,7 @@ from flytekit.types.file.file import FlyteFile, FlyteFilePathTransformer
 from latch.ldata.path import LPath
 from latch.types.utils import format_path, is_absolute_node_path, is_valid_url
 from latch_cli.utils.path import normalize_path
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 
@@ -103,7 +103,7 @@ class LatchFile(FlyteFile):
                     local_path_hint = self._remote_path
                     if is_absolute_node_path.match(self._remote_path) is not None:
                         data = execute(
-                            gql.gql("""
+                            parse_document("""
                             query getName($argPath: String!) {
                                 ldataResolvePathData(argPath: $argPath) {
                                     name
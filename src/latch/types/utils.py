@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import Optional, Union
 from urllib.parse import urlparse
 
-import gql
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 
@@ -37,7 +37,7 @@ def format_path(path: str) -> str:
     node_id = match.group("node_id")
 
     data = execute(
-        gql.gql("""
+        parse_document("""
         query ldataGetPathQ($id: BigInt!) {
             ldataGetPath(argNodeId: $id)
             ldataOwner(argNodeId: $id)
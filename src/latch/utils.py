@@ -2,10 +2,10 @@ import itertools
 import os
 from typing import Dict, TypedDict
 
-import gql
 import jwt
 
 from latch_sdk_config.user import user_config
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 
@@ -23,7 +23,7 @@ def account_id_from_token(token: str) -> str:
     """
 
     res = execute(
-        gql.gql("""
+        parse_document("""
             query AccountIdFromToken {
                 accountInfoCurrent {
                     id
@@ -70,7 +70,7 @@ def get_workspaces() -> Dict[str, WSInfo]:
     """
     account_id = account_id_from_token(retrieve_or_login())
     res = execute(
-        gql.gql("""
+        parse_document("""
             query GetWorkspaces($accountId: BigInt!) {
                 userInfoByAccountId(accountId: $accountId) {
                     id
@@ -173,7 +173,7 @@ def current_workspace() -> str:
         return ws
 
     res = execute(
-        gql.gql("""
+        parse_document("""
             query DefaultAccountQuery {
                 accountInfoCurrent {
                     id
@@ -0,0 +1,65 @@
+"""Entry point of the `latch` console script.
+
+Shells start a new `latch` process for every completion request. Remote path
+completions for the Latch Data commands are answered here, from the completion
+cache when possible, without importing `latch_cli.main` and the rest of the
+SDK. Everything else is handled by the full CLI.
+"""
+
+import os
+
+# commands whose arguments complete with `services.cp.autocomplete`
+_remote_path_commands = {"cp", "du", "ls", "mkdirp", "mv", "rmr"}
+
+
+def _complete_remote_path() -> bool:
+    """Print completions if this is a remote path completion request.
+
+    Returns whether the request was handled.
+    """
+
+    instruction = os.environ.get("_LATCH_COMPLETE")
+    if instruction is None:
+        return False
+
+    shell, _, action = instruction.partition("_")
+    if action != "complete":
+        return False
+
+    import click
+    import click.shell_completion as sc
+
+    from latch_cli.services.cp.autocomplete import complete, completion_type
+
+    comp_cls = sc.get_completion_class(shell)
+    if comp_cls is None:
+        return False
+
+    # the command is only needed to resolve arbitrary parameters, which are
+    # left to the full CLI
+    comp = comp_cls(None, {}, "latch", "_LATCH_COMPLETE")  # type: ignore
+    args, incomplete = comp.get_completion_args()
+
+    if len(args) == 0 or args[0] not in _remote_path_commands:
+        return False
+
+    if incomplete.startswith("-") or completion_type.match(incomplete) is None:
+        return False
+
+    try:
+        items = complete(None, None, incomplete, allow_local=False)  # type: ignore
+    except Exception:
+        return False
+
+    # bytes so that Windows does not translate the line endings
+    click.echo("\n".join(comp.format_completion(x) for x in items).encode())
+    return True
+
+
+def main():
+    if _complete_remote_path():
+        return
+
+    from latch_cli.main import main as cli_main
+
+    cli_main()
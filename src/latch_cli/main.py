@@ -22,6 +22,7 @@ from latch.ldata._transfer.progress import Progress as _Progress  # noqa: PLC270
 from latch.utils import NoWorkspaceSelectedError, current_workspace
 from latch_cli.click_utils import EnumChoice
 from latch_cli.exceptions.handler import CrashHandler
+from latch_cli.services.cp import completion_cache
 from latch_cli.services.cp.autocomplete import complete as cp_complete
 from latch_cli.services.cp.autocomplete import remote_complete
 from latch_cli.services.init.init import template_flag_to_option
@@ -93,9 +94,47 @@ def requires_workspace(f: Callable[P, T]) -> Callable[P, T]:
 @click.group("latch", context_settings={"max_content_width": 160})
 @click.version_option(package_name="latch")
 @click.option("-v", "--verbose", count=True)
-def latch(verbose: int):
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print a breakdown of where time was spent (network requests, transfers, builds) on exit.",
+)
+@click.option(
+    "--profile-format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="Format of the `--profile` report.",
+)
+@click.option(
+    "--profile-cprofile",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="With `--profile`, also write cProfile statistics to this file.",
+)
+@click.pass_context
+def latch(
+    ctx: click.Context,
+    verbose: int,
+    profile: bool,
+    profile_format: str,
+    profile_cprofile: Optional[str],
+):
     """Collection of command line tools for using the Latch SDK and interacting with the Latch platform."""
 
+    if profile:
+        from latch_cli import tracing
+
+        tracing.enable(cprofile=profile_cprofile is not None)
+        ctx.call_on_close(
+            lambda: click.echo(
+                tracing.report(
+                    as_json=profile_format == "json", cprofile_path=profile_cprofile
+                ),
+                err=True,
+            )
+        )
+
     logging.basicConfig(
         level=logging.ERROR if verbose < 1 else logging.DEBUG,
         format="%(asctime)s [%(levelname)s] %(name)s/%(funcName)s:%(lineno)s %(message)s",
@@ -1050,16 +1089,21 @@ def cp(
     crash_handler.pkg_root = str(Path.cwd())
 
     from latch_cli.services.cp.main import cp
+    from latch_cli.utils.path import is_remote_path
 
-    cp(
-        src,
-        dest,
-        progress=progress,
-        verbose=verbose,
-        expand_globs=not no_glob,
-        cores=cores,
-        chunk_size_mib=chunk_size_mib,
-    )
+    try:
+        cp(
+            src,
+            dest,
+            progress=progress,
+            verbose=verbose,
+            expand_globs=not no_glob,
+            cores=cores,
+            chunk_size_mib=chunk_size_mib,
+        )
+    finally:
+        if is_remote_path(dest):
+            completion_cache.invalidate()
 
 
 @latch.command("mv")
@@ -1082,7 +1126,10 @@ def mv(src: str, dest: str, no_glob: bool):
 
     from latch_cli.services.move import move
 
-    move(src, dest, no_glob=no_glob)
+    try:
+        move(src, dest, no_glob=no_glob)
+    finally:
+        completion_cache.invalidate()
 
 
 @latch.command("ls")
@@ -1093,32 +1140,90 @@ def mv(src: str, dest: str, no_glob: bool):
     is_flag=True,
     default=False,
 )
+@click.option(
+    "--recursive", "-R", help="List subdirectories recursively.", is_flag=True
+)
+@click.option(
+    "--unsorted",
+    "-U",
+    help="Print entries as they are fetched instead of sorting them by name.",
+    is_flag=True,
+)
+@click.option(
+    "--json",
+    "json_lines",
+    help="Print one JSON object per entry instead of a table.",
+    is_flag=True,
+)
 @click.argument("paths", nargs=-1, shell_complete=remote_complete)
 @requires_login
-def ls(paths: tuple[str], group_directories_first: bool):
+def ls(
+    paths: tuple[str],
+    group_directories_first: bool,
+    recursive: bool,
+    unsorted: bool,
+    json_lines: bool,
+):
     """List the contents of a Latch Data directory"""
 
     crash_handler.message = f"Unable to display contents of {paths}"
     crash_handler.pkg_root = str(Path.cwd())
 
-    from latch_cli.services.ls import ls
+    from latch_cli.services.ls import ls_many
 
     # If the user doesn't provide any arguments, default to root
     if len(paths) == 0:
         paths = ("/",)
 
-    for path in paths:
-        if len(paths) > 1:
-            click.echo(f"{path}:")
+    ls_many(
+        paths,
+        group_directories_first=group_directories_first,
+        recursive=recursive,
+        unsorted=unsorted,
+        json_lines=json_lines,
+    )
 
-        ls(path, group_directories_first=group_directories_first)
 
-        if len(paths) > 1:
-            click.echo("")
+@latch.command("du")
+@click.option(
+    "--max-depth",
+    "-d",
+    help="Print sizes of descendants at most this many levels below each path.",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "--human-readable",
+    "-h",
+    help="Print sizes with SI suffixes (e.g. 1.5G) instead of in bytes.",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--sort",
+    help="Print the largest entries first.",
+    is_flag=True,
+    default=False,
+)
+@click.argument("paths", nargs=-1, shell_complete=remote_complete)
+@requires_login
+def du(paths: tuple[str], max_depth: int, human_readable: bool, sort: bool):
+    """Print the recursive sizes of Latch Data directories and their children"""
+
+    crash_handler.message = f"Unable to compute sizes of {paths}"
+    crash_handler.pkg_root = str(Path.cwd())
+
+    from latch_cli.services.du import du
+
+    if len(paths) == 0:
+        paths = ("/",)
+
+    du(paths, max_depth=max_depth, human_readable=human_readable, sort=sort)
 
 
 @latch.command("rmr")
-@click.argument("remote_path", nargs=1, type=str)
+@click.argument("remote_path", nargs=1, type=str, shell_complete=remote_complete)
 @click.option(
     "-y",
     "--yes",
@@ -1151,11 +1256,16 @@ def rmr(remote_path: str, yes: bool, no_glob: bool, verbose: bool):
 
     from latch_cli.services.rm import rmr
 
-    rmr(remote_path, skip_confirmation=yes, no_glob=no_glob, verbose=verbose)
+    try:
+        rmr(remote_path, skip_confirmation=yes, no_glob=no_glob, verbose=verbose)
+    finally:
+        completion_cache.invalidate()
 
 
 @latch.command("mkdirp")
-@click.argument("remote_directory", nargs=1, type=str)
+@click.argument(
+    "remote_directory", nargs=1, type=str, shell_complete=remote_complete
+)
 @requires_login
 def mkdir(remote_directory: str):
     """Creates a new remote directory."""
@@ -1164,7 +1274,10 @@ def mkdir(remote_directory: str):
 
     from latch_cli.services.mkdir import mkdirp
 
-    mkdirp(remote_directory)
+    try:
+        mkdirp(remote_directory)
+    finally:
+        completion_cache.invalidate()
 
 
 @latch.command("sync")
@@ -1185,20 +1298,71 @@ def mkdir(remote_directory: str):
     default=False,
 )
 @click.option("--cores", help="Number of cores to use for parallel syncing.", type=int)
+@click.option(
+    "--progress",
+    help="Type of progress information to show while uploading",
+    type=EnumChoice(_Progress, case_sensitive=False),
+    default="tasks",
+    show_default=True,
+)
+@click.option(
+    "--chunk-size-mib",
+    help="Manually specify the upload chunk size in MiB. Must be >= 5",
+    type=int,
+)
+@click.option(
+    "--no-state",
+    help=(
+        "Do not use or update the local record of previously synced files. Every"
+        " directory is compared with the destination."
+    ),
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--watch",
+    help=(
+        "After the initial sync, keep watching the local sources and upload files"
+        " as they change."
+    ),
+    is_flag=True,
+    default=False,
+)
 @requires_login
 def sync(
     srcs: list[str],
     dst: str,
     delete: bool,
     ignore_unsyncable: bool,
+    progress: _Progress,
+    no_state: bool,
+    watch: bool,
     cores: Optional[int] = None,
+    chunk_size_mib: Optional[int] = None,
 ):
-    """Update the contents of a remote directory with local data."""
+    """Update the contents of a directory with data from local or Latch Data sources.
+
+    Local sources are uploaded to a remote destination and remote sources are
+    downloaded to a local destination. Only new or modified files are copied.
+
+    When uploading, files and directories that are unchanged since the last sync
+    of the same sources and destination are not compared with the destination
+    again.
+    """
     from latch_cli.services.sync import sync
 
-    # todo(maximsmol): remote -> local
     # todo(maximsmol): remote -> remote
-    sync(srcs, dst, delete=delete, ignore_unsyncable=ignore_unsyncable, cores=cores)
+    sync(
+        srcs,
+        dst,
+        delete=delete,
+        ignore_unsyncable=ignore_unsyncable,
+        cores=cores,
+        progress=progress,
+        chunk_size_mib=chunk_size_mib,
+        use_state=not no_state,
+        watch=watch,
+    )
 
 
 """
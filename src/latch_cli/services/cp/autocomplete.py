@@ -7,10 +7,7 @@ from typing import List
 import click
 import click.shell_completion as sc
 
-from latch_cli.services.cp.utils import (
-    _get_immediate_children_of_node,
-    _get_known_domains_for_account,
-)
+from latch_cli.services.cp import completion_cache
 
 cache = lru_cache(maxsize=None)
 completion_type = re.compile(
@@ -29,6 +26,30 @@ completion_type = re.compile(
 )
 
 
+# the GraphQL client is only imported on a cache miss to keep completion fast
+def _cached_children(path: str) -> List[str]:
+    key = f"children:{path}"
+    res = completion_cache.get(key)
+    if res is None:
+        from latch_cli.services.cp.utils import _get_immediate_children_of_node
+
+        res = _get_immediate_children_of_node(path)
+        completion_cache.put(key, res)
+
+    return res
+
+
+def _cached_domains() -> List[str]:
+    res = completion_cache.get("domains")
+    if res is None:
+        from latch_cli.services.cp.utils import _get_known_domains_for_account
+
+        res = _get_known_domains_for_account()
+        completion_cache.put("domains", res)
+
+    return res
+
+
 def complete(
     ctx: click.Context,
     param: click.Argument,
@@ -95,7 +116,7 @@ def _complete_remote_path(match: re.Match) -> List[sc.CompletionItem]:
     if not parent_path.startswith("latch"):
         parent_path = f"latch{parent_path}"
 
-    children = _get_immediate_children_of_node(parent_path)
+    children = _cached_children(parent_path)
 
     res: List[sc.CompletionItem] = []
     for child in children:
@@ -112,7 +133,7 @@ def _complete_domain(match: re.Match) -> List[sc.CompletionItem]:
     stub = match["domain"]
 
     res: List[sc.CompletionItem] = []
-    for d in _get_known_domains_for_account():
+    for d in _cached_domains():
         x = f"://{d}/"
         if not d.startswith(stub):
             continue
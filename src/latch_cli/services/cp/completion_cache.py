@@ -0,0 +1,89 @@
+"""On-disk cache for remote path completion.
+
+Shells start a new `latch` process for every completion request, so in-memory
+caches never hit. Directory listings and known domains are instead stored in
+one SQLite database per workspace under `~/.latch/completion-cache/` and reused
+for `default_ttl` seconds. Commands that modify Latch Data clear the cache.
+
+Only depends on the standard library and `latch_sdk_config` so that it can be
+imported by the completion entry point without loading the rest of the SDK.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from latch_sdk_config.user import user_config
+
+default_ttl = 60.0
+
+_schema = """
+    create table if not exists entries (
+        key text primary key,
+        fetched real not null,
+        value text not null
+    )
+"""
+
+
+def _cache_dir() -> Path:
+    return user_config.root / "completion-cache"
+
+
+def _connect() -> sqlite3.Connection:
+    workspace_id = user_config.workspace_id
+    if workspace_id == "":
+        workspace_id = "default"
+
+    p = _cache_dir() / f"{workspace_id}.sqlite"
+    p.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(p, timeout=1)
+    conn.execute(_schema)
+    return conn
+
+
+def get(key: str, *, ttl: float = default_ttl) -> Optional[List[str]]:
+    """Return the cached value of `key` if it was stored less than `ttl` seconds ago."""
+
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "select fetched, value from entries where key = ?", (key,)
+            ).fetchone()
+    except (OSError, ValueError, sqlite3.Error):
+        # completion must never fail because of the cache
+        return None
+
+    if row is None or time.time() - row[0] > ttl:
+        return None
+
+    return json.loads(row[1])
+
+
+def put(key: str, value: List[str]) -> None:
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "insert or replace into entries values (?, ?, ?)",
+                (key, time.time(), json.dumps(value)),
+            )
+    except (OSError, ValueError, sqlite3.Error):
+        pass
+
+
+def invalidate() -> None:
+    """Forget every cached entry, in all workspaces.
+
+    Paths such as `latch://123.account/` can be reached from any workspace, so
+    clearing only the current one could leave stale listings behind.
+    """
+
+    try:
+        for p in _cache_dir().glob("*.sqlite"):
+            p.unlink()
+    except OSError:
+        pass
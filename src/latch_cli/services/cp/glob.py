@@ -1,25 +1,190 @@
+"""Expansion of glob patterns in remote paths.
+
+Every path component can use `*`, `?` and character classes (`[abc]`, `[!abc]`)
+with `fnmatch` semantics, and a component that is exactly `**` matches any
+number of directories, including none. Components before the first wildcard
+are used as-is. Below that, every directory that can contain a match is listed
+once. All the directories at the same depth are listed concurrently, and their
+queries are merged by the query batcher.
+
+If nothing matches, the pattern is tried as a literal path so that names such
+as `sample[1].txt` can be used without escaping.
+"""
+
 import re
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from fnmatch import translate
+from typing import Dict, List, Optional, Pattern, Set, Tuple
 
-from latch_cli.services.cp.utils import _get_immediate_children_of_node
-from latch_cli.utils import urljoins
+from latch_sdk_gql.batch import batching
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute
 
+_dir_types = {"DIR", "ACCOUNT_ROOT", "MOUNT", "MOUNT_GCP", "MOUNT_AZURE"}
 
-def expand_pattern(remote_path: str) -> List[str]:
-    parent, pattern = tuple(remote_path.rsplit("/", 1))
+_magic = re.compile(r"[*?[]")
+_root = re.compile(r"^(latch://[^/]*/|/)?(.*)$")
 
-    if "*" not in pattern:
-        return [remote_path]
+_children_query = parse_document("""
+    query LatchCLIGlob($argPath: String!) {
+        ldataResolvePathData(argPath: $argPath) {
+            finalLinkTarget {
+                childLdataTreeEdges(filter: {child: {removed: {equalTo: false}}}) {
+                    nodes {
+                        child {
+                            name
+                            type
+                            finalLinkTarget {
+                                type
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+""")
+
+
+class NoMatchesError(ValueError): ...
+
+
+@dataclass(frozen=True)
+class _Child:
+    name: str
+    is_dir: bool
+    is_link: bool
+
+
+def _has_magic(x: str) -> bool:
+    return _magic.search(x) is not None
 
-    pattern_re = re.compile(re.escape(pattern).replace(r"\*", r".*"))
 
-    children = _get_immediate_children_of_node(parent)
+def _join(path: str, name: str) -> str:
+    if path == "" or path.endswith("/"):
+        return f"{path}{name}"
 
-    res: List[str] = []
-    for child in children:
-        if not pattern_re.match(child):
+    return f"{path}/{name}"
+
+
+def _list_children(path: str) -> List[_Child]:
+    data = execute(_children_query, {"argPath": path})["ldataResolvePathData"]
+    if data is None:
+        return []
+
+    res: List[_Child] = []
+    for node in data["finalLinkTarget"]["childLdataTreeEdges"]["nodes"]:
+        child = node["child"]
+        if child is None:
             continue
 
-        res.append(urljoins(parent, child))
+        res.append(
+            _Child(
+                name=child["name"],
+                is_dir=child["finalLinkTarget"]["type"] in _dir_types,
+                is_link=child["type"] == "LINK",
+            )
+        )
 
     return res
+
+
+def expand_pattern(remote_path: str, *, max_concurrency: int = 16) -> List[str]:
+    """Return the paths matching `remote_path`, sorted.
+
+    Paths without wildcards are returned as-is, whether or not they exist. A
+    trailing `/` only matches directories. `**` does not descend into links so
+    that the expansion cannot loop.
+
+    Raises `NoMatchesError` if nothing matches and `remote_path` does not exist
+    as a literal path either.
+
+    >>> expand_pattern("latch:///runs/*/fastq/**/*.fq.gz")
+    ['latch:///runs/a/fastq/1.fq.gz', 'latch:///runs/b/fastq/lane1/2.fq.gz']
+    """
+
+    root, rest = _root.match(remote_path).groups()
+    parts = rest.split("/")
+
+    if not any(_has_magic(x) for x in parts):
+        return [remote_path]
+
+    dir_only = parts[-1] == ""
+    if dir_only:
+        parts = parts[:-1]
+
+    first = next(i for i, x in enumerate(parts) if _has_magic(x))
+    start = root or ""
+    for x in parts[:first]:
+        start = _join(start, x)
+
+    matchers: List[Optional[Pattern[str]]] = [
+        None if x == "**" else re.compile(translate(x)) for x in parts
+    ]
+    last = len(parts) - 1
+
+    res: Set[str] = set()
+    seen: Set[Tuple[str, int]] = set()
+    frontier: List[Tuple[str, int]] = []
+
+    def add(path: str, i: int) -> None:
+        if (path, i) in seen:
+            return
+
+        seen.add((path, i))
+        frontier.append((path, i))
+
+        if matchers[i] is None and i < last:
+            # `**` matching no directories
+            add(path, i + 1)
+
+    add(start, first)
+
+    listings: Dict[str, "Future[List[_Child]]"] = {}
+    with (
+        batching(),
+        ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="latch-glob"
+        ) as pool,
+    ):
+        while len(frontier) > 0:
+            cur = frontier
+            frontier = []
+
+            for path, _ in cur:
+                if path not in listings:
+                    listings[path] = pool.submit(_list_children, path)
+
+            for path, i in cur:
+                matcher = matchers[i]
+                for child in listings[path].result():
+                    child_path = _join(path, child.name)
+
+                    if matcher is None:
+                        if child.is_dir and not child.is_link:
+                            add(child_path, i)
+                    elif matcher.match(child.name) is None:
+                        continue
+                    elif i < last:
+                        if child.is_dir:
+                            add(child_path, i + 1)
+                        continue
+
+                    if i == last and (child.is_dir or not dir_only):
+                        res.add(child_path)
+
+    if len(res) == 0:
+        parent = root or ""
+        for x in parts[:-1]:
+            parent = _join(parent, x)
+
+        if not any(
+            x.name == parts[-1] and (x.is_dir or not dir_only)
+            for x in _list_children(parent)
+        ):
+            raise NoMatchesError(f"no matches for {remote_path}")
+
+        return [remote_path]
+
+    return sorted(res)
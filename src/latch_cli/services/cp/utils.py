@@ -5,7 +5,7 @@ try:
 except ImportError:
     from functools import lru_cache as cache
 
-import gql
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
 
 
@@ -28,7 +28,7 @@ class LdataResolvePathData(TypedDict):
 @cache
 def _get_immediate_children_of_node(path: str) -> List[str]:
     lrpd: LdataResolvePathData = execute(
-        gql.gql("""
+        parse_document("""
             query MyQuery($argPath: String!) {
                 ldataResolvePathData(argPath: $argPath) {
                     childLdataTreeEdges(
@@ -106,7 +106,7 @@ class AccountInfoCurrent(TypedDict):
 # suggestions
 @cache
 def _get_known_domains_for_account() -> List[str]:
-    aic: AccountInfoCurrent = execute(gql.gql("""
+    aic: AccountInfoCurrent = execute(parse_document("""
         query DomainCompletionQuery {
             accountInfoCurrent {
                 userInfoByAccountId {
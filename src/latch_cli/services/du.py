@@ -0,0 +1,329 @@
+"""Service to report the recursive sizes of remote directories.
+
+Directories are listed breadth-first up to the requested depth, with sibling
+listings merged by the query batcher. The size of a listed directory is the sum
+of its children, so `ldataGetSubtreeSizeRecursive` is only requested for the
+directories at the deepest listed level, using aliased queries sent
+concurrently. Subtree sizes are cached by node ID for the rest of the process.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import click
+from graphql import DocumentNode
+from latch_sdk_gql.batch import batching
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute
+
+from latch.ldata.type import LDataNodeType
+from latch_cli.services.ls import _join, _recursable_types
+from latch_cli.utils import with_si_suffix
+from latch_cli.utils.path import normalize_path
+
+_node_fields = """
+    id
+    type
+    ldataObjectMeta {
+        contentSize
+    }
+"""
+
+_list_query = parse_document(f"""
+    query LatchCLIDu($argPath: String!, $first: Int!, $after: Cursor) {{
+        ldataResolvePathData(argPath: $argPath) {{
+            finalLinkTarget {{
+                {_node_fields}
+                childLdataTreeEdges(
+                    filter: {{
+                        child: {{
+                            removed: {{equalTo: false}},
+                            pending: {{equalTo: false}}
+                        }}
+                    }}
+                    first: $first
+                    after: $after
+                ) {{
+                    pageInfo {{
+                        hasNextPage
+                        endCursor
+                    }}
+                    nodes {{
+                        child {{
+                            name
+                            {_node_fields}
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+""")
+
+_subtree_sizes: Dict[str, int] = {}
+_subtree_sizes_lock = threading.Lock()
+
+
+def _sizes_query(count: int) -> DocumentNode:
+    var_defs = ", ".join(f"$n{i}: BigInt!" for i in range(count))
+    selections = "\n".join(
+        f"n{i}: ldataGetSubtreeSizeRecursive(argNodeId: $n{i})" for i in range(count)
+    )
+
+    # only depends on `count` so the parsed document is usually cached
+    return parse_document(f"query LatchCLIDuSizes({var_defs}) {{ {selections} }}")
+
+
+@dataclass
+class _Entry:
+    path: str
+    depth: int
+    type: LDataNodeType
+    node_id: str
+    size: Optional[int] = None
+    children: Optional[List["_Entry"]] = None
+
+
+@dataclass
+class _Listing:
+    type: LDataNodeType
+    node_id: str
+    size: Optional[int]
+    children: List[Dict] = field(default_factory=list)
+
+
+def _content_size(node: Dict) -> Optional[int]:
+    meta = node["ldataObjectMeta"]
+    if meta is None or meta["contentSize"] is None:
+        return None
+
+    return int(meta["contentSize"])
+
+
+def _list(path: str, *, page_size: int, children: bool = True) -> Optional[_Listing]:
+    res: Optional[_Listing] = None
+    after: Optional[str] = None
+    while True:
+        data = execute(
+            _list_query, {"argPath": path, "first": page_size, "after": after}
+        )["ldataResolvePathData"]
+        if data is None:
+            return None
+
+        flt = data["finalLinkTarget"]
+        if res is None:
+            res = _Listing(
+                type=LDataNodeType(flt["type"].lower()),
+                node_id=flt["id"],
+                size=_content_size(flt),
+            )
+
+        edges = flt["childLdataTreeEdges"]
+        res.children.extend(
+            x["child"] for x in edges["nodes"] if x["child"] is not None
+        )
+
+        if not children or not edges["pageInfo"]["hasNextPage"]:
+            return res
+
+        after = edges["pageInfo"]["endCursor"]
+
+
+def _fetch_subtree_sizes(
+    node_ids: List[str], *, batch_size: int, max_concurrency: int
+) -> Dict[str, int]:
+    with _subtree_sizes_lock:
+        res = {x: _subtree_sizes[x] for x in node_ids if x in _subtree_sizes}
+
+    missing = list(dict.fromkeys(x for x in node_ids if x not in res))
+
+    def fetch(batch: List[str]) -> Dict[str, int]:
+        data = execute(
+            _sizes_query(len(batch)), {f"n{i}": id for i, id in enumerate(batch)}
+        )
+        return {
+            id: int(data[f"n{i}"])
+            for i, id in enumerate(batch)
+            if data[f"n{i}"] is not None
+        }
+
+    with ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="latch-du"
+    ) as pool:
+        for fetched in pool.map(
+            fetch,
+            (missing[i : i + batch_size] for i in range(0, len(missing), batch_size)),
+        ):
+            res.update(fetched)
+
+    with _subtree_sizes_lock:
+        _subtree_sizes.update(res)
+
+    return res
+
+
+def _total(entry: _Entry) -> Optional[int]:
+    if entry.children is None:
+        return entry.size
+
+    total = 0
+    for child in entry.children:
+        size = _total(child)
+        if size is not None:
+            total += size
+
+    entry.size = total
+    return total
+
+
+def _expand(entry: _Entry, listing: _Listing, *, max_depth: int) -> List[_Entry]:
+    """Add the children of `entry` from `listing`. Returns the ones to list next."""
+
+    if entry.type not in _recursable_types or entry.depth >= max_depth:
+        return []
+
+    res: List[_Entry] = []
+    entry.children = []
+    for child in listing.children:
+        typ = LDataNodeType(child["type"].lower())
+
+        size: Optional[int] = None
+        if typ == LDataNodeType.obj:
+            size = _content_size(child)
+        elif typ == LDataNodeType.link:
+            size = 0
+
+        x = _Entry(
+            _join(entry.path, child["name"]), entry.depth + 1, typ, child["id"], size
+        )
+        entry.children.append(x)
+
+        if typ in _recursable_types and x.depth < max_depth:
+            res.append(x)
+
+    return res
+
+
+def _post_order(entry: _Entry) -> Iterator[_Entry]:
+    if entry.children is not None:
+        for child in sorted(entry.children, key=lambda x: x.path):
+            yield from _post_order(child)
+
+    yield entry
+
+
+def du(
+    paths: Sequence[str],
+    *,
+    max_depth: int = 1,
+    human_readable: bool = False,
+    sort: bool = False,
+    page_size: int = 1000,
+    batch_size: int = 100,
+    max_concurrency: int = 16,
+):
+    """Prints the recursive size of remote paths and their descendants.
+
+    Args:
+        paths: Valid remote paths
+        max_depth: Print descendants at most this many levels below each path
+        human_readable: Print sizes with SI suffixes instead of in bytes
+        sort: Print the largest entries first instead of in path order
+        page_size: Number of children requested at a time
+        batch_size: Number of subtree sizes requested per query
+        max_concurrency: Number of queries in flight at a time
+
+    Links are listed with a size of zero and are not followed, except when
+    they are one of `paths`.
+
+    Examples:
+        >>> du(["latch:///runs"])
+            # Prints the size of every child of runs, then of runs itself
+        >>> du(["latch:///runs"], max_depth=0, human_readable=True)
+            # Prints the size of runs only, e.g. `1.5G`
+    """
+    paths = [x if x != "" else "/" for x in paths]
+    normalized = [normalize_path(x, assume_remote=True) for x in paths]
+
+    roots: List[_Entry] = []
+    have_errors = False
+
+    with (
+        batching(),
+        ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="latch-du"
+        ) as pool,
+    ):
+        listings = list(
+            pool.map(
+                lambda x: _list(x, page_size=page_size, children=max_depth > 0),
+                normalized,
+            )
+        )
+
+        frontier: List[_Entry] = []
+        for path, listing in zip(normalized, listings):
+            if listing is None:
+                click.secho(f"`{path}`: no such file or directory", fg="red")
+                have_errors = True
+                continue
+
+            root = _Entry(path, 0, listing.type, listing.node_id, listing.size)
+            roots.append(root)
+
+            # the roots were listed while resolving them
+            frontier.extend(_expand(root, listing, max_depth=max_depth))
+
+        while len(frontier) > 0:
+            cur = pool.map(lambda x: _list(x.path, page_size=page_size), frontier)
+
+            nxt: List[_Entry] = []
+            for entry, listing in zip(frontier, cur):
+                if listing is None:
+                    # removed while listing, its subtree size is requested instead
+                    continue
+
+                nxt.extend(_expand(entry, listing, max_depth=max_depth))
+
+            frontier = nxt
+
+    # only directories that were not listed need their subtree size
+    unlisted: List[_Entry] = []
+    stack = list(roots)
+    while len(stack) > 0:
+        entry = stack.pop()
+        if entry.children is not None:
+            stack.extend(entry.children)
+        elif entry.type in _recursable_types:
+            unlisted.append(entry)
+
+    sizes = _fetch_subtree_sizes(
+        [x.node_id for x in unlisted],
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+    )
+    for entry in unlisted:
+        entry.size = sizes.get(entry.node_id)
+
+    entries: List[_Entry] = []
+    for root in roots:
+        _total(root)
+        entries.extend(_post_order(root))
+
+    if sort:
+        entries.sort(key=lambda x: -1 if x.size is None else x.size, reverse=True)
+
+    for entry in entries:
+        if entry.size is None:
+            size_str = "-"
+        elif human_readable:
+            size_str = with_si_suffix(entry.size, suffix="")
+        else:
+            size_str = str(entry.size)
+
+        click.echo(f"{size_str}\t{entry.path}")
+
+    if have_errors:
+        raise click.exceptions.Exit(1)
@@ -1,7 +1,7 @@
 import asyncio
 import base64
 import json
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from dataclasses import dataclass
 from json.decoder import JSONDecodeError
 from typing import Any, Literal, Optional, Union, get_args, get_origin
@@ -10,7 +10,6 @@ from urllib.parse import urljoin
 import dill
 import flyteidl.core.literals_pb2 as pb
 import google.protobuf.json_format as gpjson
-import gql
 from flyteidl.core import interface_pb2 as _interface_pb2
 from flytekit.core.context_manager import FlyteContextManager
 from flytekit.core.promise import translate_inputs_to_literals
@@ -25,7 +24,8 @@ from latch_cli.services.launch.interface import get_workflow_interface
 from latch_cli.services.launch.type_converter import convert_inputs_to_literals
 from latch_cli.utils import get_auth_header
 from latch_sdk_config.latch import NUCLEUS_URL, config
-from latch_sdk_gql.execute import execute
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute, execute_async
 
 ExecutionStatus = Literal[
     "UNDEFINED",
@@ -93,7 +93,7 @@ def get_ingress_data(
     flytedb_id: Optional[str], execution_id: Optional[str]
 ) -> list[LPath]:
     query_res: dict[str, Any] = execute(
-        gql.gql(
+        parse_document(
             """
             query ExecutionIngressTag($flytedbId: BigInt, $executionId: BigInt) {
                 ldataNodeEvents(
@@ -134,6 +134,20 @@ def get_ingress_data(
     return res
 
 
+_execution_status_query = parse_document(
+    """
+    query GetExecutionStatus($executionId: BigInt!) {
+        executionInfo(id: $executionId) {
+            id
+            flytedbId
+            status
+            outputsUrl
+        }
+    }
+    """
+)
+
+
 @dataclass(frozen=True)
 class CompletedExecution:
     id: str
@@ -153,36 +167,39 @@ class Execution:
     def poll(self) -> Generator[None, Any, None]:
         while True:
             res: dict[str, Any] = execute(
-                gql.gql(
-                    """
-                    query GetExecutionStatus($executionId: BigInt!) {
-                        executionInfo(id: $executionId) {
-                            id
-                            flytedbId
-                            status
-                            outputsUrl
-                        }
-                    }
-                    """
-                ),
-                {"executionId": self.id},
+                _execution_status_query, {"executionId": self.id}
             )
+            self._update_status(res)
 
-            execution_info = res.get("executionInfo", {})
-            self.status = execution_info.get("status", "UNDEFINED")
-            self.outputs_url = execution_info.get("outputsUrl")
-            self.flytedb_id = execution_info.get("flytedbId")
+            yield
+
+    async def poll_async(self) -> AsyncGenerator[None, Any]:
+        while True:
+            res: dict[str, Any] = await execute_async(
+                _execution_status_query, {"executionId": self.id}
+            )
+            self._update_status(res)
 
             yield
 
+    def _update_status(self, res: dict[str, Any]) -> None:
+        execution_info = res.get("executionInfo", {})
+        self.status = execution_info.get("status", "UNDEFINED")
+        self.outputs_url = execution_info.get("outputsUrl")
+        self.flytedb_id = execution_info.get("flytedbId")
+
     async def wait(self) -> Union[CompletedExecution, None]:
-        for _ in self.poll():
+        async for _ in self.poll_async():
             if self.status == "SUCCEEDED" and self.outputs_url is not None:
                 return CompletedExecution(
                     id=self.id,
-                    output=process_output(self.outputs_url, self.python_outputs),
-                    ingress_data=get_ingress_data(
-                        flytedb_id=self.flytedb_id, execution_id=self.id
+                    output=await asyncio.to_thread(
+                        process_output, self.outputs_url, self.python_outputs
+                    ),
+                    ingress_data=await asyncio.to_thread(
+                        get_ingress_data,
+                        flytedb_id=self.flytedb_id,
+                        execution_id=self.id,
                     ),
                     status=self.status,
                 )
@@ -191,8 +208,10 @@ class Execution:
                 return CompletedExecution(
                     id=self.id,
                     output={},
-                    ingress_data=get_ingress_data(
-                        flytedb_id=self.flytedb_id, execution_id=self.id
+                    ingress_data=await asyncio.to_thread(
+                        get_ingress_data,
+                        flytedb_id=self.flytedb_id,
+                        execution_id=self.id,
                     ),
                     status=self.status,
                 )
@@ -255,7 +274,7 @@ def launch_from_launch_plan(
     ).variables
 
     lp_default_resp: dict[str, Any] = execute(
-        gql.gql(
+        parse_document(
             """
             query LaunchPlanDefaultInputs($workflowId: BigInt!, $namePattern: String!) {
                 lpInfos(
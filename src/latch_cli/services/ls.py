@@ -1,14 +1,29 @@
 """Service to list files in a remote directory."""
 
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from textwrap import dedent
-from typing import List, Optional, TypedDict
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import click
 import dateutil.parser as dp
-import gql
+import graphql.language as l
+from latch_sdk_gql.batch import batching
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import execute
+from latch_sdk_gql.utils import _name_node, _parse_selection
 
 from latch.ldata.type import LDataNodeType
 from latch_cli.click_utils import bold
@@ -31,11 +46,18 @@ class _Node(TypedDict):
     child: _Child
 
 
+class _PageInfo(TypedDict):
+    hasNextPage: bool
+    endCursor: Optional[str]
+
+
 class _ChildLdataTreeEdges(TypedDict):
+    pageInfo: _PageInfo
     nodes: List[_Node]
 
 
 class _FinalLinkTarget(TypedDict):
+    type: str
     childLdataTreeEdges: _ChildLdataTreeEdges
 
 
@@ -54,13 +76,286 @@ class _Row:
     modify_time: Optional[datetime]
 
 
-def ls(path: str, *, group_directories_first: bool = False):
+_ls_selection = """
+    {
+        name
+        ldataObjectMeta {
+            modifyTime
+            contentSize
+        }
+        type
+        finalLinkTarget {
+            type
+            childLdataTreeEdges(
+                filter: {
+                    child: {
+                        removed: { equalTo: false },
+                        pending: { equalTo: false }
+                    }
+                }
+                first: $first
+                after: $after
+            ) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                nodes {
+                    child {
+                        name
+                        ldataObjectMeta {
+                            modifyTime
+                            contentSize
+                        }
+                        type
+                    }
+                }
+            }
+        }
+    }
+"""
+
+_ls_query = parse_document(f"""
+    query LdataLs($argPath: String!, $first: Int!, $after: Cursor) {{
+        ldataResolvePathData(argPath: $argPath) {_ls_selection}
+    }}
+""")
+
+# links are not followed so recursion cannot loop
+_recursable_types = {
+    LDataNodeType.account_root,
+    LDataNodeType.dir,
+    LDataNodeType.mount,
+    LDataNodeType.mount_gcp,
+    LDataNodeType.mount_azure,
+}
+
+
+def _join(path: str, name: str) -> str:
+    if path.endswith("/"):
+        return f"{path}{name}"
+
+    return f"{path}/{name}"
+
+
+def _row(child: Union[_Child, _LdataResolvePathData]) -> _Row:
+    meta = child["ldataObjectMeta"]
+    size = modify_time = None
+    if meta is not None:
+        if meta["contentSize"] is not None:
+            size = int(meta["contentSize"])
+        if meta["modifyTime"] is not None:
+            modify_time = dp.isoparse(meta["modifyTime"])
+
+    return _Row(
+        name=child["name"],
+        type=LDataNodeType(child["type"].lower()),
+        size=size,
+        modify_time=modify_time,
+    )
+
+
+def _fetch_page(
+    path: str, *, page_size: int, after: Optional[str] = None
+) -> Optional[_LdataResolvePathData]:
+    return execute(_ls_query, {"argPath": path, "first": page_size, "after": after})[
+        "ldataResolvePathData"
+    ]
+
+
+def _fetch_first_pages(
+    paths: List[str], *, page_size: int
+) -> Tuple[str, List[Optional[_LdataResolvePathData]]]:
+    """Request the first page of every path in `paths` in a single query.
+
+    Returns the current account ID along with the pages, in order.
+    """
+
+    acc_sel = _parse_selection("""
+        accountInfoCurrent {
+            id
+        }
+    """)
+    assert isinstance(acc_sel, l.FieldNode)
+
+    sels: List[l.FieldNode] = [acc_sel]
+
+    for i, path in enumerate(paths):
+        sel = _parse_selection(f"ldataResolvePathData(argPath: {{}}) {_ls_selection}")
+        assert isinstance(sel, l.FieldNode)
+
+        val = l.StringValueNode()
+        val.value = path
+
+        args = l.ArgumentNode()
+        args.name = _name_node("argPath")
+        args.value = val
+
+        sel.alias = _name_node(f"q{i}")
+        sel.arguments = (args,)
+
+        sels.append(sel)
+
+    sel_set = l.SelectionSetNode()
+    sel_set.selections = tuple(sels)
+
+    doc = l.parse("""
+        query LdataLsMany($first: Int!, $after: Cursor) {
+            placeholder
+        }
+    """)
+
+    assert len(doc.definitions) == 1
+    query = doc.definitions[0]
+
+    assert isinstance(query, l.OperationDefinitionNode)
+    query.selection_set = sel_set
+
+    res = execute(doc, {"first": page_size, "after": None})
+
+    return res["accountInfoCurrent"]["id"], [res[f"q{i}"] for i in range(len(paths))]
+
+
+def _iter_pages(
+    path: str,
+    *,
+    page_size: int,
+    first: Optional[Callable[[], Optional[_LdataResolvePathData]]] = None,
+) -> Iterator[Tuple[str, List[_Row]]]:
+    """Yield the children of `path` one page at a time, with their parent path.
+
+    A node that is not a directory is yielded as its own only child. Raises
+    `FileNotFoundError` if the path does not exist.
+    """
+
+    after: Optional[str] = None
+    while True:
+        if first is not None:
+            res = first()
+            first = None
+        else:
+            res = _fetch_page(path, page_size=page_size, after=after)
+
+        if res is None:
+            raise FileNotFoundError(path)
+
+        if after is None and LDataNodeType(res["type"].lower()) == LDataNodeType.obj:
+            # ls object should just display the object's info
+            yield path.rstrip("/").rsplit("/", 1)[0], [_row(res)]
+            return
+
+        edges = res["finalLinkTarget"]["childLdataTreeEdges"]
+        yield path, [_row(node["child"]) for node in edges["nodes"]]
+
+        if not edges["pageInfo"]["hasNextPage"]:
+            return
+
+        after = edges["pageInfo"]["endCursor"]
+
+
+def _echo_not_found(path: str, normalized_path: str, acc_id: Optional[str] = None):
+    if acc_id is None:
+        acc_id = execute(
+            parse_document("""
+                query LdataLsAccount {
+                    accountInfoCurrent {
+                        id
+                    }
+                }
+            """)
+        )["accountInfoCurrent"]["id"]
+
+    click.secho(
+        dedent(f"""
+        {bold(path)}: no such directory.
+
+        Resolved to: {bold(normalized_path)}
+
+        {bold("Check that:")}
+        1. The target directory exists,
+        2. Account {bold(acc_id)} has permissions to view the target directory, and
+        3. The correct workspace is selected.
+
+        For privacy reasons, non-viewable objects and non-existent objects are indistinguishable.
+        """).strip("\n"),
+        fg="red",
+    )
+
+
+def _echo_header():
+    headers = [
+        "  " + click.style("Size", underline=True),
+        click.style("Date Modified", underline=True),
+        click.style("Name", underline=True),
+    ]
+
+    click.echo(" ".join(headers))
+
+
+def _echo_row(row: _Row):
+    mt_str = f'{"-": <13}'
+    size_str = f'{"-": >6}'
+    if row.type == LDataNodeType.obj:
+        if row.modify_time is not None:
+            mt_str = click.style(
+                f'{row.modify_time.strftime("%d %b %H:%M"): <13}', fg="blue"
+            )
+
+        if row.size is not None:
+            size_str = with_si_suffix(row.size, suffix="")
+            size_str = click.style(f"{size_str: >6}", fg="bright_green")
+
+    name_str = row.name
+    if len(name_str) > 50:
+        name_str = f"{name_str[:47]}..."
+
+    if row.type != LDataNodeType.obj:
+        color = "bright_blue"
+        if row.type == LDataNodeType.link:
+            color = "bright_magenta"
+
+        name_str = click.style(f"{name_str}/", bold=True, fg=color)
+
+    click.echo(f"{size_str} {mt_str} {name_str}")
+
+
+def _echo_json(path: str, row: _Row):
+    click.echo(
+        json.dumps({
+            "path": path,
+            "name": row.name,
+            "type": row.type.value,
+            "size": row.size,
+            "modify_time": (
+                row.modify_time.isoformat() if row.modify_time is not None else None
+            ),
+        })
+    )
+
+
+def ls(
+    path: str,
+    *,
+    group_directories_first: bool = False,
+    recursive: bool = False,
+    unsorted: bool = False,
+    json_lines: bool = False,
+    page_size: int = 1000,
+    prefetch: int = 8,
+):
     """Lists the children of a remote directory in Latch.
 
     Args:
         path: A valid remote path
         group_directories_first: Option to display directories/links before
             objects
+        recursive: List subdirectories recursively, depth first
+        unsorted: Print each page of children as soon as it arrives instead of
+            sorting the whole directory first
+        json_lines: Print one JSON object per entry instead of a table
+        page_size: Number of children requested at a time
+        prefetch: Number of upcoming directories to request ahead of time when
+            listing recursively
 
     This function will list all of the entites under the remote directory
     specified in the path `path`. Will error if the path is invalid
@@ -71,131 +366,184 @@ def ls(path: str, *, group_directories_first: bool = False):
             # Lists all entities in the user's root directory
         >>> ls("latch:///dir1/dir2/dir_name")
             # Lists all entities inside dir1/dir2/dir_name
+        >>> ls("latch:///dir1", recursive=True, json_lines=True)
+            # Prints every entity under dir1 as line-delimited JSON
     """
     if path == "":
         path = "/"
 
-    normalized_path = normalize_path(path, assume_remote=True)
-
-    query = execute(
-        gql.gql("""
-            query LdataInfo ($argPath: String!) {
-                accountInfoCurrent {
-                    id
-                }
-                ldataResolvePathData(argPath: $argPath) {
-                    name
-                    ldataObjectMeta {
-                        modifyTime
-                        contentSize
-                    }
-                    type
-                    finalLinkTarget {
-                        childLdataTreeEdges(filter: {
-                            child: {
-                                removed: { equalTo: false },
-                                pending: { equalTo: false }
-                            }
-                        }) {
-                            nodes {
-                                child {
-                                    name
-                                    ldataObjectMeta {
-                                        modifyTime
-                                        contentSize
-                                    }
-                                    type
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        """),
-        {"argPath": normalized_path},
+    _ls(
+        path,
+        normalize_path(path, assume_remote=True),
+        group_directories_first=group_directories_first,
+        recursive=recursive,
+        unsorted=unsorted,
+        json_lines=json_lines,
+        page_size=page_size,
+        prefetch=prefetch,
     )
 
-    res: Optional[_LdataResolvePathData] = query["ldataResolvePathData"]
-    acc_id: str = query["accountInfoCurrent"]["id"]
 
-    if res is None:
-        click.secho(
-            dedent(f"""
-            {bold(path)}: no such directory.
-
-            Resolved to: {bold(normalized_path)}
-
-            {bold("Check that:")}
-            1. The target directory exists,
-            2. Account {bold(acc_id)} has permissions to view the target directory, and
-            3. The correct workspace is selected.
-
-            For privacy reasons, non-viewable objects and non-existent objects are indistinguishable.
-            """).strip("\n"),
-            fg="red",
-        )
-        raise click.exceptions.Exit(1)
-
-    nodes = res["finalLinkTarget"]["childLdataTreeEdges"]["nodes"]
-    if LDataNodeType(res["type"].lower()) == LDataNodeType.obj:
-        # ls object should just display the object's info
-        nodes.append({"child": res})
-
-    rows: List[_Row] = []
-    for node in nodes:
-        child = node["child"]
-
-        meta = child["ldataObjectMeta"]
-        size = modify_time = None
-        if meta is not None:
-            if meta["contentSize"] is not None:
-                size = int(meta["contentSize"])
-            if meta["modifyTime"] is not None:
-                modify_time = dp.isoparse(meta["modifyTime"])
-
-        rows.append(
-            _Row(
-                name=child["name"],
-                type=LDataNodeType(child["type"].lower()),
-                size=size,
-                modify_time=modify_time,
+def ls_many(
+    paths: Sequence[str],
+    *,
+    group_directories_first: bool = False,
+    recursive: bool = False,
+    unsorted: bool = False,
+    json_lines: bool = False,
+    page_size: int = 1000,
+    prefetch: int = 8,
+    batch_size: int = 50,
+):
+    """Lists the children of several remote directories in Latch, in order.
+
+    The first page of every path is requested up front using one aliased query
+    per `batch_size` paths instead of one query per path. Each path is printed
+    under a `path:` header unless there is only one, the listing is recursive
+    (which prints its own headers) or the output is JSON.
+
+    Paths that do not exist are reported and skipped, as are the paths of a
+    batch whose query failed. The command exits with a non-zero status after
+    listing the rest.
+
+    See `ls` for the remaining arguments.
+    """
+    paths = [x if x != "" else "/" for x in paths]
+    normalized = [normalize_path(x, assume_remote=True) for x in paths]
+    multiple = len(paths) > 1
+    failed = False
+
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="latch-ls") as pool:
+        batches = [
+            pool.submit(
+                _fetch_first_pages, normalized[i : i + batch_size], page_size=page_size
             )
-        )
-
-    rows.sort(key=lambda row: row.name)
-    if group_directories_first:
-        rows.sort(key=lambda row: 1 if row.type == LDataNodeType.obj else 0)
-
-    headers = [
-        "  " + click.style("Size", underline=True),
-        click.style("Date Modified", underline=True),
-        click.style("Name", underline=True),
-    ]
-
-    click.echo(" ".join(headers))
-
-    for row in rows:
-        mt_str = f'{"-": <13}'
-        size_str = f'{"-": >6}'
-        if row.type == LDataNodeType.obj:
-            if row.modify_time is not None:
-                mt_str = click.style(
-                    f'{row.modify_time.strftime("%d %b %H:%M"): <13}', fg="blue"
+            for i in range(0, len(normalized), batch_size)
+        ]
+
+        for i, path in enumerate(paths):
+            if multiple and not recursive and not json_lines:
+                click.echo(f"{path}:")
+
+            try:
+                try:
+                    acc_id, pages = batches[i // batch_size].result()
+                except Exception as e:
+                    click.secho(f"{path}: failed to list directory: {e}", fg="red")
+                    raise click.exceptions.Exit(1) from e
+
+                _ls(
+                    path,
+                    normalized[i],
+                    first=lambda page=pages[i % batch_size]: page,
+                    acc_id=acc_id,
+                    group_directories_first=group_directories_first,
+                    recursive=recursive,
+                    unsorted=unsorted,
+                    json_lines=json_lines,
+                    page_size=page_size,
+                    prefetch=prefetch,
                 )
+            except click.exceptions.Exit:
+                failed = True
 
-            if row.size is not None:
-                size_str = with_si_suffix(row.size, suffix="")
-                size_str = click.style(f"{size_str: >6}", fg="bright_green")
+            if multiple and not json_lines:
+                click.echo("")
 
-        name_str = row.name
-        if len(name_str) > 50:
-            name_str = f"{name_str[:47]}..."
+    if failed:
+        raise click.exceptions.Exit(1)
 
-        if row.type != LDataNodeType.obj:
-            color = "bright_blue"
-            if row.type == LDataNodeType.link:
-                color = "bright_magenta"
 
-            name_str = click.style(f"{name_str}/", bold=True, fg=color)
+def _ls(
+    path: str,
+    normalized_path: str,
+    *,
+    first: Optional[Callable[[], Optional[_LdataResolvePathData]]] = None,
+    acc_id: Optional[str] = None,
+    group_directories_first: bool,
+    recursive: bool,
+    unsorted: bool,
+    json_lines: bool,
+    page_size: int,
+    prefetch: int,
+):
+    stack: List[str] = [normalized_path]
+    prefetched: Dict[str, Callable[[], Optional[_LdataResolvePathData]]] = {}
+    if first is not None:
+        prefetched[normalized_path] = first
+
+    with batching(), ThreadPoolExecutor(
+        max_workers=max(prefetch, 1), thread_name_prefix="latch-ls"
+    ) as pool:
+        first_dir = True
+        while len(stack) > 0:
+            if recursive:
+                for x in stack[-prefetch:]:
+                    if x not in prefetched:
+                        prefetched[x] = pool.submit(
+                            _fetch_page, x, page_size=page_size
+                        ).result
+
+            cur = stack.pop()
+            pages = _iter_pages(
+                cur, page_size=page_size, first=prefetched.pop(cur, None)
+            )
 
-        click.echo(f"{size_str} {mt_str} {name_str}")
+            def echo_headers():
+                if json_lines:
+                    return
+
+                if recursive:
+                    if not first_dir:
+                        click.echo("")
+                    click.echo(f"{cur}:")
+
+                _echo_header()
+
+            subdirs: List[str] = []
+            try:
+                if unsorted:
+                    for i, (parent, page) in enumerate(pages):
+                        if i == 0:
+                            echo_headers()
+
+                        for row in page:
+                            _echo_entry(parent, row, json_lines=json_lines)
+                            if row.type in _recursable_types:
+                                subdirs.append(_join(parent, row.name))
+                else:
+                    parent = cur
+                    rows: List[_Row] = []
+                    for parent, page in pages:
+                        rows.extend(page)
+
+                    rows.sort(key=lambda row: row.name)
+                    if group_directories_first:
+                        rows.sort(
+                            key=lambda row: 1 if row.type == LDataNodeType.obj else 0
+                        )
+
+                    echo_headers()
+
+                    for row in rows:
+                        _echo_entry(parent, row, json_lines=json_lines)
+                        if row.type in _recursable_types:
+                            subdirs.append(_join(parent, row.name))
+            except FileNotFoundError:
+                if not first_dir:
+                    # removed while listing
+                    continue
+
+                _echo_not_found(path, normalized_path, acc_id)
+                raise click.exceptions.Exit(1)
+
+            first_dir = False
+            if recursive:
+                stack.extend(reversed(subdirs))
+
+
+def _echo_entry(dir_path: str, row: _Row, *, json_lines: bool):
+    if json_lines:
+        _echo_json(_join(dir_path, row.name), row)
+    else:
+        _echo_row(row)
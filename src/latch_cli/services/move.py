@@ -7,7 +7,7 @@ from latch_sdk_gql.execute import execute
 
 from latch.ldata._transfer.node import get_node_data as _get_node_data
 from latch.ldata.type import LDataNodeType
-from latch_cli.services.cp.glob import expand_pattern
+from latch_cli.services.cp.glob import NoMatchesError, expand_pattern
 from latch_cli.utils.path import get_name_from_path, get_path_error, is_remote_path
 
 
@@ -28,11 +28,11 @@ def move(
     if no_glob:
         srcs = [src]
     else:
-        srcs = expand_pattern(src)
-
-    if len(srcs) == 0:
-        click.echo(f"Could not find any files that match pattern {src}. Exiting.")
-        raise click.exceptions.Exit(0)
+        try:
+            srcs = expand_pattern(src)
+        except NoMatchesError as e:
+            click.secho(str(e), fg="red")
+            raise click.exceptions.Exit(1) from e
 
     try:
         node_data = _get_node_data(*srcs, dest, allow_resolve_to_parent=True)
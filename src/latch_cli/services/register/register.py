@@ -17,6 +17,7 @@ from scp import SCPClient
 
 import latch_sdk_gql.execute as l_gql
 from latch.utils import current_workspace, get_workspaces
+from latch_cli import tracing
 from latch_cli.centromere.ctx import _CentromereCtx
 from latch_cli.centromere.utils import MaybeRemoteDir
 from latch_cli.constants import latch_constants
@@ -231,10 +232,11 @@ def _build_and_serialize(
     log.debug("_build_and_serialize")
     assert ctx.pkg_root is not None
 
-    image_build_logs = build_image(ctx, image_name, context_path, dockerfile)
-    print_and_write_build_logs(
-        image_build_logs, image_name, ctx.pkg_root, progress_plain=progress_plain
-    )
+    with tracing.span("register: docker build"):
+        image_build_logs = build_image(ctx, image_name, context_path, dockerfile)
+        print_and_write_build_logs(
+            image_build_logs, image_name, ctx.pkg_root, progress_plain=progress_plain
+        )
 
     if ctx.workflow_type == WorkflowType.snakemake:
         from ...snakemake.serialize import (
@@ -245,15 +247,19 @@ def _build_and_serialize(
         assert sm_jit_wf is not None and isinstance(sm_jit_wf, JITRegisterWorkflow)
         assert ctx.dkr_repo is not None
 
-        serialize_jit_register_workflow(sm_jit_wf, tmp_dir, image_name, ctx.dkr_repo)
+        with tracing.span("register: serialize"):
+            serialize_jit_register_workflow(
+                sm_jit_wf, tmp_dir, image_name, ctx.dkr_repo
+            )
     else:
-        serialize_logs, container_id = serialize_pkg_in_container(
-            ctx, image_name, tmp_dir, ctx.workflow_name
-        )
-        print_serialize_logs(serialize_logs, image_name)
+        with tracing.span("register: serialize"):
+            serialize_logs, container_id = serialize_pkg_in_container(
+                ctx, image_name, tmp_dir, ctx.workflow_name
+            )
+            print_serialize_logs(serialize_logs, image_name)
 
-        assert ctx.dkr_client is not None
-        exit_status = ctx.dkr_client.wait(container_id)
+            assert ctx.dkr_client is not None
+            exit_status = ctx.dkr_client.wait(container_id)
         if exit_status["StatusCode"] != 0:
             click.secho("\nWorkflow failed to serialize", fg="red", bold=True)
             if "TypeTransformerFailedError" in "".join(serialize_logs):
@@ -284,8 +290,9 @@ def _build_and_serialize(
         ctx.dkr_client.remove_container(container_id)
 
     click.echo()
-    upload_image_logs = upload_image(ctx, image_name)
-    print_upload_logs(upload_image_logs, image_name)
+    with tracing.span("register: docker push"):
+        upload_image_logs = upload_image(ctx, image_name)
+        print_upload_logs(upload_image_logs, image_name)
 
 
 def _recursive_list(directory: Path) -> List[Path]:
@@ -603,9 +610,10 @@ def register(
                         f"{container.dockerfile} given to {task_name} is invalid.",
                     ) from e
 
-            reg_resp = register_serialized_pkg(
-                protos, ctx.token, ctx.version, workspace_id
-            )
+            with tracing.span("register: upload protos"):
+                reg_resp = register_serialized_pkg(
+                    protos, ctx.token, ctx.version, workspace_id
+                )
             _print_reg_resp(reg_resp, ctx.default_container.image_name)
 
             click.secho("Successfully registered workflow.", fg="green", bold=True)
@@ -4,7 +4,7 @@ from latch_sdk_gql.execute import execute
 
 from latch.ldata._transfer.node import get_node_data as _get_node_data
 from latch.ldata.path import LatchPathError
-from latch_cli.services.cp.glob import expand_pattern
+from latch_cli.services.cp.glob import NoMatchesError, expand_pattern
 
 
 def rmr(
@@ -41,12 +41,11 @@ def rmr(
             Will throw an error, as this operation tries to remove a file
             that doesn't exist.
     """
-    to_remove = [remote_path] if no_glob else expand_pattern(remote_path)
-    if len(to_remove) == 0:
-        click.echo(
-            f"Could not find any files that match pattern {remote_path}",
-        )
-        return
+    try:
+        to_remove = [remote_path] if no_glob else expand_pattern(remote_path)
+    except NoMatchesError as e:
+        click.secho(str(e), fg="red")
+        raise click.exceptions.Exit(1) from e
 
     msg = (
         "Remove the following file(s)?\n" + "\n".join(to_remove)
@@ -1,67 +1,263 @@
+import contextlib
+import itertools
 import os
+import queue
 import stat
 import sys
-from concurrent.futures import ProcessPoolExecutor
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import click
 import dateutil.parser as dp
-import gql
 from gql.transport.exceptions import TransportQueryError
+from latch_sdk_gql.batch import batching
+from latch_sdk_gql.documents import parse_document
 from latch_sdk_gql.execute import JsonValue, execute
 
 import latch.ldata._transfer.upload as _upl
+from latch.ldata._transfer.manager import TransferStateManager
+from latch.ldata._transfer.progress import Progress
 from latch.ldata._transfer.utils import get_max_workers
+from latch_cli.services.sync_state import FileState, SyncManifest, default_state_path
 from latch_cli.utils.path import is_remote_path, normalize_path
 
 
-def upload_file(src: Path, dest: str):
-    start = _upl.start_upload(src, dest)
-    if start is None:
-        return
+def _stat_src(p: Path) -> Tuple[Optional[Tuple[Path, os.stat_result]], Optional[str]]:
+    try:
+        p_stat = os.stat(p)
+    except FileNotFoundError:
+        return None, f"`{p}`: no such file or directory"
 
-    parts: List[_upl.CompletedPart] = []
-    for idx, url in enumerate(start.urls):
-        parts.append(
-            _upl.upload_file_chunk(
-                src,
-                url,
-                idx,
-                start.part_size,
-            )
-        )
+    if not stat.S_ISREG(p_stat.st_mode) and not stat.S_ISDIR(p_stat.st_mode):
+        return None, f"`{p}`: not a regular file"
 
-    _upl.end_upload(dest, start.upload_id, parts)
+    return (p, p_stat), None
 
 
 def check_src(p: Path, *, indent: str = "") -> Optional[Tuple[Path, os.stat_result]]:
-    try:
-        p_stat = os.stat(p)
-    except FileNotFoundError:
-        click.secho(indent + f"`{p}`: no such file or directory", fg="red", bold=True)
-        return
+    res, err = _stat_src(p)
+    if err is not None:
+        click.secho(indent + err, fg="red", bold=True)
 
-    if not stat.S_ISREG(p_stat.st_mode) and not stat.S_ISDIR(p_stat.st_mode):
-        click.secho(indent + f"`{p}`: not a regular file", fg="red", bold=True)
-        return
+    return res
 
-    return (p, p_stat)
 
+_output_lock = threading.Lock()
 
-def sync_rec(
+
+class _DirLog:
+    """Buffers the output for one directory so concurrent directories do not interleave."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def secho(self, msg: str, **styles) -> None:
+        self.lines.append(click.style(msg, **styles))
+
+    def echo(self, msg: str) -> None:
+        self.lines.append(msg)
+
+    def flush(self) -> None:
+        if len(self.lines) == 0:
+            return
+
+        with _output_lock:
+            click.echo("\n".join(self.lines))
+
+        self.lines = []
+
+
+@dataclass(frozen=True)
+class _DirJob:
+    dest: str
+    level: int
+
+    srcs: Optional[Dict[str, Tuple[Path, os.stat_result]]] = None
+    """Sources to sync into `dest`. Scanned from `src_dir` if not set."""
+    src_dir: Optional[Path] = None
+    src_stat: Optional[os.stat_result] = None
+
+    dest_missing: bool = False
+    """The parent was just found to not have `dest` so there is nothing to query."""
+
+
+def _child_dest(dest: str, name: str) -> str:
+    if dest[-1] == "/":
+        return f"{dest}{name}"
+
+    return f"{dest}/{name}"
+
+
+class _SyncPlan:
+    """Uploads found while visiting directories.
+
+    Upload jobs are handed to the uploader as soon as their directory has been
+    compared with the destination. The files and directories to record in the
+    manifest are collected and only recorded once the uploads have finished.
+    """
+
+    def __init__(self, manifest: Optional[SyncManifest]) -> None:
+        self.manifest = manifest
+        self.num_uploads = 0
+
+        self._queue: "queue.Queue[Optional[_upl.UploadJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._uploaded: List[FileState] = []
+        self._dirs: List[Tuple[Path, str, os.stat_result, List[Path]]] = []
+
+    def upload(self, p: Path, p_stat: os.stat_result, dest: str) -> None:
+        with self._lock:
+            self.num_uploads += 1
+            if self.manifest is not None:
+                # the remote node is looked up by path the next time the
+                # directory is verified
+                self._uploaded.append(
+                    FileState(
+                        path=str(p),
+                        dest=dest,
+                        size=p_stat.st_size,
+                        mtime_ns=p_stat.st_mtime_ns,
+                        inode=p_stat.st_ino,
+                    )
+                )
+
+        self._queue.put(_upl.UploadJob(p, dest))
+
+    def finish(self) -> None:
+        """Signal that no more uploads will be added."""
+
+        self._queue.put(None)
+
+    def uploads(self) -> Iterator[_upl.UploadJob]:
+        """Yield upload jobs as they are found until `finish` is called."""
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            yield job
+
+    def dir_done(
+        self, p: Path, dest: str, p_stat: os.stat_result, uploads: List[Path]
+    ) -> None:
+        """Record `p` as in sync once all of its `uploads` succeed."""
+
+        with self._lock:
+            self._dirs.append((p, dest, p_stat, uploads))
+
+    def record(
+        self, errors: Dict[Path, BaseException], versions: Dict[Path, str]
+    ) -> None:
+        if self.manifest is None:
+            return
+
+        files: List[FileState] = []
+        for x in self._uploaded:
+            p = Path(x.path)
+            if p in errors:
+                continue
+
+            try:
+                # the file may have changed while it was being uploaded
+                if os.stat(p).st_mtime_ns != x.mtime_ns:
+                    continue
+            except OSError:
+                continue
+
+            files.append(replace(x, version_id=versions.get(p)))
+
+        self.manifest.put_files(files)
+
+        for p, dest, p_stat, uploads in self._dirs:
+            if any(x in errors for x in uploads):
+                continue
+
+            self.manifest.put_dir(p, dest, p_stat)
+
+
+def _file_state(
+    p: Path,
+    p_stat: os.stat_result,
+    dest: str,
+    child: Dict,
+) -> FileState:
+    meta = child["finalLinkTarget"].get("ldataObjectMeta")
+    return FileState(
+        path=str(p),
+        dest=dest,
+        size=p_stat.st_size,
+        mtime_ns=p_stat.st_mtime_ns,
+        inode=p_stat.st_ino,
+        node_id=str(child["id"]),
+        version_id=None if meta is None else meta["versionId"],
+    )
+
+
+def _is_unchanged(
+    job: _DirJob,
     srcs: Dict[str, Tuple[Path, os.stat_result]],
+    known: Dict[str, FileState],
+    manifest: SyncManifest,
+) -> bool:
+    assert job.src_dir is not None and job.src_stat is not None
+
+    # entries are only added or removed if the directory mtime changes but
+    # files can be modified in place so they are compared one by one
+    if not manifest.dir_matches(job.src_dir, job.dest, job.src_stat):
+        return False
+
+    files: List[FileState] = []
+    for name, (_, p_stat) in srcs.items():
+        if stat.S_ISDIR(p_stat.st_mode):
+            continue
+
+        cur = known.get(name)
+        if cur is None or not cur.matches(_child_dest(job.dest, name), p_stat):
+            return False
+
+        files.append(cur)
+
+    # only the files of visited directories are checked against the remote
+    return len(manifest.verify_remote(files)) == 0
+
+
+def _scan_dir(
+    p: Path, log: _DirLog, *, indent: str
+) -> Dict[str, Tuple[Path, os.stat_result]]:
+    res: Dict[str, Tuple[Path, os.stat_result]] = {}
+    with os.scandir(p) as it:
+        for entry in it:
+            x = Path(entry.path)
+            cur, err = _stat_src(x)
+            if err is not None:
+                # todo(maximsmol): pre-check or confirm?
+                log.secho(indent + err, fg="red", bold=True)
+                continue
+
+            assert cur is not None
+            res[entry.name] = cur
+
+    return res
+
+
+def _resolve_dest(
     dest: str,
+    srcs: Dict[str, Tuple[Path, os.stat_result]],
     *,
-    delete: bool,
-    level: int = 0,
-    executor: ProcessPoolExecutor,
-):
-    # rsync never deletes from the top level destination
-    delete_effective = delete and level > 0
-    indent = "  " * level
-
+    delete_effective: bool,
+) -> Optional[Dict]:
+    dest_data = None
     try:
         query = """
             query LatchCLISync($argPath: String! ${name_filter_arg}) {
@@ -84,6 +280,9 @@ def sync_rec(
                                     name
                                     finalLinkTarget {
                                         type
+                                        ldataObjectMeta {
+                                            versionId
+                                        }
                                         ldataNodeEvents(
                                             condition: {type: INGRESS},
                                             orderBy: TIME_DESC,
@@ -112,7 +311,7 @@ def sync_rec(
             query = query.replace("${name_filter}", "")
 
         resolve_data = execute(
-            gql.gql(query),
+            parse_document(query),
             args,
         )["ldataResolvePathData"]
 
@@ -127,24 +326,92 @@ def sync_rec(
 
         raise
 
+    return dest_data
+
+
+def _sync_dir(job: _DirJob, *, delete: bool, plan: _SyncPlan) -> List[_DirJob]:
+    log = _DirLog()
+    try:
+        return _sync_dir_inner(job, log, delete=delete, plan=plan)
+    finally:
+        log.flush()
+
+
+def _sync_dir_inner(
+    job: _DirJob, log: _DirLog, *, delete: bool, plan: _SyncPlan
+) -> List[_DirJob]:
+    dest = job.dest
+    level = job.level
+
+    # rsync never deletes from the top level destination
+    delete_effective = delete and level > 0
+    indent = "  " * level
+
+    srcs = job.srcs
+    if srcs is None:
+        assert job.src_dir is not None
+        srcs = _scan_dir(job.src_dir, log, indent=indent)
+
+    children: List[_DirJob] = []
+
+    manifest = plan.manifest
+    known: Dict[str, FileState] = {}
+    if manifest is not None and job.src_dir is not None:
+        known = manifest.files_in(job.src_dir)
+
+        # extraneous remote files can only be found by listing the destination
+        if (
+            not delete_effective
+            and not job.dest_missing
+            and job.src_stat is not None
+            and _is_unchanged(job, srcs, known, manifest)
+        ):
+            num_files = 0
+            for name, (p, p_stat) in srcs.items():
+                if not stat.S_ISDIR(p_stat.st_mode):
+                    num_files += 1
+                    continue
+
+                children.append(
+                    _DirJob(
+                        _child_dest(dest, name),
+                        level + 1,
+                        src_dir=p,
+                        src_stat=p_stat,
+                    )
+                )
+
+            log.secho(
+                indent
+                + f"Skipping unmodified: {job.src_dir}/ ({num_files} files)",
+                dim=True,
+            )
+            return children
+
+    dest_data = None
+    if not job.dest_missing:
+        dest_data = _resolve_dest(dest, srcs, delete_effective=delete_effective)
+
     if len(srcs) == 0:
         if dest_data is not None:
             if dest_data["type"] != "DIR":
-                click.secho(
+                log.secho(
                     indent + f"`{dest}` is in the way of a directory",
                     fg="red",
                 )
-                return
+                return children
 
-            click.secho(indent + "Empty directory", dim=True)
-            return
+            log.secho(indent + "Empty directory", dim=True)
+            if job.src_dir is not None and job.src_stat is not None:
+                plan.dir_done(job.src_dir, dest, job.src_stat, [])
+            return children
 
         if not dest[-1] == "/":
             dest += "/"
 
-        click.secho(indent + "Creating empty directory", fg="bright_blue")
+        log.secho(indent + "Creating empty directory", fg="bright_blue")
         execute(
-            gql.gql("""
+            parse_document("""
                 mutation LatchCLISyncMkdir($argPath: String!) {
                     ldataMkdirp(input: {argPath: $argPath}) {
                         clientMutationId
@@ -153,20 +420,20 @@ def sync_rec(
             """),
             {"argPath": dest},
         )
-        return
+        return children
 
     if (
         (len(srcs) > 1 or stat.S_ISDIR(list(srcs.values())[0][1].st_mode))
         and dest_data is not None
         and dest_data["type"] not in {"DIR", "ACCOUNT_ROOT"}
     ):
-        click.secho(f"`{dest}` is not a directory", fg="red", bold=True)
-        click.secho("\nOnly a single file can be synced with a file", fg="red")
+        log.secho(f"`{dest}` is not a directory", fg="red", bold=True)
+        log.secho("\nOnly a single file can be synced with a file", fg="red")
         sys.exit(1)
 
     if dest_data is not None and dest_data["type"] not in {"DIR", "ACCOUNT_ROOT"}:
         # todo(maximsmol): implement
-        click.secho(
+        log.secho(
             "Syncing single files is currently not supported", bold=True, fg="red"
         )
         sys.exit(1)
@@ -180,15 +447,14 @@ def sync_rec(
         else {}
     )
 
+    complete = True
+    uploads: List[Path] = []
+    in_sync: List[FileState] = []
     for name, (p, p_stat) in srcs.items():
         is_dir = stat.S_ISDIR(p_stat.st_mode)
 
         child = dest_children_by_name.get(name)
-
-        if dest[-1] == "/":
-            child_dest = f"{dest}{name}"
-        else:
-            child_dest = f"{dest}/{name}"
+        child_dest = _child_dest(dest, name)
 
         skip = False
         verb = "Uploading"
@@ -197,18 +463,20 @@ def sync_rec(
             flt = child["finalLinkTarget"]
             if flt["type"] == "DIR" and not is_dir:
                 # todo(maximsmol): confirm? pre-check?
-                click.secho(
+                log.secho(
                     indent + f"`{dest}` is in the way of a file",
                     fg="red",
                 )
+                complete = False
                 continue
 
             if flt["type"] != "DIR" and is_dir:
                 # todo(maximsmol): confirm? pre-check?
-                click.secho(
+                log.secho(
                     indent + f"`{dest}` is in the way of a directory",
                     fg="red",
                 )
+                complete = False
                 continue
 
             if flt["type"] == "OBJ":
@@ -240,7 +508,7 @@ def sync_rec(
             fg = None
             dim = True
 
-        click.echo(
+        log.echo(
             click.style(
                 indent + verb + " ",
                 fg=fg,
@@ -265,21 +533,34 @@ def sync_rec(
             )
         )
         if skip:
+            assert child is not None
+
+            in_sync.append(_file_state(p, p_stat, child_dest, child))
             continue
 
         if is_dir:
-            sub_srcs: Dict[str, Tuple[Path, os.stat_result]] = {}
-            for x in p.iterdir():
-                res = check_src(x, indent=indent + "  ")
-                if res is None:
-                    # todo(maximsmol): pre-check or confirm?
-                    continue
-
-                sub_srcs[x.name] = res
-            sync_rec(sub_srcs, child_dest, delete=delete, level=level + 1, executor=executor)
+            children.append(
+                _DirJob(
+                    child_dest,
+                    level + 1,
+                    src_dir=p,
+                    src_stat=p_stat,
+                    dest_missing=child is None,
+                )
+            )
             continue
 
-        executor.submit(upload_file, p, child_dest)
+        plan.upload(p, p_stat, child_dest)
+        uploads.append(p)
+
+    if manifest is not None:
+        if job.src_dir is not None:
+            manifest.forget_dir(job.src_dir, keep=set(srcs.keys()))
+
+        manifest.put_files(in_sync)
+
+        if complete and job.src_dir is not None and job.src_stat is not None:
+            plan.dir_done(job.src_dir, dest, job.src_stat, uploads)
 
     if delete_effective:
         for name, child in dest_children_by_name.items():
@@ -287,11 +568,11 @@ def sync_rec(
             if name in srcs:
                 continue
 
-            click.echo(
+            log.echo(
                 indent + click.style("Removing extraneous: ", fg="yellow") + child_dest
             )
             execute(
-                gql.gql("""
+                parse_document("""
                     mutation LatchCLISyncRemove($argNodeId: BigInt!) {
                         ldataRmr(input: {argNodeId: $argNodeId}) {
                             clientMutationId
@@ -301,6 +582,171 @@ def sync_rec(
                 {"argNodeId": child["id"]},
             )
 
+    return children
+
+
+def sync_rec(
+    srcs: Dict[str, Tuple[Path, os.stat_result]],
+    dest: str,
+    *,
+    delete: bool,
+    cores: int,
+    progress: Progress,
+    chunk_size_mib: Optional[int] = None,
+    manifest: Optional[SyncManifest] = None,
+    max_concurrency: int = 16,
+) -> Dict[Path, BaseException]:
+    """Sync `srcs` into `dest`, visiting directories breadth-first and concurrently.
+
+    Each directory is scanned and compared against its remote counterpart on
+    one of `max_concurrency` threads. Remote lookups for sibling directories
+    are merged into batched queries. Directories that `manifest` records as
+    unchanged since the last sync are not looked up at all. Files start
+    uploading as soon as their directory has been compared.
+
+    Returns:
+        The first error raised for each file that failed to upload.
+    """
+
+    return _sync_and_upload(
+        [_DirJob(dest, 0, srcs=srcs)],
+        delete=delete,
+        manifest=manifest,
+        cores=cores,
+        progress=progress,
+        chunk_size_mib=chunk_size_mib,
+        max_concurrency=max_concurrency,
+    )
+
+
+def _sync_jobs(
+    jobs: List[_DirJob],
+    *,
+    delete: bool,
+    plan: _SyncPlan,
+    follow: Optional[Callable[[_DirJob], bool]] = None,
+    max_concurrency: int = 16,
+) -> None:
+    # subdirectories are only visited if `follow` accepts them
+    try:
+        with batching(), ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="latch-sync"
+        ) as pool:
+            pending: Set["Future[List[_DirJob]]"] = {
+                pool.submit(_sync_dir, job, delete=delete, plan=plan) for job in jobs
+            }
+
+            while len(pending) > 0:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    for child in fut.result():
+                        if follow is not None and not follow(child):
+                            continue
+
+                        pending.add(
+                            pool.submit(_sync_dir, child, delete=delete, plan=plan)
+                        )
+    finally:
+        plan.finish()
+
+
+def upload_all(
+    uploads: Iterable[_upl.UploadJob],
+    *,
+    cores: int,
+    progress: Progress,
+    chunk_size_mib: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+    man: Optional[TransferStateManager] = None,
+    versions: Optional[Dict[Path, str]] = None,
+) -> Dict[Path, BaseException]:
+    """Upload files with the same multipart machinery as `latch cp`.
+
+    `uploads` may be a generator. Unless `executor` and `man` are given, the
+    worker processes are only started once it produces its first job and are
+    shut down before returning. The version IDs of uploaded files are stored
+    in `versions` if given.
+
+    Returns:
+        The first error raised for each file that failed to upload.
+    """
+
+    it = iter(uploads)
+    first = next(it, None)
+    if first is None:
+        return {}
+
+    with contextlib.ExitStack() as stack:
+        if executor is None:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=cores))
+        if man is None:
+            man = stack.enter_context(TransferStateManager())
+
+        return _upl.upload_jobs(
+            itertools.chain([first], it),
+            executor,
+            man,
+            num_bars=0 if progress == Progress.none else cores,
+            show_progress=progress != Progress.none,
+            show_total_progress=progress != Progress.none,
+            chunk_size_mib=chunk_size_mib,
+            ingress_source=_upl.get_ingress_source(),
+            versions=versions,
+        )
+
+
+def _sync_and_upload(
+    jobs: List[_DirJob],
+    *,
+    delete: bool,
+    manifest: Optional[SyncManifest],
+    cores: int,
+    progress: Progress,
+    chunk_size_mib: Optional[int] = None,
+    follow: Optional[Callable[[_DirJob], bool]] = None,
+    max_concurrency: int = 16,
+    executor: Optional[ProcessPoolExecutor] = None,
+    man: Optional[TransferStateManager] = None,
+) -> Dict[Path, BaseException]:
+    plan = _SyncPlan(manifest)
+    versions: Dict[Path, str] = {}
+
+    # directories are visited on a background thread while this one uploads
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="latch-sync-walk"
+    ) as walker:
+        walk = walker.submit(
+            _sync_jobs,
+            jobs,
+            delete=delete,
+            plan=plan,
+            follow=follow,
+            max_concurrency=max_concurrency,
+        )
+        errors = upload_all(
+            plan.uploads(),
+            cores=cores,
+            progress=progress,
+            chunk_size_mib=chunk_size_mib,
+            executor=executor,
+            man=man,
+            versions=versions,
+        )
+        walk.result()
+
+    plan.record(errors, versions)
+
+    if len(errors) > 0:
+        click.secho(
+            f"\nFailed to upload {len(errors)} of {plan.num_uploads} files:",
+            fg="red",
+            bold=True,
+        )
+        for p, exc in errors.items():
+            click.secho(f"  {p}: {exc}", fg="red")
+
+    return errors
+
 
 def sync(
     srcs_raw: List[str],
@@ -309,12 +755,33 @@ def sync(
     delete: bool,
     ignore_unsyncable: bool,
     cores: Optional[int] = None,
+    progress: Progress = Progress.tasks,
+    chunk_size_mib: Optional[int] = None,
+    use_state: bool = True,
+    watch: bool = False,
 ):
     if not is_remote_path(dest):
-        click.secho(
-            f"`{dest}`: only local -> remote sync is supported", fg="red", bold=True
-        )
-        raise click.exceptions.Exit(1)
+        remote_srcs = [x for x in srcs_raw if is_remote_path(x)]
+        if len(remote_srcs) != len(srcs_raw):
+            click.secho(
+                "Only local -> remote and remote -> local sync is supported",
+                fg="red",
+                bold=True,
+            )
+            raise click.exceptions.Exit(1)
+
+        if watch:
+            click.secho(
+                "`--watch` is only supported for local -> remote sync",
+                fg="red",
+                bold=True,
+            )
+            raise click.exceptions.Exit(1)
+
+        from latch_cli.services.sync_download import sync_download
+
+        sync_download(srcs_raw, dest, delete=delete, cores=cores, progress=progress)
+        return
 
     srcs: Dict[str, Tuple[Path, os.stat_result]] = {}
     have_errors = False
@@ -357,6 +824,41 @@ def sync(
     if cores is None:
         cores = get_max_workers()
 
-    with ProcessPoolExecutor(max_workers=cores) as executor:
-        sync_rec(srcs, normalize_path(dest), delete=delete, executor=executor)
-        executor.shutdown(wait=True)
+    dest = normalize_path(dest)
+
+    manifest: Optional[SyncManifest] = None
+    if use_state:
+        manifest = SyncManifest(
+            default_state_path((p for p, _ in srcs.values()), dest)
+        )
+
+    try:
+        errors = sync_rec(
+            srcs,
+            dest,
+            delete=delete,
+            cores=cores,
+            progress=progress,
+            chunk_size_mib=chunk_size_mib,
+            manifest=manifest,
+        )
+
+        if watch:
+            from latch_cli.services.sync_watch import watch_sync
+
+            watch_sync(
+                srcs,
+                dest,
+                delete=delete,
+                manifest=manifest,
+                cores=cores,
+                progress=progress,
+                chunk_size_mib=chunk_size_mib,
+            )
+            return
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+    if len(errors) > 0:
+        raise click.exceptions.Exit(1)
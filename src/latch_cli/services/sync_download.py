@@ -0,0 +1,412 @@
+"""Remote -> local direction of `latch sync`.
+
+Remote directories are listed breadth-first with one query per directory, and
+sibling lookups are merged by the query batcher. Files are compared using the
+version ID that `LPath.download` stores in the `user.version_id` xattr, then by
+size and modification time. Only differing files are downloaded.
+"""
+
+import os
+import shutil
+import stat
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import click
+import dateutil.parser as dp
+import xattr
+
+from latch.ldata._transfer.download import RemoteDownloadJob, download_jobs
+from latch.ldata._transfer.progress import Progress
+from latch.ldata._transfer.utils import get_max_workers
+from latch_cli.services.sync import _child_dest, _DirLog
+from latch_cli.utils.path import normalize_path
+from latch_sdk_gql.batch import batching
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute
+
+_dir_types = {"DIR", "ACCOUNT_ROOT", "MOUNT", "MOUNT_GCP", "MOUNT_AZURE"}
+_version_xattr = b"user.version_id"
+
+_node_fields = """
+    type
+    ldataObjectMeta {
+        contentSize
+        versionId
+    }
+    ldataNodeEvents(
+        condition: {type: INGRESS},
+        orderBy: TIME_DESC,
+        first: 1
+    ) {
+        nodes {
+            time
+        }
+    }
+"""
+
+_list_query = parse_document(f"""
+    query LatchCLISyncDownload($argPath: String!) {{
+        ldataResolvePathData(argPath: $argPath) {{
+            finalLinkTarget {{
+                {_node_fields}
+                childLdataTreeEdges(
+                    filter: {{
+                        child: {{
+                            removed: {{equalTo: false}},
+                            pending: {{equalTo: false}}
+                        }}
+                    }}
+                ) {{
+                    nodes {{
+                        child {{
+                            name
+                            finalLinkTarget {{
+                                {_node_fields}
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+        }}
+    }}
+""")
+
+
+@dataclass(frozen=True)
+class _RemoteFile:
+    size: Optional[int]
+    version_id: Optional[str]
+    time: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class _DownloadJob:
+    src: str
+    dest: Path
+    remote: _RemoteFile
+
+
+@dataclass(frozen=True)
+class _RemoteDirJob:
+    src: str
+    dest: Path
+    level: int
+
+
+def _remote_file(flt: Dict) -> _RemoteFile:
+    meta = flt["ldataObjectMeta"]
+    events = flt["ldataNodeEvents"]["nodes"]
+
+    return _RemoteFile(
+        size=None
+        if meta is None or meta["contentSize"] is None
+        else int(meta["contentSize"]),
+        version_id=None if meta is None else meta["versionId"],
+        time=None if len(events) == 0 else dp.isoparse(events[0]["time"]),
+    )
+
+
+def _list_remote(src: str) -> Optional[Dict]:
+    data = execute(_list_query, {"argPath": src})["ldataResolvePathData"]
+    if data is None:
+        return None
+
+    return data["finalLinkTarget"]
+
+
+def _local_version(p: Path) -> Optional[str]:
+    if sys.platform == "win32":
+        return None
+
+    try:
+        return xattr.getxattr(str(p), _version_xattr).decode()
+    except OSError:
+        return None
+
+
+def _compare(p: Path, p_stat: os.stat_result, remote: _RemoteFile) -> Tuple[bool, str]:
+    """Decide whether to download `remote` over `p`. Returns the reason as well."""
+
+    local_version = _local_version(p)
+    if local_version is not None and remote.version_id is not None:
+        if local_version == remote.version_id:
+            return False, "unmodified"
+
+        return True, "updated"
+
+    if remote.size is not None and remote.size != p_stat.st_size:
+        return True, "updated"
+
+    if remote.time is None:
+        return True, "updated"
+
+    local_mtime = datetime.fromtimestamp(p_stat.st_mtime).astimezone()
+    if local_mtime == remote.time:
+        return False, "unmodified"
+    if local_mtime > remote.time:
+        return False, "newer"
+
+    return True, "updated"
+
+
+def _remove(p: Path, is_dir: bool) -> None:
+    if is_dir and not p.is_symlink():
+        shutil.rmtree(p)
+    else:
+        p.unlink()
+
+
+def _sync_remote_dir(
+    job: _RemoteDirJob,
+    *,
+    delete: bool,
+    downloads: List[_DownloadJob],
+    listing: Optional[Dict] = None,
+) -> List[_RemoteDirJob]:
+    """Compare the remote directory `job.src` with `job.dest`.
+
+    `listing` is the result of `_list_remote(job.src)` if it was already
+    fetched.
+    """
+
+    log = _DirLog()
+    try:
+        return _sync_remote_dir_inner(
+            job, log, delete=delete, downloads=downloads, listing=listing
+        )
+    finally:
+        log.flush()
+
+
+def _sync_remote_dir_inner(
+    job: _RemoteDirJob,
+    log: _DirLog,
+    *,
+    delete: bool,
+    downloads: List[_DownloadJob],
+    listing: Optional[Dict] = None,
+) -> List[_RemoteDirJob]:
+    indent = "  " * job.level
+    children: List[_RemoteDirJob] = []
+
+    data = listing if listing is not None else _list_remote(job.src)
+    if data is None:
+        log.secho(indent + f"`{job.src}`: no such file or directory", fg="red")
+        return children
+
+    try:
+        job.dest.mkdir(exist_ok=True)
+    except FileExistsError:
+        log.secho(indent + f"`{job.dest}` is in the way of a directory", fg="red")
+        return children
+
+    if not job.dest.is_dir():
+        log.secho(indent + f"`{job.dest}` is in the way of a directory", fg="red")
+        return children
+
+    local: Dict[str, os.stat_result] = {}
+    with os.scandir(job.dest) as it:
+        for entry in it:
+            if entry.name.endswith(".latch-partial"):
+                continue
+
+            try:
+                local[entry.name] = entry.stat()
+            except OSError:
+                # broken symlink
+                local[entry.name] = entry.stat(follow_symlinks=False)
+
+    remote_names: Set[str] = set()
+    for raw in data["childLdataTreeEdges"]["nodes"]:
+        child = raw["child"]
+        if child is None:
+            continue
+
+        name = child["name"]
+        flt = child["finalLinkTarget"]
+        remote_names.add(name)
+
+        src = _child_dest(job.src, name)
+        dest = job.dest / name
+        p_stat = local.get(name)
+
+        if flt["type"] in _dir_types:
+            if p_stat is not None and not stat.S_ISDIR(p_stat.st_mode):
+                log.secho(indent + f"`{dest}` is in the way of a directory", fg="red")
+                continue
+
+            log.echo(
+                click.style(indent + "Syncing ", fg="bright_blue")
+                + click.style(
+                    "existing" if p_stat is not None else "new",
+                    underline=True,
+                    fg="bright_blue",
+                )
+                + click.style(": ", fg="bright_blue")
+                + src
+                + "/"
+                + click.style(" -> ", dim=True)
+                + str(dest)
+            )
+            children.append(_RemoteDirJob(src, dest, job.level + 1))
+            continue
+
+        remote = _remote_file(flt)
+        if p_stat is None:
+            fetch, reason = True, "new"
+        elif stat.S_ISDIR(p_stat.st_mode):
+            log.secho(indent + f"`{dest}` is in the way of a file", fg="red")
+            continue
+        else:
+            fetch, reason = _compare(dest, p_stat, remote)
+
+        if not fetch:
+            log.echo(
+                click.style(indent + "Skipping ", dim=True)
+                + click.style(reason, underline=True, dim=True)
+                + click.style(": " + src, dim=True)
+            )
+            continue
+
+        log.echo(
+            click.style(indent + "Downloading ", fg="bright_blue")
+            + click.style(reason, underline=True, fg="bright_blue")
+            + click.style(": ", fg="bright_blue")
+            + src
+            + click.style(" -> ", dim=True)
+            + str(dest)
+        )
+        downloads.append(_DownloadJob(src, dest, remote))
+
+    # rsync never deletes from the top level destination
+    if delete and job.level > 0:
+        for name, p_stat in local.items():
+            if name in remote_names:
+                continue
+
+            dest = job.dest / name
+            log.echo(
+                indent + click.style("Removing extraneous: ", fg="yellow") + str(dest)
+            )
+            _remove(dest, stat.S_ISDIR(p_stat.st_mode))
+
+    return children
+
+
+def _finish_download(job: _DownloadJob) -> None:
+    # record the remote state so the next sync can skip the file
+    if job.remote.time is not None:
+        mtime = job.remote.time.timestamp()
+        os.utime(job.dest, (mtime, mtime))
+
+    if sys.platform != "win32" and job.remote.version_id is not None:
+        try:
+            xattr.setxattr(
+                str(job.dest), _version_xattr, job.remote.version_id.encode()
+            )
+        except OSError:
+            pass
+
+
+def sync_download(
+    srcs_raw: List[str],
+    dest: str,
+    *,
+    delete: bool,
+    cores: Optional[int] = None,
+    progress: Progress = Progress.tasks,
+    max_concurrency: int = 16,
+):
+    dest_path = Path(dest)
+    if dest_path.exists() and not dest_path.is_dir():
+        click.secho(f"`{dest}` is not a directory", fg="red", bold=True)
+        raise click.exceptions.Exit(1)
+
+    dest_path.mkdir(parents=True, exist_ok=True)
+
+    if cores is None:
+        cores = get_max_workers()
+
+    downloads: List[_DownloadJob] = []
+    have_errors = False
+
+    with (
+        batching(),
+        ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="latch-sync"
+        ) as pool,
+    ):
+        srcs = [normalize_path(x) for x in srcs_raw]
+        tops = list(pool.map(_list_remote, srcs))
+
+        pending: Set["Future[List[_RemoteDirJob]]"] = set()
+        for src, data in zip(srcs, tops):
+            name = src.rstrip("/").rsplit("/", 1)[-1]
+            if data is None:
+                click.secho(f"`{src}`: no such file or directory", fg="red", bold=True)
+                have_errors = True
+                continue
+
+            if data["type"] in _dir_types:
+                pending.add(
+                    pool.submit(
+                        _sync_remote_dir,
+                        _RemoteDirJob(src, dest_path / name, 1),
+                        delete=delete,
+                        downloads=downloads,
+                        listing=data,
+                    )
+                )
+                continue
+
+            p = dest_path / name
+            remote = _remote_file(data)
+            try:
+                fetch, _ = _compare(p, p.stat(), remote)
+            except FileNotFoundError:
+                fetch = True
+
+            if fetch:
+                downloads.append(_DownloadJob(src, p, remote))
+            else:
+                click.secho(f"Skipping unmodified: {src}", dim=True)
+
+        while len(pending) > 0:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for child in fut.result():
+                    pending.add(
+                        pool.submit(
+                            _sync_remote_dir, child, delete=delete, downloads=downloads
+                        )
+                    )
+
+    errors: Dict[Path, BaseException] = {}
+    if len(downloads) > 0:
+        click.echo()
+        errors = download_jobs(
+            [RemoteDownloadJob(x.src, x.dest) for x in downloads],
+            progress=progress,
+            cores=cores,
+        )
+
+    for job in downloads:
+        if job.dest not in errors:
+            _finish_download(job)
+
+    if len(errors) > 0:
+        click.secho(
+            f"\nFailed to download {len(errors)} of {len(downloads)} files:",
+            fg="red",
+            bold=True,
+        )
+        for p, exc in errors.items():
+            click.secho(f"  {p}: {exc}", fg="red")
+
+    if len(errors) > 0 or have_errors:
+        raise click.exceptions.Exit(1)
@@ -0,0 +1,281 @@
+"""Persistent local state for incremental `latch sync`.
+
+The manifest is a SQLite database under `~/.latch/sync-state/` with one file
+per (sources, destination) pair. It records the local stat information and
+remote node of every file known to be in sync, and the stat information of
+every directory whose entries were all in sync after the last run. Directories
+that are unchanged since then are not listed again: only the remote nodes of
+their files are checked.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from typing_extensions import Self
+
+from latch_sdk_config.user import user_config
+from latch_sdk_gql.documents import parse_document
+from latch_sdk_gql.execute import execute
+
+# bump when the tables change, older manifests are discarded
+_schema_version = 2
+
+_schema = """
+    create table if not exists files (
+        path text primary key,
+        parent text not null,
+        dest text not null,
+        size integer not null,
+        mtime_ns integer not null,
+        inode integer not null,
+        node_id text,
+        version_id text
+    );
+    create index if not exists files_parent on files (parent);
+    create index if not exists files_node_id on files (node_id);
+    create table if not exists dirs (
+        path text primary key,
+        dest text not null,
+        mtime_ns integer not null,
+        inode integer not null
+    );
+"""
+
+_resolve_query = parse_document("""
+    query LatchCLISyncResolve($argPaths: [String]!) {
+        fastLdataMultiResolvePath(argPaths: $argPaths)
+    }
+""")
+
+_verify_query = parse_document("""
+    query LatchCLISyncVerify($ids: [BigInt!]!) {
+        ldataNodes(
+            filter: {
+                id: {in: $ids},
+                removed: {equalTo: false},
+                pending: {equalTo: false}
+            }
+        ) {
+            nodes {
+                id
+                finalLinkTarget {
+                    ldataObjectMeta {
+                        versionId
+                    }
+                }
+            }
+        }
+    }
+""")
+
+
+@dataclass(frozen=True)
+class FileState:
+    path: str
+    dest: str
+    size: int
+    mtime_ns: int
+    inode: int
+    node_id: Optional[str] = None
+    version_id: Optional[str] = None
+
+    def matches(self, dest: str, st: os.stat_result) -> bool:
+        return (
+            self.dest == dest
+            and self.size == st.st_size
+            and self.mtime_ns == st.st_mtime_ns
+            and self.inode == st.st_ino
+        )
+
+
+def default_state_path(srcs: Iterable[Path], dest: str) -> Path:
+    key = json.dumps([dest, sorted(str(x.resolve()) for x in srcs)])
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return user_config.root / "sync-state" / f"{digest}.sqlite"
+
+
+class SyncManifest:
+    """Local record of the files and directories in sync with a destination.
+
+    Safe to use from multiple threads.
+
+    Args:
+        path: SQLite database to store the manifest in.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("pragma journal_mode=wal")
+
+        # the manifest is only a cache of what is in sync, so an outdated one is
+        # dropped instead of migrated
+        (version,) = self._conn.execute("pragma user_version").fetchone()
+        if version != _schema_version:
+            self._conn.executescript(
+                "drop table if exists files; drop table if exists dirs;"
+            )
+            self._conn.execute(f"pragma user_version = {_schema_version}")
+
+        self._conn.executescript(_schema)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def dir_matches(self, p: Path, dest: str, st: os.stat_result) -> bool:
+        with self._lock:
+            res = self._conn.execute(
+                "select dest, mtime_ns, inode from dirs where path = ?", (str(p),)
+            ).fetchone()
+
+        return res is not None and tuple(res) == (dest, st.st_mtime_ns, st.st_ino)
+
+    def files_in(self, p: Path) -> Dict[str, FileState]:
+        with self._lock:
+            rows = self._conn.execute(
+                "select path, dest, size, mtime_ns, inode, node_id, version_id"
+                " from files where parent = ?",
+                (str(p),),
+            ).fetchall()
+
+        return {Path(row[0]).name: FileState(*row) for row in rows}
+
+    def put_files(self, files: Iterable[FileState]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "insert or replace into files values (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        x.path,
+                        str(Path(x.path).parent),
+                        x.dest,
+                        x.size,
+                        x.mtime_ns,
+                        x.inode,
+                        x.node_id,
+                        x.version_id,
+                    )
+                    for x in files
+                ),
+            )
+
+    def put_dir(self, p: Path, dest: str, st: os.stat_result) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert or replace into dirs values (?, ?, ?, ?)",
+                (str(p), dest, st.st_mtime_ns, st.st_ino),
+            )
+
+    def forget_dir(self, p: Path, *, keep: Set[str]) -> None:
+        """Forget the directory `p` and its files except the names in `keep`."""
+
+        with self._lock, self._conn:
+            self._conn.execute("delete from dirs where path = ?", (str(p),))
+            rows = self._conn.execute(
+                "select path from files where parent = ?", (str(p),)
+            ).fetchall()
+            self._conn.executemany(
+                "delete from files where path = ?",
+                ((x,) for (x,) in rows if Path(x).name not in keep),
+            )
+
+    def verify_remote(
+        self, files: Iterable[FileState], *, batch_size: int = 1000
+    ) -> List[FileState]:
+        """Forget the `files` that were removed or changed remotely since they were recorded.
+
+        Their directories are forgotten as well so the next sync compares them
+        with the destination again. Only the given files are queried, so
+        callers can restrict verification to the directories they visit.
+
+        Files recorded without their remote node, such as new uploads, are
+        looked up by destination path. Their node and version are recorded so
+        later runs only check the node.
+
+        Returns:
+            The forgotten files.
+        """
+
+        stale: List[FileState] = []
+        by_id: Dict[str, List[FileState]] = {}
+        unresolved: List[FileState] = []
+        for x in files:
+            if x.node_id is None:
+                unresolved.append(x)
+                continue
+
+            by_id.setdefault(x.node_id, []).append(x)
+
+        resolved: Set[str] = set()
+        for i in range(0, len(unresolved), batch_size):
+            batch = unresolved[i : i + batch_size]
+            node_ids = execute(_resolve_query, {"argPaths": [x.dest for x in batch]})[
+                "fastLdataMultiResolvePath"
+            ]
+
+            for x, id in zip(batch, node_ids):
+                if id is None:
+                    stale.append(x)
+                    continue
+
+                resolved.add(x.path)
+                by_id.setdefault(str(id), []).append(replace(x, node_id=str(id)))
+
+        updated: List[FileState] = []
+        ids = list(by_id.keys())
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i : i + batch_size]
+            data = execute(_verify_query, {"ids": batch})["ldataNodes"]["nodes"]
+
+            live: Dict[str, Optional[str]] = {}
+            for x in data:
+                meta = x["finalLinkTarget"]["ldataObjectMeta"]
+                live[str(x["id"])] = None if meta is None else meta["versionId"]
+
+            for id in batch:
+                if id not in live:
+                    stale.extend(by_id[id])
+                    continue
+
+                for x in by_id[id]:
+                    if x.version_id is not None and x.version_id != live[id]:
+                        stale.append(x)
+                    elif x.version_id is None and live[id] is not None:
+                        # empty uploads do not report their version
+                        updated.append(replace(x, version_id=live[id]))
+                    elif x.path in resolved:
+                        updated.append(x)
+
+        self.put_files(updated)
+
+        if len(stale) == 0:
+            return stale
+
+        parents = {str(Path(x.path).parent) for x in stale}
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "delete from files where path = ?", ((x.path,) for x in stale)
+            )
+            self._conn.executemany(
+                "delete from dirs where path = ?", ((x,) for x in parents)
+            )
+
+        return stale
+
+    def __repr__(self):
+        return f"SyncManifest(path={self.path})"
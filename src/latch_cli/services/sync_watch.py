@@ -0,0 +1,242 @@
+"""Continuous local -> remote `latch sync` driven by filesystem events.
+
+Events are grouped into bursts by `watchfiles`, then coalesced into the set of
+directories whose entries changed. A directory is synced once every file
+written in or below it has kept the same size and modification time for
+`settle` seconds. Only the changed directories, and any new directories below
+them, are compared with the destination.
+"""
+
+import os
+import stat
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import click
+from watchfiles import Change, watch
+
+from latch.ldata._transfer.manager import TransferStateManager
+from latch.ldata._transfer.progress import Progress
+from latch_cli.services.sync import _child_dest, _DirJob, _sync_and_upload
+from latch_cli.services.sync_state import SyncManifest
+
+_FileKey = Tuple[int, int]
+
+
+def _file_key(p: Path) -> Optional[_FileKey]:
+    try:
+        res = os.stat(p)
+    except OSError:
+        return None
+
+    if not stat.S_ISREG(res.st_mode):
+        return None
+
+    return res.st_size, res.st_mtime_ns
+
+
+class _Watcher:
+    def __init__(
+        self, srcs: Dict[str, Tuple[Path, os.stat_result]], dest: str, *, settle: float
+    ) -> None:
+        self.srcs = srcs
+        self.dest = dest
+        self.settle = settle
+
+        # absolute path of each source -> name in the destination
+        self.roots: Dict[Path, str] = {
+            p.absolute(): name for name, (p, _) in srcs.items()
+        }
+
+        self.dirs: Set[Path] = set()
+        self.top: Set[str] = set()
+        self.unsettled: Dict[Path, Tuple[Optional[_FileKey], float]] = {}
+
+    def _locate(self, p: Path) -> Optional[Tuple[str, Path]]:
+        for root, name in self.roots.items():
+            if p == root or root in p.parents:
+                return name, p.relative_to(root)
+
+        return None
+
+    def add(self, change: Change, raw: str) -> None:
+        p = Path(raw)
+        loc = self._locate(p)
+        if loc is None:
+            return
+
+        name, rel = loc
+        if rel == Path():
+            # a source itself was created, modified or removed
+            self.top.add(name)
+        else:
+            self.dirs.add(p.parent)
+
+        if change == Change.deleted:
+            self.unsettled.pop(p, None)
+            return
+
+        if p.is_dir() and not p.is_symlink():
+            self.dirs.add(p)
+            return
+
+        self.unsettled[p] = (_file_key(p), time.monotonic())
+
+    def check_settled(self) -> None:
+        now = time.monotonic()
+        for p, (key, since) in list(self.unsettled.items()):
+            cur = _file_key(p)
+            if cur is None:
+                del self.unsettled[p]
+                continue
+
+            if cur != key:
+                self.unsettled[p] = (cur, now)
+                continue
+
+            if now - since >= self.settle:
+                del self.unsettled[p]
+
+    def _job(self, d: Path) -> Optional[_DirJob]:
+        loc = self._locate(d)
+        if loc is None:
+            return None
+
+        name, rel = loc
+        p, _ = self.srcs[name]
+
+        try:
+            d_stat = os.stat(d)
+        except OSError:
+            # removed, the parent directory is synced instead
+            return None
+
+        if not stat.S_ISDIR(d_stat.st_mode):
+            return None
+
+        dest = _child_dest(self.dest, name)
+        for part in rel.parts:
+            dest = _child_dest(dest, part)
+
+        return _DirJob(dest, len(rel.parts) + 1, src_dir=p / rel, src_stat=d_stat)
+
+    def take_ready(self) -> Tuple[List[_DirJob], Set[Path]]:
+        """Remove the directories without unsettled files and build their jobs."""
+
+        # syncing a directory also visits its new subdirectories, so files
+        # being written anywhere below it hold it back
+        busy = {d for p in self.unsettled for d in p.parents}
+        ready = {d for d in self.dirs if d not in busy}
+        self.dirs -= ready
+
+        top_names = set()
+        for name in self.top:
+            p = self.srcs[name][0].absolute()
+            if p not in self.unsettled and p not in busy:
+                top_names.add(name)
+        self.top -= top_names
+
+        jobs: List[_DirJob] = []
+
+        top_srcs: Dict[str, Tuple[Path, os.stat_result]] = {}
+        for name in top_names:
+            p, _ = self.srcs[name]
+            try:
+                top_srcs[name] = (p, os.stat(p))
+            except OSError:
+                click.secho(f"`{p}`: no such file or directory", fg="red")
+
+        if len(top_srcs) > 0:
+            jobs.append(_DirJob(self.dest, 0, srcs=top_srcs))
+
+        # parents visit changed subdirectories themselves
+        for d in ready:
+            if any(x in ready for x in d.parents):
+                continue
+
+            job = self._job(d)
+            if job is not None:
+                jobs.append(job)
+
+        return jobs, ready
+
+
+def watch_sync(
+    srcs: Dict[str, Tuple[Path, os.stat_result]],
+    dest: str,
+    *,
+    delete: bool,
+    manifest: Optional[SyncManifest],
+    cores: int,
+    progress: Progress,
+    chunk_size_mib: Optional[int] = None,
+    debounce: float = 1.0,
+    settle: float = 2.0,
+    poll_interval: float = 0.5,
+) -> None:
+    """Keep `dest` in sync with `srcs` until interrupted.
+
+    Args:
+        debounce: Longest time in seconds to collect a burst of events.
+        settle:
+            Time in seconds a written file must keep the same size and
+            modification time before it is uploaded.
+        poll_interval: Time in seconds between quiescence checks.
+    """
+
+    watcher = _Watcher(srcs, dest, settle=settle)
+
+    click.secho(
+        "\nWatching for changes. Press Ctrl+C to stop.", fg="bright_blue", bold=True
+    )
+
+    # the worker processes are reused by every round instead of being started
+    # again each time a directory settles
+    try:
+        with (
+            ProcessPoolExecutor(max_workers=cores) as executor,
+            TransferStateManager() as man,
+        ):
+            for changes in watch(
+                *watcher.roots,
+                watch_filter=None,
+                debounce=int(debounce * 1000),
+                rust_timeout=int(poll_interval * 1000),
+                yield_on_timeout=True,
+            ):
+                for change, raw in changes:
+                    watcher.add(change, raw)
+
+                watcher.check_settled()
+
+                jobs, changed = watcher.take_ready()
+                if len(jobs) == 0:
+                    continue
+
+                click.echo()
+                errors = _sync_and_upload(
+                    jobs,
+                    delete=delete,
+                    manifest=manifest,
+                    cores=cores,
+                    progress=progress,
+                    chunk_size_mib=chunk_size_mib,
+                    # new directories are not in `changed` if they were moved in
+                    # whole, so follow every directory missing from the destination
+                    follow=lambda x, changed=changed: (
+                        x.dest_missing
+                        or (x.src_dir is not None and x.src_dir.absolute() in changed)
+                    ),
+                    executor=executor,
+                    man=man,
+                )
+                if len(errors) > 0:
+                    click.secho(
+                        "Failed files will be retried when their directory changes"
+                        " again",
+                        fg="yellow",
+                    )
+    except KeyboardInterrupt:
+        click.secho("\nStopped watching", fg="bright_blue")
@@ -1,20 +1,127 @@
+import atexit
 import json as _json
+import threading
 import time
+from collections import Counter
 from http import HTTPStatus
-from http.client import HTTPException, HTTPResponse, HTTPSConnection
-from typing import Any, Dict, Optional
+from http.client import BadStatusLine, HTTPException, HTTPResponse, HTTPSConnection
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
 
+from latch_cli import tracing
+
+
+class _ConnectionPool:
+    """Keep-alive `HTTPSConnection`s, reused per (host, port).
+
+    Connections idle for longer than `idle_timeout` seconds are closed instead
+    of being reused. At most `max_per_host` idle connections are kept per host.
+    """
+
+    def __init__(self, *, max_per_host: int = 8, idle_timeout: float = 60) -> None:
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, int], List[Tuple[HTTPSConnection, float]]] = {}
+
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.status_codes: Counter = Counter()
+
+    def acquire(self, host: str, port: int) -> Tuple[HTTPSConnection, bool]:
+        now = time.monotonic()
+
+        with self._lock:
+            self.requests += 1
+
+            idle = self._idle.get((host, port), [])
+            while len(idle) > 0:
+                conn, released_at = idle.pop()
+                if now - released_at > self.idle_timeout:
+                    conn.close()
+                    continue
+
+                self.connections_reused += 1
+                return conn, True
+
+            self.connections_opened += 1
+
+        return HTTPSConnection(host, port, timeout=90), False
+
+    def release(self, host: str, port: int, conn: HTTPSConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault((host, port), [])
+            if len(idle) >= self.max_per_host:
+                conn.close()
+                return
+
+            idle.append((conn, time.monotonic()))
+
+    def clear(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "idle_connections": sum(len(x) for x in self._idle.values()),
+                "status_codes": dict(self.status_codes),
+            }
+
+
+_pool = _ConnectionPool()
+atexit.register(_pool.clear)
+
+
+def stats() -> Dict[str, Any]:
+    """Connection reuse and response status counts for this process."""
+    return _pool.stats()
+
 
 class TinyResponse:
-    def __init__(self, resp: HTTPResponse, url: str, *, stream: bool = False) -> None:
+    def __init__(
+        self,
+        resp: HTTPResponse,
+        url: str,
+        *,
+        stream: bool = False,
+        conn: Optional[HTTPSConnection] = None,
+        pool_key: Optional[Tuple[str, int]] = None,
+    ) -> None:
         self._resp = resp
         self._content = None
         self._url = url
 
+        self._conn = conn
+        self._pool_key = pool_key
+
         self._stream = stream
         if not self._stream:
             self._content = self._resp.read()
+            self._release()
+
+    def _release(self) -> None:
+        # a connection can only carry the next request once this response has
+        # been read to the end
+        conn = self._conn
+        if conn is None:
+            return
+        self._conn = None
+
+        if self._pool_key is None or self._resp.will_close or not self._resp.isclosed():
+            conn.close()
+            return
+
+        _pool.release(*self._pool_key, conn)
 
     @property
     def headers(self):
@@ -31,6 +138,7 @@ class TinyResponse:
     def content(self):
         if self._content is None:
             self._content = self._resp.read()
+            self._release()
         return self._content
 
     def iter_content(self, chunk_size: Optional[int] = 1):
@@ -41,6 +149,7 @@ class TinyResponse:
                 x = self._resp.read(chunk_size)
 
             if len(x) == 0:
+                self._release()
                 yield x
                 break
 
@@ -64,6 +173,7 @@ class TinyResponse:
 
     def __exit__(self, type, value, tb):
         if self._stream:
+            self._release()
             self._resp.close()
 
 
@@ -90,9 +200,11 @@ def _req(
 
     port = parts.port if parts.port is not None else 443
 
+    start = time.monotonic()
+
     retries = 3
     while True:
-        conn = HTTPSConnection(parts.hostname, port, timeout=90)
+        conn, reused = _pool.acquire(parts.hostname, port)
 
         try:
             conn.request(
@@ -103,12 +215,33 @@ def _req(
             )
             resp = conn.getresponse()
             break
-        except ConnectionError as e:
+        except (ConnectionError, BadStatusLine) as e:
+            conn.close()
+
+            # the server may close an idle keep-alive connection at any time
+            if reused:
+                continue
+
+            if not isinstance(e, ConnectionError):
+                raise
+
             retries += 1
             if retries > 3:
                 raise e
 
-    return TinyResponse(resp, url, stream=stream)
+    with _pool._lock:
+        _pool.status_codes[resp.status] += 1
+
+    tracing.record(
+        f"http {method} {parts.hostname}",
+        time.monotonic() - start,
+        nbytes=(0 if body is None else len(body)) + (resp.length or 0),
+        error=resp.status >= 400,
+    )
+
+    return TinyResponse(
+        resp, url, stream=stream, conn=conn, pool_key=(parts.hostname, port)
+    )
 
 
 _retryable_status_codes = {429, 500, 502, 503, 504}
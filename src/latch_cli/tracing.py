@@ -0,0 +1,180 @@
+"""Lightweight timing spans for `latch --profile`.
+
+Spans are only recorded once `enable` has been called so instrumented code pays
+a single attribute check otherwise. GraphQL requests are timed by
+`latch_sdk_gql.latency` and are merged into the report.
+"""
+
+import cProfile
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+from typing_extensions import ParamSpec
+
+from latch_sdk_gql import latency
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+@dataclass
+class _SpanStats:
+    count: int = 0
+    errors: int = 0
+    total: float = 0
+    bytes: int = 0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=10000))
+
+    def percentile(self, q: float) -> float:
+        samples = sorted(self.samples)
+        if len(samples) == 0:
+            return 0
+
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_enabled = False
+_start: Optional[float] = None
+_profiler: Optional[cProfile.Profile] = None
+
+_lock = threading.Lock()
+_spans: Dict[str, _SpanStats] = {}
+
+
+def enable(*, cprofile: bool = False) -> None:
+    global _enabled, _start, _profiler
+
+    _enabled = True
+    _start = time.monotonic()
+
+    if cprofile:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def record(name: str, seconds: float, *, nbytes: int = 0, error: bool = False):
+    if not _enabled:
+        return
+
+    with _lock:
+        stats = _spans.setdefault(name, _SpanStats())
+        stats.count += 1
+        stats.total += seconds
+        stats.bytes += nbytes
+        stats.samples.append(seconds)
+        if error:
+            stats.errors += 1
+
+
+@contextmanager
+def span(name: str, *, nbytes: int = 0) -> Iterator[None]:
+    if not _enabled:
+        yield
+        return
+
+    start = time.monotonic()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record(name, time.monotonic() - start, nbytes=nbytes, error=error)
+
+
+def traced(name: str) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    def decorator(f: Callable[P, T]) -> Callable[P, T]:
+        @functools.wraps(f)
+        def wrapped(*args: P.args, **kwargs: P.kwargs) -> T:
+            with span(name):
+                return f(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+def summary() -> Dict[str, Any]:
+    with _lock:
+        spans = {
+            name: {
+                "count": x.count,
+                "errors": x.errors,
+                "total_s": x.total,
+                "bytes": x.bytes,
+                "p50_s": x.percentile(0.5),
+                "p95_s": x.percentile(0.95),
+                "p99_s": x.percentile(0.99),
+            }
+            for name, x in _spans.items()
+        }
+
+    for name, x in latency.latency_stats().items():
+        spans[f"graphql {name}"] = {
+            "count": x["count"],
+            "errors": 0,
+            "total_s": x["total"],
+            "bytes": 0,
+            "p50_s": x["p50"],
+            "p95_s": x["p95"],
+            "p99_s": x["p99"],
+        }
+
+    return {
+        "wall_time_s": 0 if _start is None else time.monotonic() - _start,
+        "spans": spans,
+    }
+
+
+def _human_bytes(x: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if x < 1024:
+            return f"{x:.0f}{unit}" if unit == "B" else f"{x:.1f}{unit}"
+        x /= 1024
+
+    return f"{x:.1f}TiB"
+
+
+def report(*, as_json: bool = False, cprofile_path: Optional[str] = None) -> str:
+    """Render the collected spans and stop the cProfile profiler, if any."""
+
+    if _profiler is not None:
+        _profiler.disable()
+        if cprofile_path is not None:
+            _profiler.dump_stats(cprofile_path)
+
+    data = summary()
+    if as_json:
+        return json.dumps(data, indent=2)
+
+    lines = [f"Total wall time: {data['wall_time_s']:.3f}s", ""]
+
+    spans = sorted(data["spans"].items(), key=lambda x: x[1]["total_s"], reverse=True)
+    if len(spans) == 0:
+        return "\n".join(lines)
+
+    width = max(len(name) for name, _ in spans)
+    lines.append(
+        f"{'span':<{width}}  {'count':>6}  {'total':>9}  {'p50':>8}  {'p95':>8}"
+        f"  {'p99':>8}  {'bytes':>9}  {'errors':>6}"
+    )
+    for name, x in spans:
+        lines.append(
+            f"{name:<{width}}  {x['count']:>6}  {x['total_s']:>8.3f}s"
+            f"  {x['p50_s'] * 1000:>6.0f}ms  {x['p95_s'] * 1000:>6.0f}ms"
+            f"  {x['p99_s'] * 1000:>6.0f}ms  {_human_bytes(x['bytes']):>9}"
+            f"  {x['errors']:>6}"
+        )
+
+    return "\n".join(lines)
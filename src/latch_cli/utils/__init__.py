@@ -20,6 +20,7 @@ import click
 import jwt
 
 from latch.utils import current_workspace
+from latch_cli import tracing
 from latch_cli.click_utils import bold
 from latch_cli.constants import latch_constants
 from latch_cli.tinyrequests import get
@@ -160,6 +161,7 @@ def human_readable_datetime(dt: datetime) -> str:
     return dt.astimezone().strftime("%c")
 
 
+@tracing.traced("hash directory")
 def hash_directory(dir_path: Path, *, silent: bool = False) -> str:
     # todo(maximsmol): store per-file hashes to show which files triggered a version change
     if not silent:
@@ -0,0 +1,371 @@
+"""Opt-in coalescing of concurrent GraphQL queries.
+
+While batching is enabled, queries issued through `latch_sdk_gql.execute` within
+a short window of each other are merged into one aliased document and sent as a
+single request. Results are fanned back out to the individual callers.
+
+Only single-operation queries made up of plain root fields are merged. Mutations
+and documents using fragments are always sent on their own. Queries are only
+merged with others using the same credentials and retry settings, and merged
+requests are retried with those settings.
+"""
+
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import graphql.language as l
+from gql.transport.exceptions import TransportQueryError
+from graphql import DocumentNode
+from typing_extensions import TypeAlias
+
+import latch_sdk_gql.execute as _execute
+from latch_sdk_gql import JsonValue
+from latch_sdk_gql.utils import _name_node
+
+
+class _RenameVariables(l.Visitor):
+    def __init__(self, prefix: str) -> None:
+        super().__init__()
+        self.prefix = prefix
+
+    def enter_variable(self, node: l.VariableNode, *args: Any) -> l.VariableNode:
+        res = l.VariableNode()
+        res.name = _name_node(f"{self.prefix}{node.name.value}")
+        return res
+
+
+def _batchable_operation(document: DocumentNode) -> Optional[l.OperationDefinitionNode]:
+    if len(document.definitions) != 1:
+        return None
+
+    op = document.definitions[0]
+    if not isinstance(op, l.OperationDefinitionNode):
+        return None
+
+    if op.operation != l.OperationType.QUERY or len(op.directives or ()) > 0:
+        return None
+
+    if not all(isinstance(x, l.FieldNode) for x in op.selection_set.selections):
+        return None
+
+    return op
+
+
+def _request_key(document: DocumentNode, variables: Optional[Dict[str, JsonValue]]):
+    text = (
+        document.loc.source.body if document.loc is not None else l.print_ast(document)
+    )
+    return text, json.dumps(variables, sort_keys=True, default=str)
+
+
+# credentials, max retries and backoff shared by every query in a batch
+_GroupKey: TypeAlias = Tuple[Optional[str], int, float]
+
+
+@dataclass
+class _PendingQuery:
+    operation: l.OperationDefinitionNode
+    variables: Optional[Dict[str, JsonValue]]
+    futures: List["Future[Dict[str, Any]]"] = field(default_factory=list)
+
+    # merged alias -> key expected by the caller
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+
+def _merge(batch: List[_PendingQuery]) -> Tuple[DocumentNode, Dict[str, JsonValue]]:
+    var_defs: List[l.VariableDefinitionNode] = []
+    selections: List[l.SelectionNode] = []
+    variables: Dict[str, JsonValue] = {}
+
+    for i, req in enumerate(batch):
+        prefix = f"b{i}_"
+
+        renamed: l.OperationDefinitionNode = l.visit(
+            req.operation, _RenameVariables(prefix)
+        )
+        var_defs.extend(renamed.variable_definitions or ())
+
+        for sel in renamed.selection_set.selections:
+            assert isinstance(sel, l.FieldNode)
+
+            key = (sel.alias or sel.name).value
+            alias = f"{prefix}{key}"
+            req.aliases[alias] = key
+
+            cur = copy(sel)
+            cur.alias = _name_node(alias)
+            selections.append(cur)
+
+        for k, v in (req.variables or {}).items():
+            variables[f"{prefix}{k}"] = v
+
+    sel_set = l.SelectionSetNode()
+    sel_set.selections = tuple(selections)
+
+    op = l.OperationDefinitionNode()
+    op.operation = l.OperationType.QUERY
+    op.name = _name_node("BatchedQuery")
+    op.variable_definitions = tuple(var_defs)
+    op.directives = ()
+    op.selection_set = sel_set
+
+    doc = l.DocumentNode()
+    doc.definitions = (op,)
+
+    return doc, variables
+
+
+def _send(
+    document: DocumentNode, variables: Optional[Dict[str, JsonValue]], group: _GroupKey
+) -> Dict[str, Any]:
+    auth_header, max_retries, backoff = group
+    return _execute._execute(
+        document,
+        variables,
+        max_retries=max_retries,
+        backoff=backoff,
+        auth_header=auth_header,
+    )
+
+
+class QueryBatcher:
+    """Collects concurrent queries and sends them as merged requests.
+
+    Args:
+        window: Seconds to wait for more queries after the first one arrives.
+        max_batch_size: Number of distinct queries that triggers an immediate
+            flush regardless of `window`.
+    """
+
+    def __init__(self, *, window: float = 0.005, max_batch_size: int = 50) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self._lock = threading.Lock()
+        self._pending: Dict[_GroupKey, Dict[Tuple[str, str], _PendingQuery]] = {}
+        self._timers: Dict[_GroupKey, threading.Timer] = {}
+        self._executor = ThreadPoolExecutor(thread_name_prefix="latch-gql-batch")
+
+        self.requests_sent = 0
+        self.queries_merged = 0
+
+    def submit(
+        self,
+        document: DocumentNode,
+        variables: Optional[Dict[str, JsonValue]] = None,
+        *,
+        max_retries: int = 5,
+        backoff: float = 0.1,
+        auth_header: Optional[str] = None,
+    ) -> "Future[Dict[str, Any]]":
+        op = _batchable_operation(document)
+        if op is None:
+            return self._executor.submit(
+                _execute._execute,
+                document,
+                variables,
+                max_retries=max_retries,
+                backoff=backoff,
+                auth_header=auth_header,
+            )
+
+        fut: "Future[Dict[str, Any]]" = Future()
+        key = _request_key(document, variables)
+        group: _GroupKey = (auth_header, max_retries, backoff)
+
+        batch: Optional[List[_PendingQuery]] = None
+        with self._lock:
+            pending = self._pending.setdefault(group, {})
+
+            req = pending.get(key)
+            if req is None:
+                req = pending[key] = _PendingQuery(op, variables)
+            req.futures.append(fut)
+
+            if len(pending) >= self.max_batch_size:
+                batch = list(pending.values())
+                del self._pending[group]
+
+                timer = self._timers.pop(group, None)
+                if timer is not None:
+                    timer.cancel()
+            elif group not in self._timers:
+                timer = threading.Timer(self.window, self._flush, args=(group, pending))
+                timer.daemon = True
+                self._timers[group] = timer
+                timer.start()
+
+        if batch is not None:
+            self._executor.submit(self._run, batch, group)
+
+        return fut
+
+    def execute(
+        self,
+        document: DocumentNode,
+        variables: Optional[Dict[str, JsonValue]] = None,
+        *,
+        max_retries: int = 5,
+        backoff: float = 0.1,
+        auth_header: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self.submit(
+            document,
+            variables,
+            max_retries=max_retries,
+            backoff=backoff,
+            auth_header=auth_header,
+        ).result()
+
+    def _flush(
+        self, group: _GroupKey, pending: Dict[Tuple[str, str], _PendingQuery]
+    ) -> None:
+        with self._lock:
+            if self._pending.get(group) is not pending:
+                # already sent because it reached `max_batch_size`
+                return
+
+            del self._pending[group]
+            del self._timers[group]
+
+        self._run(list(pending.values()), group)
+
+    def _run(self, batch: List[_PendingQuery], group: _GroupKey) -> None:
+        with self._lock:
+            self.requests_sent += 1
+            self.queries_merged += len(batch)
+
+        if len(batch) == 1:
+            self._run_single(batch[0], group)
+            return
+
+        document, variables = _merge(batch)
+        try:
+            data = _send(document, variables, group)
+        except TransportQueryError as e:
+            self._fan_out_errors(batch, e, group)
+            return
+        except Exception as e:
+            for req in batch:
+                for fut in req.futures:
+                    fut.set_exception(e)
+            return
+
+        for req in batch:
+            res = {key: data.get(alias) for alias, key in req.aliases.items()}
+            for fut in req.futures:
+                fut.set_result(res)
+
+    def _run_single(self, req: _PendingQuery, group: _GroupKey) -> None:
+        doc = l.DocumentNode()
+        doc.definitions = (req.operation,)
+
+        try:
+            res = _send(doc, req.variables, group)
+        except Exception as e:
+            for fut in req.futures:
+                fut.set_exception(e)
+            return
+
+        for fut in req.futures:
+            fut.set_result(res)
+
+    def _fan_out_errors(
+        self, batch: List[_PendingQuery], err: TransportQueryError, group: _GroupKey
+    ) -> None:
+        errors = err.errors or []
+        if len(errors) == 0 or any(len(x.get("path") or []) == 0 for x in errors):
+            # not attributable to a single root field, so we cannot tell which
+            # callers are affected
+            for req in batch:
+                self._run_single(req, group)
+            return
+
+        data: Dict[str, Any] = err.data or {}
+        for req in batch:
+            res = {key: data.get(alias) for alias, key in req.aliases.items()}
+
+            req_errors = []
+            for x in errors:
+                path = x["path"]
+                if path[0] not in req.aliases:
+                    continue
+
+                req_errors.append({**x, "path": [req.aliases[path[0]], *path[1:]]})
+
+            for fut in req.futures:
+                if len(req_errors) == 0:
+                    fut.set_result(res)
+                    continue
+
+                fut.set_exception(
+                    TransportQueryError(
+                        str(req_errors[0]),
+                        errors=req_errors,
+                        data=res,
+                        extensions=err.extensions,
+                    )
+                )
+
+
+def enable_batching(*, window: float = 0.005, max_batch_size: int = 50) -> QueryBatcher:
+    """Route queries made through `latch_sdk_gql.execute` through a batcher.
+
+    Note that every batchable query waits up to `window` seconds before it is
+    sent, so this only pays off when queries are issued concurrently (from
+    threads or an event loop).
+    """
+
+    res = QueryBatcher(window=window, max_batch_size=max_batch_size)
+    _execute._batcher = res
+    return res
+
+
+def disable_batching() -> None:
+    _execute._batcher = None
+
+
+_active_lock = threading.Lock()
+_active_depth = 0
+_active_prev: Optional[QueryBatcher] = None
+
+
+@contextmanager
+def batching(
+    *, window: float = 0.005, max_batch_size: int = 50
+) -> Iterator[QueryBatcher]:
+    """Enable batching for the duration of the context manager.
+
+    Safe to nest and to enter from several threads at once. The outermost entry
+    installs a batcher, which every nested or concurrent entry shares (along
+    with its settings), and batching stays on until the last one exits.
+    """
+
+    global _active_depth, _active_prev
+
+    with _active_lock:
+        if _active_depth == 0:
+            _active_prev = _execute._batcher
+            res = enable_batching(window=window, max_batch_size=max_batch_size)
+        else:
+            res = _execute._batcher
+            assert res is not None
+
+        _active_depth += 1
+
+    try:
+        yield res
+    finally:
+        with _active_lock:
+            _active_depth -= 1
+            if _active_depth == 0:
+                _execute._batcher = _active_prev
+                _active_prev = None
@@ -1,17 +1,43 @@
+import asyncio
+import atexit
+import functools
 import os
+import threading
 import time
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 import gql
+from gql.client import SyncClientSession
 from gql.transport.requests import RequestsHTTPTransport
-from graphql import DocumentNode
+from graphql import DocumentNode, OperationDefinitionNode, OperationType
+from requests.adapters import HTTPAdapter
 
 from latch_sdk_config.latch import config
 from latch_sdk_config.user import user_config
-from latch_sdk_gql import AuthenticationError, JsonValue
+from latch_sdk_gql import AuthenticationError, JsonValue, latency
 
+if TYPE_CHECKING:
+    from latch_sdk_gql.batch import QueryBatcher
 
-def _get_client(arg_auth_header: Optional[str] = None) -> gql.Client:
+# sized for the thread pools used by `latch cp`/`latch sync` so that concurrent
+# callers do not have to open (and then discard) overflow connections
+_pool_maxsize = 32
+
+_sessions: Dict[Tuple[str, str], SyncClientSession] = {}
+_sessions_lock = threading.Lock()
+
+# requests has no asyncio interface so async queries run on a dedicated pool
+# of the same size as the connection pool they share
+_async_executor = ThreadPoolExecutor(
+    max_workers=_pool_maxsize, thread_name_prefix="latch-gql"
+)
+
+# set by `latch_sdk_gql.batch.enable_batching`
+_batcher: Optional["QueryBatcher"] = None
+
+
+def _get_auth_header(arg_auth_header: Optional[str] = None) -> str:
     auth_header: Optional[str] = None
 
     if arg_auth_header is not None:
@@ -32,11 +58,91 @@ def _get_client(arg_auth_header: Optional[str] = None) -> gql.Client:
             "Unable to find credentials to connect to gql server, aborting"
         )
 
-    return gql.Client(
-        transport=RequestsHTTPTransport(
-            url=config.gql, headers={"Authorization": auth_header}
+    return auth_header
+
+
+def _get_session(arg_auth_header: Optional[str] = None) -> SyncClientSession:
+    """Return the long-lived session for the current endpoint and credentials.
+
+    Sessions hold a keep-alive connection pool and are shared between threads.
+    """
+
+    auth_header = _get_auth_header(arg_auth_header)
+    key = (config.gql, auth_header)
+
+    res = _sessions.get(key)
+    if res is not None:
+        return res
+
+    with _sessions_lock:
+        res = _sessions.get(key)
+        if res is not None:
+            return res
+
+        client = gql.Client(
+            transport=RequestsHTTPTransport(
+                url=config.gql, headers={"Authorization": auth_header}
+            )
         )
-    )
+        res = client.connect_sync()
+
+        transport = client.transport
+        assert isinstance(transport, RequestsHTTPTransport)
+        assert transport.session is not None
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_pool_maxsize)
+        for prefix in "http://", "https://":
+            transport.session.mount(prefix, adapter)
+
+        _sessions[key] = res
+        return res
+
+
+def close_sessions() -> None:
+    """Close every pooled connection. Later calls to `execute` reconnect."""
+
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.client.close_sync()
+
+        _sessions.clear()
+
+
+atexit.register(close_sessions)
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """Report connection reuse for each pooled GraphQL endpoint.
+
+    Returns a mapping from endpoint to the number of HTTP requests sent and the
+    number of TCP connections opened to serve them. With a warm pool `requests`
+    grows while `connections` stays flat.
+    """
+
+    res: Dict[str, Dict[str, int]] = {}
+
+    with _sessions_lock:
+        for (endpoint, _), session in _sessions.items():
+            stats = res.setdefault(endpoint, {"requests": 0, "connections": 0})
+
+            transport = session.transport
+            assert isinstance(transport, RequestsHTTPTransport)
+            if transport.session is None:
+                continue
+
+            adapter = transport.session.get_adapter(endpoint)
+            assert isinstance(adapter, HTTPAdapter)
+
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+
+    return res
 
 
 def execute(
@@ -47,11 +153,66 @@ def execute(
     backoff: float = 0.1,
     auth_header: Optional[str] = None,
 ):
-    client = _get_client(auth_header)
+    batcher = _batcher
+    if batcher is not None:
+        return batcher.execute(
+            document,
+            variables,
+            max_retries=max_retries,
+            backoff=backoff,
+            auth_header=auth_header,
+        )
+
+    return _execute(
+        document,
+        variables,
+        max_retries=max_retries,
+        backoff=backoff,
+        auth_header=auth_header,
+    )
+
+
+def _operation(document: DocumentNode) -> Tuple[str, bool]:
+    """Return the operation name and whether the operation is a query."""
+
+    for x in document.definitions:
+        if not isinstance(x, OperationDefinitionNode):
+            continue
+
+        name = x.name.value if x.name is not None else "<anonymous>"
+        return name, x.operation == OperationType.QUERY
+
+    return "<unknown>", False
+
+
+def _attempt(
+    session: SyncClientSession,
+    document: DocumentNode,
+    variables: Optional[Dict[str, JsonValue]],
+):
+    name, is_query = _operation(document)
+    f = functools.partial(session.execute, document, variables)
+
+    delay = latency.hedge_delay(name) if is_query else None
+    if delay is not None:
+        return latency.hedged(name, f, delay)
+
+    return latency.timed(name, f)
+
+
+def _execute(
+    document: DocumentNode,
+    variables: Optional[Dict[str, JsonValue]] = None,
+    *,
+    max_retries: int = 5,
+    backoff: float = 0.1,
+    auth_header: Optional[str] = None,
+):
+    session = _get_session(auth_header)
     retries = 0
     while True:
         try:
-            return client.execute(document, variables)
+            return _attempt(session, document, variables)
         except Exception:
             if retries >= max_retries:
                 raise
@@ -60,4 +221,47 @@ def execute(
             retries += 1
 
 
+async def execute_async(
+    document: DocumentNode,
+    variables: Optional[Dict[str, JsonValue]] = None,
+    *,
+    max_retries: int = 5,
+    backoff: float = 0.1,
+    auth_header: Optional[str] = None,
+):
+    """Asynchronous version of `execute` with the same retry behavior.
+
+    The event loop is never blocked, so many queries can be in flight at once
+    from a single loop (e.g. with `asyncio.gather`).
+    """
+
+    batcher = _batcher
+    if batcher is not None:
+        return await asyncio.wrap_future(
+            batcher.submit(
+                document,
+                variables,
+                max_retries=max_retries,
+                backoff=backoff,
+                auth_header=auth_header,
+            )
+        )
+
+    session = _get_session(auth_header)
+    loop = asyncio.get_running_loop()
+    retries = 0
+    while True:
+        try:
+            return await loop.run_in_executor(
+                _async_executor,
+                functools.partial(_attempt, session, document, variables),
+            )
+        except Exception:
+            if retries >= max_retries:
+                raise
+
+            await asyncio.sleep(backoff * 2**retries)
+            retries += 1
+
+
 # todo(ayush): add generator impl for subscriptions
@@ -0,0 +1,204 @@
+"""Per-operation latency tracking and opt-in hedging of GraphQL reads.
+
+Every request sent by `latch_sdk_gql.execute` is timed and recorded under its
+operation name. When hedging is enabled, a query that has not returned after
+the observed tail latency of its operation is sent a second time, and the
+second response is used if the original request fails.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """Sliding window of the most recent request latencies for one operation."""
+
+    def __init__(self, size: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if len(samples) == 0:
+            return None
+
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(operation_name: str) -> LatencyHistogram:
+    res = _histograms.get(operation_name)
+    if res is not None:
+        return res
+
+    with _histograms_lock:
+        return _histograms.setdefault(operation_name, LatencyHistogram())
+
+
+def latency_stats() -> Dict[str, Dict[str, float]]:
+    """Summarize recorded latencies (in seconds) for each operation name."""
+
+    res: Dict[str, Dict[str, float]] = {}
+
+    with _histograms_lock:
+        items = list(_histograms.items())
+
+    for name, hist in items:
+        if len(hist) == 0:
+            continue
+
+        res[name] = {
+            "count": hist.count,
+            "total": hist.total,
+            "p50": hist.percentile(0.5) or 0,
+            "p95": hist.percentile(0.95) or 0,
+            "p99": hist.percentile(0.99) or 0,
+        }
+
+    return res
+
+
+def timed(operation_name: str, f: Callable[[], T]) -> T:
+    start = time.monotonic()
+    res = f()
+    histogram(operation_name).record(time.monotonic() - start)
+    return res
+
+
+@dataclass(frozen=True)
+class HedgingConfig:
+    percentile: float = 0.95
+    """Latency percentile after which a duplicate request is sent."""
+
+    min_samples: int = 20
+    """Operations with fewer recorded requests are never hedged."""
+
+    min_delay: float = 0.05
+    """Lower bound on the hedging delay in seconds."""
+
+
+_hedging: Optional[HedgingConfig] = None
+_hedge_executor = ThreadPoolExecutor(thread_name_prefix="latch-gql-hedge")
+
+_counters_lock = threading.Lock()
+hedged_requests = 0
+hedges_won = 0
+
+
+def enable_hedging(
+    *, percentile: float = 0.95, min_samples: int = 20, min_delay: float = 0.05
+) -> None:
+    """Hedge read-only queries sent through `latch_sdk_gql.execute`.
+
+    Mutations are never hedged since they are not safe to send twice.
+    """
+
+    global _hedging
+    _hedging = HedgingConfig(
+        percentile=percentile, min_samples=min_samples, min_delay=min_delay
+    )
+
+
+def disable_hedging() -> None:
+    global _hedging
+    _hedging = None
+
+
+def hedge_delay(operation_name: str) -> Optional[float]:
+    """Return how long to wait before hedging, or `None` to not hedge."""
+
+    cfg = _hedging
+    if cfg is None:
+        return None
+
+    hist = histogram(operation_name)
+    if len(hist) < cfg.min_samples:
+        return None
+
+    threshold = hist.percentile(cfg.percentile)
+    if threshold is None:
+        return None
+
+    return max(threshold, cfg.min_delay)
+
+
+def hedged(operation_name: str, f: Callable[[], T], delay: float) -> T:
+    """Run `f` in the calling thread, sending a second copy if it is slower than `delay`.
+
+    Only the second copy goes through the hedging pool, so time spent waiting
+    for a free worker never counts towards `delay` and a busy pool cannot
+    delay the original request. A request cannot be interrupted once sent, so
+    the caller always waits for its own request. If that fails, the result of
+    the second copy is used instead. A second copy still queued when the first
+    one succeeds is never sent.
+    """
+
+    global hedges_won
+
+    lock = threading.Lock()
+    finished = False
+    secondary: "Optional[Future[T]]" = None
+
+    def start_secondary() -> None:
+        global hedged_requests
+        nonlocal secondary
+
+        with lock:
+            if finished:
+                return
+
+            secondary = _hedge_executor.submit(timed, operation_name, f)
+
+        with _counters_lock:
+            hedged_requests += 1
+
+    timer = threading.Timer(delay, start_secondary)
+    timer.daemon = True
+    timer.start()
+
+    try:
+        res = timed(operation_name, f)
+    except Exception:
+        timer.cancel()
+        with lock:
+            finished = True
+            fallback = secondary
+
+        if fallback is None:
+            raise
+
+        res = fallback.result()
+        with _counters_lock:
+            hedges_won += 1
+
+        return res
+
+    timer.cancel()
+    with lock:
+        finished = True
+        if secondary is not None:
+            secondary.cancel()
+
+    return res
@@ -0,0 +1,92 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import latch_cli.services.cp.completion_cache as cache
+
+
+@pytest.fixture
+def config(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> SimpleNamespace:
+    res = SimpleNamespace(root=tmp_path / ".latch", workspace_id="1")
+    monkeypatch.setattr(cache, "user_config", res)
+    return res
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list:
+    res = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: res[0])
+    return res
+
+
+def test_round_trip(config: SimpleNamespace, now: list):
+    assert cache.get("latch:///a") is None
+
+    cache.put("latch:///a", ["x", "y/"])
+    assert cache.get("latch:///a") == ["x", "y/"]
+
+    cache.put("latch:///a", ["z"])
+    assert cache.get("latch:///a") == ["z"]
+
+
+def test_entries_expire(config: SimpleNamespace, now: list):
+    cache.put("latch:///a", ["x"])
+
+    now[0] += cache.default_ttl
+    assert cache.get("latch:///a") == ["x"]
+
+    now[0] += 1
+    assert cache.get("latch:///a") is None
+    assert cache.get("latch:///a", ttl=cache.default_ttl + 1) == ["x"]
+
+
+def test_workspaces_are_separate(config: SimpleNamespace, now: list):
+    cache.put("latch:///a", ["one"])
+
+    config.workspace_id = "2"
+    assert cache.get("latch:///a") is None
+    cache.put("latch:///a", ["two"])
+
+    config.workspace_id = ""
+    cache.put("latch:///a", ["default"])
+
+    assert sorted(x.name for x in (config.root / "completion-cache").iterdir()) == [
+        "1.sqlite",
+        "2.sqlite",
+        "default.sqlite",
+    ]
+
+    config.workspace_id = "1"
+    assert cache.get("latch:///a") == ["one"]
+
+
+def test_invalidate_clears_every_workspace(config: SimpleNamespace, now: list):
+    cache.put("latch:///a", ["one"])
+    config.workspace_id = "2"
+    cache.put("latch:///a", ["two"])
+
+    cache.invalidate()
+
+    assert cache.get("latch:///a") is None
+    config.workspace_id = "1"
+    assert cache.get("latch:///a") is None
+
+
+def test_errors_are_swallowed(config: SimpleNamespace, now: list):
+    # the cache directory cannot be created
+    config.root.parent.mkdir(parents=True, exist_ok=True)
+    config.root.write_text("")
+
+    cache.put("latch:///a", ["x"])
+    assert cache.get("latch:///a") is None
+    cache.invalidate()
+
+
+def test_corrupt_database_is_ignored(config: SimpleNamespace, now: list):
+    p = config.root / "completion-cache" / "1.sqlite"
+    p.parent.mkdir(parents=True)
+    p.write_text("not a database")
+
+    cache.put("latch:///a", ["x"])
+    assert cache.get("latch:///a") is None
@@ -0,0 +1,104 @@
+from typing import List
+
+import pytest
+
+import latch_cli.services.cp.glob as glob_mod
+from latch_cli.services.cp.glob import NoMatchesError, _Child, expand_pattern
+
+# directories end in `/`, links in `@`
+_tree = {
+    "latch:///": ["runs/", "sample[1].txt", "run?.csv", "top.fq.gz"],
+    "latch:///runs": ["a/", "b/", "linked@", "notes.txt"],
+    "latch:///runs/a": ["fastq/"],
+    "latch:///runs/a/fastq": ["1.fq.gz", "1.fq.gz.bak"],
+    "latch:///runs/b": ["fastq/"],
+    "latch:///runs/b/fastq": ["lane1/"],
+    "latch:///runs/b/fastq/lane1": ["2.fq.gz"],
+    "latch:///runs/linked": ["3.fq.gz"],
+}
+
+
+@pytest.fixture
+def listed(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    res: List[str] = []
+
+    def list_children(path: str) -> List[_Child]:
+        res.append(path)
+
+        children: List[_Child] = []
+        for x in _tree.get(path, []):
+            is_link = x.endswith("@")
+            name = x.rstrip("/@")
+            children.append(
+                _Child(name=name, is_dir=x.endswith("/") or is_link, is_link=is_link)
+            )
+
+        return children
+
+    monkeypatch.setattr(glob_mod, "_list_children", list_children)
+    return res
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        (
+            "latch:///runs/*",
+            [f"latch:///runs/{x}" for x in ["a", "b", "linked", "notes.txt"]],
+        ),
+        ("latch:///runs/*/", [f"latch:///runs/{x}" for x in ["a", "b", "linked"]]),
+        ("latch:///runs/?", ["latch:///runs/a", "latch:///runs/b"]),
+        ("latch:///runs/[!a]", ["latch:///runs/b"]),
+        ("latch:///runs/*/fastq/*.fq.gz", ["latch:///runs/a/fastq/1.fq.gz"]),
+        (
+            "latch:///runs/**/*.fq.gz",
+            ["latch:///runs/a/fastq/1.fq.gz", "latch:///runs/b/fastq/lane1/2.fq.gz"],
+        ),
+        (
+            "latch:///**/*.fq.gz",
+            [
+                "latch:///runs/a/fastq/1.fq.gz",
+                "latch:///runs/b/fastq/lane1/2.fq.gz",
+                "latch:///top.fq.gz",
+            ],
+        ),
+        (
+            "latch:///runs/**/",
+            [
+                f"latch:///runs/{x}"
+                for x in ["a", "a/fastq", "b", "b/fastq", "b/fastq/lane1", "linked"]
+            ],
+        ),
+        ("latch:///runs/linked/*", ["latch:///runs/linked/3.fq.gz"]),
+    ],
+)
+def test_expand_pattern(listed: List[str], pattern: str, expected: List[str]):
+    assert expand_pattern(pattern) == expected
+
+
+def test_paths_before_the_first_wildcard_are_not_listed(listed: List[str]):
+    expand_pattern("latch:///runs/a/fastq/*")
+    assert listed == ["latch:///runs/a/fastq"]
+
+
+def test_directories_are_listed_once(listed: List[str]):
+    expand_pattern("latch:///runs/**/**/*.fq.gz")
+    assert len(listed) == len(set(listed))
+
+
+def test_paths_without_wildcards_are_not_checked(listed: List[str]):
+    assert expand_pattern("latch:///missing") == ["latch:///missing"]
+    assert listed == []
+
+
+@pytest.mark.parametrize("path", ["latch:///sample[1].txt", "latch:///run?.csv"])
+def test_literal_fallback(listed: List[str], path: str):
+    assert expand_pattern(path) == [path]
+
+
+@pytest.mark.parametrize(
+    "pattern", ["latch:///runs/*.csv", "latch:///missing/*", "latch:///sample[1].txt/"]
+)
+def test_no_matches(listed: List[str], pattern: str):
+    with pytest.raises(NoMatchesError, match="no matches"):
+        expand_pattern(pattern)
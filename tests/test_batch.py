@@ -0,0 +1,254 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import graphql.language as l
+import pytest
+
+import latch_sdk_gql.execute as _execute
+from latch_sdk_gql.batch import (
+    QueryBatcher,
+    _batchable_operation,
+    _merge,
+    _PendingQuery,
+    batching,
+)
+
+_node_query = l.parse("""
+    query Node($path: String!) {
+        node: ldataResolvePathData(argPath: $path) {
+            name
+        }
+    }
+""")
+
+_other_query = l.parse("""
+    query Other($path: String!, $first: Int) {
+        ldataResolvePathData(argPath: $path) {
+            childLdataTreeEdges(first: $first) {
+                totalCount
+            }
+        }
+    }
+""")
+
+
+def _pending(document: l.DocumentNode, variables: Dict[str, Any]) -> _PendingQuery:
+    op = _batchable_operation(document)
+    assert op is not None
+    return _PendingQuery(op, variables)
+
+
+class _FakeExecute:
+    """Answers each root field with the value of its `argPath` variable."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+
+    def __call__(
+        self,
+        document: l.DocumentNode,
+        variables: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        with self.lock:
+            self.calls.append({
+                "document": document,
+                "variables": variables,
+                "time": time.monotonic(),
+                **kwargs,
+            })
+
+        op = document.definitions[0]
+        assert isinstance(op, l.OperationDefinitionNode)
+
+        res: Dict[str, Any] = {}
+        for sel in op.selection_set.selections:
+            assert isinstance(sel, l.FieldNode)
+            arg = sel.arguments[0].value
+            assert isinstance(arg, l.VariableNode)
+            res[(sel.alias or sel.name).value] = (variables or {})[arg.name.value]
+
+        return res
+
+
+@pytest.fixture
+def fake_execute(monkeypatch: pytest.MonkeyPatch) -> _FakeExecute:
+    res = _FakeExecute()
+    monkeypatch.setattr(_execute, "_execute", res)
+    return res
+
+
+def test_merge_renames_aliases_and_variables():
+    a = _pending(_node_query, {"path": "latch:///a"})
+    b = _pending(_other_query, {"path": "latch:///b", "first": 10})
+
+    doc, variables = _merge([a, b])
+
+    assert variables == {
+        "b0_path": "latch:///a",
+        "b1_path": "latch:///b",
+        "b1_first": 10,
+    }
+    assert a.aliases == {"b0_node": "node"}
+    assert b.aliases == {"b1_ldataResolvePathData": "ldataResolvePathData"}
+
+    printed = l.print_ast(doc)
+    assert "$b0_path: String!" in printed
+    assert "$b1_path: String!" in printed
+    assert "$b1_first: Int" in printed
+    assert "b0_node: ldataResolvePathData(argPath: $b0_path)" in printed
+    assert "b1_ldataResolvePathData: ldataResolvePathData(argPath: $b1_path)" in printed
+    assert "childLdataTreeEdges(first: $b1_first)" in printed
+
+    # the callers' documents are left untouched
+    assert "$path" in l.print_ast(_node_query)
+    assert "b0_" not in l.print_ast(_node_query)
+
+
+def test_merge_same_document_twice():
+    a = _pending(_node_query, {"path": "latch:///a"})
+    b = _pending(_node_query, {"path": "latch:///b"})
+
+    doc, variables = _merge([a, b])
+
+    assert variables == {"b0_path": "latch:///a", "b1_path": "latch:///b"}
+    op = doc.definitions[0]
+    assert isinstance(op, l.OperationDefinitionNode)
+    assert [x.variable.name.value for x in op.variable_definitions] == [
+        "b0_path",
+        "b1_path",
+    ]
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        """
+        query WithFragment($path: String!) {
+            ldataResolvePathData(argPath: $path) {
+                ...NodeFields
+            }
+        }
+        fragment NodeFields on LdataNode {
+            name
+        }
+        """,
+        """
+        query WithInlineFragment {
+            ... on Query {
+                accountInfoCurrent {
+                    id
+                }
+            }
+        }
+        """,
+        """
+        mutation Remove($id: BigInt!) {
+            ldataRmr(input: {argNodeId: $id}) {
+                clientMutationId
+            }
+        }
+        """,
+        """
+        query A { accountInfoCurrent { id } }
+        query B { accountInfoCurrent { id } }
+        """,
+    ],
+)
+def test_unbatchable_documents(document: str):
+    assert _batchable_operation(l.parse(document)) is None
+
+
+def test_batcher_fans_out_results(fake_execute: _FakeExecute):
+    batcher = QueryBatcher(window=0.05)
+
+    futs = [
+        batcher.submit(_node_query, {"path": "latch:///a"}),
+        batcher.submit(_other_query, {"path": "latch:///b", "first": 1}),
+        # identical to the first one, shares its slot
+        batcher.submit(_node_query, {"path": "latch:///a"}),
+    ]
+
+    assert futs[0].result() == {"node": "latch:///a"}
+    assert futs[1].result() == {"ldataResolvePathData": "latch:///b"}
+    assert futs[2].result() == {"node": "latch:///a"}
+
+    assert len(fake_execute.calls) == 1
+    assert batcher.requests_sent == 1
+    assert batcher.queries_merged == 2
+
+
+def test_batcher_forwards_retry_settings(fake_execute: _FakeExecute):
+    batcher = QueryBatcher(window=0.05)
+
+    a = batcher.submit(_node_query, {"path": "latch:///a"}, max_retries=0)
+    b = batcher.submit(_node_query, {"path": "latch:///b"}, max_retries=0)
+    c = batcher.submit(_node_query, {"path": "latch:///c"}, backoff=1.0)
+
+    assert a.result() == {"node": "latch:///a"}
+    assert b.result() == {"node": "latch:///b"}
+    assert c.result() == {"node": "latch:///c"}
+
+    # different retry settings are never merged
+    assert sorted((x["max_retries"], x["backoff"]) for x in fake_execute.calls) == [
+        (0, 0.1),
+        (5, 1.0),
+    ]
+
+
+def test_full_batch_does_not_flush_next_batch_early(fake_execute: _FakeExecute):
+    window = 0.3
+    batcher = QueryBatcher(window=window, max_batch_size=2)
+
+    batcher.submit(_node_query, {"path": "latch:///a"})
+    time.sleep(window / 2)
+    # fills the batch, which is sent right away
+    batcher.submit(_node_query, {"path": "latch:///b"}).result()
+
+    start = time.monotonic()
+    assert batcher.execute(_node_query, {"path": "latch:///c"}) == {
+        "node": "latch:///c"
+    }
+
+    assert len(fake_execute.calls) == 2
+    assert fake_execute.calls[1]["time"] - start >= window * 0.9
+
+
+def test_nested_batching_stays_enabled():
+    assert _execute._batcher is None
+
+    with batching() as outer:
+        with batching() as inner:
+            assert inner is outer
+
+        assert _execute._batcher is outer
+
+    assert _execute._batcher is None
+
+
+def test_concurrent_batching_stays_enabled():
+    entered = threading.Barrier(2)
+    first_exited = threading.Event()
+    seen: List[Any] = []
+
+    def short():
+        with batching():
+            entered.wait()
+        first_exited.set()
+
+    def long():
+        with batching():
+            entered.wait()
+            first_exited.wait()
+            seen.append(_execute._batcher)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futs = [pool.submit(short), pool.submit(long)]
+        for x in futs:
+            x.result()
+
+    assert seen[0] is not None
+    assert _execute._batcher is None
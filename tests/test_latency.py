@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from latch_sdk_gql import latency
+
+
+def test_fast_request_is_not_hedged():
+    calls = []
+
+    def f():
+        calls.append(threading.current_thread())
+        return "ok"
+
+    before = latency.hedged_requests
+    assert latency.hedged("TestFast", f, 0.5) == "ok"
+
+    assert calls == [threading.current_thread()]
+    assert latency.hedged_requests == before
+
+
+def test_primary_runs_in_calling_thread():
+    threads = []
+    lock = threading.Lock()
+
+    def f():
+        with lock:
+            threads.append(threading.current_thread())
+            first = len(threads) == 1
+
+        if first:
+            time.sleep(0.2)
+        return "ok"
+
+    before = latency.hedged_requests
+    assert latency.hedged("TestSlow", f, 0.02) == "ok"
+
+    assert threads[0] is threading.current_thread()
+    assert latency.hedged_requests == before + 1
+
+
+def test_failed_primary_falls_back_to_hedge():
+    lock = threading.Lock()
+    attempts = []
+
+    def f():
+        with lock:
+            attempts.append(None)
+            first = len(attempts) == 1
+
+        if first:
+            time.sleep(0.1)
+            raise RuntimeError("primary failed")
+
+        return "hedge"
+
+    before = latency.hedges_won
+    assert latency.hedged("TestFallback", f, 0.01) == "hedge"
+    assert latency.hedges_won == before + 1
+
+
+def test_failed_primary_without_hedge_raises():
+    def f():
+        raise RuntimeError("primary failed")
+
+    with pytest.raises(RuntimeError):
+        latency.hedged("TestRaise", f, 1.0)
+
+
+def test_counters_are_consistent_under_concurrency():
+    def f():
+        time.sleep(0.02)
+        return "ok"
+
+    before = latency.hedged_requests
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        res = list(pool.map(lambda _: latency.hedged("TestMany", f, 0.001), range(64)))
+
+    assert res == ["ok"] * 64
+    assert latency.hedged_requests - before <= 64
@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional
+
+import click
+import pytest
+
+import latch_cli.services.ls as ls_mod
+from latch_cli.services.ls import ls_many
+
+
+def _dir(names: List[str]) -> Dict:
+    return {
+        "name": "",
+        "type": "DIR",
+        "ldataObjectMeta": None,
+        "finalLinkTarget": {
+            "type": "DIR",
+            "childLdataTreeEdges": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "nodes": [
+                    {"child": {"name": x, "type": "OBJ", "ldataObjectMeta": None}}
+                    for x in names
+                ],
+            },
+        },
+    }
+
+
+def test_ls_many_continues_after_missing_path(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    pages: Dict[str, Optional[Dict]] = {
+        "latch:///a": _dir(["x"]),
+        "latch:///missing": None,
+        "latch:///b": _dir(["y"]),
+    }
+
+    def fetch_first_pages(paths: List[str], *, page_size: int):
+        return "1", [pages[x] for x in paths]
+
+    monkeypatch.setattr(ls_mod, "_fetch_first_pages", fetch_first_pages)
+
+    with pytest.raises(click.exceptions.Exit) as e:
+        ls_many(
+            ["latch:///a", "latch:///missing", "latch:///b"],
+            json_lines=True,
+            batch_size=2,
+        )
+
+    assert e.value.exit_code == 1
+
+    out, _ = capsys.readouterr()
+    assert '"path": "latch:///a/x"' in out
+    assert "latch:///missing: no such directory" in click.unstyle(out)
+    assert '"path": "latch:///b/y"' in out
+
+
+def test_ls_many_continues_after_failed_batch(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    def fetch_first_pages(paths: List[str], *, page_size: int):
+        if paths == ["latch:///broken"]:
+            raise RuntimeError("query failed")
+
+        return "1", [_dir(["x"]) for _ in paths]
+
+    monkeypatch.setattr(ls_mod, "_fetch_first_pages", fetch_first_pages)
+
+    with pytest.raises(click.exceptions.Exit) as e:
+        ls_many(
+            ["latch:///a", "latch:///broken", "latch:///b"],
+            json_lines=True,
+            batch_size=1,
+        )
+
+    assert e.value.exit_code == 1
+
+    out, _ = capsys.readouterr()
+    assert '"path": "latch:///a/x"' in out
+    assert "latch:///broken: failed to list directory: query failed" in out
+    assert '"path": "latch:///b/x"' in out
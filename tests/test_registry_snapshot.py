@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import dateutil.parser as dp
+import pytest
+
+import latch.registry.snapshot as snapshot_mod
+import latch.registry.table as table_mod
+from latch.registry.snapshot import TableSnapshot
+from latch.registry.table import Table, _column
+
+_columns = {
+    "n": {"type": {"primitive": "integer"}, "allowEmpty": True},
+    "s": {"type": {"primitive": "string"}, "allowEmpty": True},
+}
+
+_t0 = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+class _FakeServer:
+    """Serves the records of one table to the keyset and record ID queries."""
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, Dict[str, Any]] = dict(_columns)
+        self.samples: Dict[str, Dict[str, Any]] = {}
+        self.filters: List[Optional[Dict[str, Any]]] = []
+
+    def put(self, id: str, cells: Dict[str, Any], *, updated: datetime) -> None:
+        prev = self.samples.get(id)
+        self.samples[id] = {
+            "id": id,
+            "name": f"record {id}",
+            "creationTime": _t0.isoformat() if prev is None else prev["creationTime"],
+            "updated": updated,
+            "cells": cells,
+        }
+
+    def _page(self, samples: List[Dict[str, Any]], variables: Dict[str, Any]):
+        start = 0 if variables["after"] is None else int(variables["after"]) + 1
+        page = samples[start : start + variables["first"]]
+        return {
+            "pageInfo": {
+                "hasNextPage": start + len(page) < len(samples),
+                "endCursor": str(start + len(page) - 1),
+            },
+            "nodes": page,
+        }
+
+    def records(self, document, variables: Dict[str, Any]):
+        if variables["after"] is None:
+            self.filters.append(variables.get("filter"))
+
+        samples = sorted(self.samples.values(), key=lambda x: int(x["id"]))
+
+        sample_filter = variables.get("filter")
+        if sample_filter is not None:
+            # `updated_after` is the only filter used by snapshots
+            (cond,) = sample_filter["and"]
+            t = dp.isoparse(cond["or"][0]["creationTime"]["greaterThanOrEqualTo"])
+            samples = [x for x in samples if x["updated"] >= t]
+
+        conn = self._page(
+            [
+                {
+                    "id": x["id"],
+                    "name": x["name"],
+                    "creationTime": x["creationTime"],
+                    "catalogEventsBySampleId": {
+                        "nodes": [{"time": x["updated"].isoformat()}]
+                    },
+                    "catalogSampleColumnDataBySampleId": {
+                        "nodes": [
+                            {"key": k, "data": {"valid": True, "value": v}}
+                            for k, v in x["cells"].items()
+                        ]
+                    },
+                }
+                for x in samples
+            ],
+            variables,
+        )
+        return {"catalogExperiment": {"catalogSamplesByExperimentId": conn}}
+
+    def ids(self, document, variables: Dict[str, Any]):
+        samples = sorted(self.samples.values(), key=lambda x: int(x["id"]))
+        conn = self._page([{"id": x["id"]} for x in samples], variables)
+        return {"catalogExperiment": {"catalogSamplesByExperimentId": conn}}
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> _FakeServer:
+    res = _FakeServer()
+
+    def load(self: Table) -> None:
+        self._cache.columns = {k: _column(k, t) for k, t in res.columns.items()}
+
+    monkeypatch.setattr(Table, "load", load)
+    monkeypatch.setattr(table_mod, "execute", res.records)
+    monkeypatch.setattr(snapshot_mod, "execute", res.ids)
+    return res
+
+
+@pytest.fixture
+def snapshot(tmp_path: Path):
+    with TableSnapshot(Table("1"), path=tmp_path / "snapshot.sqlite") as res:
+        yield res
+
+
+def _values(snapshot: TableSnapshot) -> Dict[str, Dict[str, Any]]:
+    res: Dict[str, Dict[str, Any]] = {}
+    for page in snapshot.list_records(page_size=2):
+        for record in page.values():
+            res[record.get_name()] = record.get_values() or {}
+
+    return res
+
+
+def test_first_sync_downloads_everything(server: _FakeServer, snapshot: TableSnapshot):
+    with pytest.raises(ValueError, match="never been synced"):
+        snapshot.get_columns()
+
+    for i in range(5):
+        server.put(str(i), {"n": i}, updated=_t0 + timedelta(hours=i))
+
+    assert snapshot.sync(page_size=2) == 5
+
+    assert server.filters == [None]
+    assert len(snapshot) == 5
+    assert snapshot.get_watermark() == _t0 + timedelta(hours=4)
+    assert snapshot.get_last_synced() is not None
+    assert set(snapshot.get_columns().keys()) == {"n", "s"}
+
+    assert _values(snapshot) == {f"record {i}": {"n": i} for i in range(5)}
+
+    record = snapshot.get_record("record 3")
+    assert record is not None
+    assert record.id == "3"
+    assert record.get_values() == {"n": 3}
+    assert snapshot.get_record("missing") is None
+
+
+def test_incremental_sync_uses_watermark(server: _FakeServer, snapshot: TableSnapshot):
+    server.put("1", {"n": 1}, updated=_t0)
+    server.put("2", {"n": 2}, updated=_t0 + timedelta(hours=1))
+    snapshot.sync()
+
+    # updated and new records are newer than the watermark, "2" is within the
+    # overlap window and fetched again
+    later = _t0 + timedelta(hours=2)
+    server.put("1", {"n": 10, "s": "x"}, updated=later)
+    server.put("3", {"n": 3}, updated=later)
+
+    assert snapshot.sync() == 3
+
+    watermark = _t0 + timedelta(hours=1)
+    (cond,) = server.filters[1]["and"]  # type: ignore
+    threshold = dp.isoparse(cond["or"][0]["creationTime"]["greaterThanOrEqualTo"])
+    assert threshold == watermark - snapshot_mod._watermark_overlap
+
+    assert snapshot.get_watermark() == later
+    assert _values(snapshot) == {
+        "record 1": {"n": 10, "s": "x"},
+        "record 2": {"n": 2},
+        "record 3": {"n": 3},
+    }
+
+    # nothing changed
+    assert snapshot.sync() == 2
+    assert snapshot.get_watermark() == later
+
+
+def test_incremental_sync_deletes_removed_records(
+    server: _FakeServer, snapshot: TableSnapshot
+):
+    for i in range(4):
+        server.put(str(i), {"n": i}, updated=_t0)
+    snapshot.sync()
+
+    del server.samples["1"]
+    del server.samples["3"]
+
+    snapshot.sync(page_size=1)
+
+    assert len(snapshot) == 2
+    assert set(_values(snapshot).keys()) == {"record 0", "record 2"}
+
+
+def test_delete_removed_pages_through_ids(
+    server: _FakeServer, snapshot: TableSnapshot, monkeypatch: pytest.MonkeyPatch
+):
+    for i in range(3):
+        server.put(str(i), {"n": i}, updated=_t0)
+    snapshot.sync()
+
+    calls: List[Dict[str, Any]] = []
+
+    def ids(document, variables):
+        calls.append(variables)
+        # one record per page
+        return server.ids(document, {**variables, "first": 1})
+
+    monkeypatch.setattr(snapshot_mod, "execute", ids)
+    del server.samples["0"]
+
+    with snapshot._conn:
+        snapshot._delete_removed(page_size=1)
+
+    assert [x["after"] for x in calls] == [None, "0"]
+    assert len(snapshot) == 2
+
+
+def test_schema_change_triggers_full_sync(server: _FakeServer, snapshot: TableSnapshot):
+    server.put("1", {"n": 1}, updated=_t0)
+    server.put("2", {"n": 2}, updated=_t0)
+    snapshot.sync()
+
+    server.columns["t"] = {"type": {"primitive": "boolean"}, "allowEmpty": True}
+    server.put("1", {"n": 1, "t": True}, updated=_t0)
+
+    assert snapshot.sync() == 2
+    assert server.filters == [None, None]
+    assert set(snapshot.get_columns().keys()) == {"n", "s", "t"}
+    assert _values(snapshot)["record 1"] == {"n": 1, "t": True}
+
+
+def test_full_sync_discards_the_snapshot(server: _FakeServer, snapshot: TableSnapshot):
+    server.put("1", {"n": 1}, updated=_t0)
+    server.put("2", {"n": 2}, updated=_t0)
+    snapshot.sync()
+
+    del server.samples["2"]
+
+    assert snapshot.sync(full=True) == 1
+    assert server.filters == [None, None]
+    assert set(_values(snapshot).keys()) == {"record 1"}
@@ -0,0 +1,701 @@
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple, cast
+
+import graphql.language as l
+import pytest
+
+import latch.registry.table as table_mod
+from latch.registry.record import NoSuchColumnError
+from latch.registry.table import (
+    CommitChunkResult,
+    PartialCommitError,
+    Table,
+    TableUpdate,
+    _arrow_value,
+    _chunk_mutations,
+    _coalesce_mutations,
+    _column,
+    _list_records_keyset_query,
+    _mutation_runs,
+    _mutation_size,
+    _prefetch,
+    _sample_filter,
+    _TableRecordsDeleteData,
+    _TableRecordsMutationData,
+    _TableRecordsUpsertData,
+)
+from latch.registry.types import InvalidValue, RecordFilter
+from latch.registry.utils import (
+    RegistryTransformerException,
+    to_python_literal_converter,
+)
+
+
+def _table(columns: Dict[str, Dict[str, Any]]) -> Table:
+    res = Table("1")
+    res._cache.columns = {k: _column(k, t) for k, t in columns.items()}
+    return res
+
+
+def _node(id: str, key: str, value: Any) -> Dict[str, Any]:
+    return {
+        "id": id,
+        "name": f"record {id}",
+        "creationTime": "2023-01-01T00:00:00Z",
+        "lastUpdated": None,
+        "key": key,
+        "data": {"valid": True, "value": value},
+    }
+
+
+def _offset_execute(nodes: List[Dict[str, Any]]):
+    def execute(document, variables):
+        offset = variables["argOffset"]
+        ids = sorted({x["id"] for x in nodes})[offset : offset + variables["argLimit"]]
+        return {
+            "catalogExperiment": {
+                "allSamplesJoinInfoPaginated": {
+                    "nodes": [x for x in nodes if x["id"] in ids]
+                }
+            }
+        }
+
+    return execute
+
+
+def test_prefetch_yields_everything_in_order():
+    assert list(_prefetch(iter(range(100)), 3)) == list(range(100))
+
+
+def test_prefetch_reraises_errors():
+    def gen() -> Iterator[int]:
+        yield 1
+        raise KeyError("boom")
+
+    it = _prefetch(gen(), 1)
+    assert next(it) == 1
+    with pytest.raises(KeyError):
+        next(it)
+
+
+def test_prefetch_stops_producer_when_closed():
+    produced: List[int] = []
+    closed = threading.Event()
+
+    def gen() -> Iterator[int]:
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    it = _prefetch(gen(), 2)
+    assert next(it) == 0
+    it.close()
+
+    assert closed.wait(5)
+    # the producer never runs more than `depth` items ahead, plus the one
+    # waiting to be put into the queue
+    assert len(produced) <= 4
+
+    count = len(produced)
+    time.sleep(0.3)
+    assert len(produced) == count
+
+
+def test_iter_columns_fills_missing_cells(monkeypatch: pytest.MonkeyPatch):
+    table = _table({
+        "a": {"type": {"primitive": "integer"}, "allowEmpty": True},
+        "b": {"type": {"primitive": "string"}, "allowEmpty": False},
+    })
+    monkeypatch.setattr(
+        table_mod,
+        "execute",
+        _offset_execute([_node("1", "a", 1), _node("1", "b", "x"), _node("2", "a", 2)]),
+    )
+
+    chunks = list(
+        table._iter_columns(
+            table.get_columns(),
+            chunk_rows=10,
+            page_size=10,
+            pagination="offset",
+            prefetch=0,
+            empty=math.nan,
+        )
+    )
+
+    assert len(chunks) == 1
+    chunk = chunks[0]
+    assert chunk["a"] == [1, 2]
+    assert chunk["b"] == ["x", InvalidValue("")]
+    assert chunk["Name"] == ["record 1", "record 2"]
+
+
+def test_iter_columns_empty_allowed_cells(monkeypatch: pytest.MonkeyPatch):
+    table = _table({"a": {"type": {"primitive": "integer"}, "allowEmpty": True}})
+    monkeypatch.setattr(table_mod, "execute", _offset_execute([_node("1", "other", 1)]))
+
+    chunk = next(
+        table._iter_columns(
+            table.get_columns(),
+            chunk_rows=10,
+            page_size=10,
+            pagination="offset",
+            prefetch=0,
+            empty=math.nan,
+        )
+    )
+    assert math.isnan(chunk["a"][0])
+
+
+def test_get_dataframe_missing_cells_are_nan(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip("pandas")
+
+    table = _table({
+        "a": {"type": {"primitive": "integer"}, "allowEmpty": True},
+        "b": {"type": {"primitive": "string"}, "allowEmpty": True},
+    })
+    monkeypatch.setattr(
+        table_mod,
+        "execute",
+        _offset_execute([_node("1", "a", 1), _node("2", "b", "y")]),
+    )
+
+    df = table.get_dataframe()
+    assert list(df.columns) == ["a", "b", "Name"]
+    assert df["a"].isna().tolist() == [False, True]
+    assert df["b"].isna().tolist() == [True, False]
+
+
+def test_get_dataframe_does_not_start_threads(monkeypatch: pytest.MonkeyPatch):
+    pd = pytest.importorskip("pandas")
+
+    table = _table({"a": {"type": {"primitive": "integer"}, "allowEmpty": True}})
+    monkeypatch.setattr(table_mod, "execute", _offset_execute([_node("1", "a", 1)]))
+
+    started: List[threading.Thread] = []
+    monkeypatch.setattr(
+        table_mod.threading.Thread, "start", lambda self: started.append(self)
+    )
+
+    assert isinstance(table.get_dataframe(), pd.DataFrame)
+    assert started == []
+
+
+_enum_columns = {
+    "color": {
+        "type": {"primitive": "enum", "members": ["red", "green"]},
+        "allowEmpty": True,
+    },
+    "either": {
+        "type": {
+            "union": {
+                "color": {"primitive": "enum", "members": ["red", "green"]},
+                "int": {"primitive": "integer"},
+            }
+        },
+        "allowEmpty": True,
+    },
+}
+
+_enum_nodes = [
+    _node("1", "color", "green"),
+    {
+        **_node("1", "either", None),
+        "data": {"tag": "color", "value": {"valid": True, "value": "green"}},
+    },
+    _node("2", "color", "red"),
+]
+
+
+def test_arrow_value_uses_enum_member_names():
+    green = to_python_literal_converter(_enum_columns["color"]["type"])({
+        "valid": True,
+        "value": "green",
+    })
+
+    assert _arrow_value(green, _enum_columns["color"]["type"]) == "green"
+    assert _arrow_value(green, _enum_columns["either"]["type"]) == "green"
+    assert _arrow_value([green], {"array": _enum_columns["color"]["type"]}) == ["green"]
+
+
+def test_get_arrow_table_enum_column(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip("pyarrow")
+
+    table = _table(_enum_columns)
+    monkeypatch.setattr(table_mod, "execute", _offset_execute(_enum_nodes))
+
+    res = table.get_arrow_table()
+    assert res.column("color").to_pylist() == ["green", "red"]
+    assert res.column("either").to_pylist() == ["green", None]
+
+
+def test_get_dataframe_enum_column(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip("pandas")
+
+    table = _table(_enum_columns)
+    monkeypatch.setattr(table_mod, "execute", _offset_execute(_enum_nodes))
+
+    df = table.get_dataframe()
+    assert [x.name for x in df["color"]] == ["green", "red"]
+    assert df["either"][0].name == "green"
+    assert df["either"].isna().tolist() == [False, True]
+
+
+def _keyset_execute(samples: List[Dict[str, Any]], calls: List[Dict[str, Any]]):
+    """Serves `samples` in pages, with the sample index as the cursor."""
+
+    def execute(document, variables):
+        calls.append(variables)
+
+        start = 0 if variables["after"] is None else int(variables["after"]) + 1
+        page = samples[start : start + variables["first"]]
+        end = start + len(page) - 1
+        return {
+            "catalogExperiment": {
+                "catalogSamplesByExperimentId": {
+                    "pageInfo": {
+                        "hasNextPage": end + 1 < len(samples),
+                        "endCursor": str(end),
+                    },
+                    "nodes": page,
+                }
+            }
+        }
+
+    return execute
+
+
+def _sample(
+    id: str, cells: Dict[str, Any], events: Tuple[str, ...] = ()
+) -> Dict[str, Any]:
+    return {
+        "id": id,
+        "name": f"record {id}",
+        "creationTime": "2023-01-01T00:00:00+00:00",
+        "catalogEventsBySampleId": {"nodes": [{"time": t} for t in events]},
+        "catalogSampleColumnDataBySampleId": {
+            "nodes": [
+                {"key": k, "data": {"valid": True, "value": v}}
+                for k, v in cells.items()
+            ]
+        },
+    }
+
+
+def test_keyset_pagination_follows_cursor(monkeypatch: pytest.MonkeyPatch):
+    table = _table({"a": {"type": {"primitive": "integer"}, "allowEmpty": True}})
+
+    calls: List[Dict[str, Any]] = []
+    samples = [_sample(str(i), {"a": i}) for i in range(5)]
+    monkeypatch.setattr(table_mod, "execute", _keyset_execute(samples, calls))
+
+    pages = list(table.list_records(page_size=2, pagination="keyset"))
+
+    assert [list(x.keys()) for x in pages] == [["0", "1"], ["2", "3"], ["4"]]
+    assert [x["after"] for x in calls] == [None, "1", "3"]
+    assert all(x["first"] == 2 for x in calls)
+    assert pages[2]["4"].get_values() == {"a": 4}
+
+
+def test_keyset_pagination_keeps_records_without_values(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    table = _table({
+        "a": {"type": {"primitive": "integer"}, "allowEmpty": True},
+        "b": {"type": {"primitive": "integer"}, "allowEmpty": False},
+    })
+
+    samples = [
+        _sample("1", {}, events=("2023-02-01T00:00:00+00:00",)),
+        _sample("2", {"a": 1, "b": 2}),
+    ]
+    monkeypatch.setattr(table_mod, "execute", _keyset_execute(samples, []))
+
+    (page,) = table.list_records(pagination="keyset")
+
+    assert page["1"].get_values() == {"b": InvalidValue("")}
+    assert page["1"].get_last_updated().month == 2
+    assert page["2"].get_values() == {"a": 1, "b": 2}
+    assert page["2"].get_last_updated() == page["2"].get_creation_time()
+
+
+def test_keyset_and_offset_pagination_agree(monkeypatch: pytest.MonkeyPatch):
+    table = _table({"a": {"type": {"primitive": "integer"}, "allowEmpty": True}})
+
+    samples = [_sample(str(i), {"a": i}) for i in range(7)]
+    nodes = [_node(str(i), "a", i) for i in range(7)]
+
+    monkeypatch.setattr(table_mod, "execute", _keyset_execute(samples, []))
+    keyset = [
+        {k: v.get_values() for k, v in page.items()}
+        for page in table.list_records(page_size=3, pagination="keyset", prefetch=2)
+    ]
+
+    monkeypatch.setattr(table_mod, "execute", _offset_execute(nodes))
+    offset = [
+        {k: v.get_values() for k, v in page.items()}
+        for page in table.list_records(page_size=3)
+    ]
+
+    assert keyset == offset
+
+
+def _upsert(name: str, **values: Any) -> _TableRecordsUpsertData:
+    return _TableRecordsUpsertData(
+        name, {k: {"valid": True, "value": v} for k, v in values.items()}
+    )
+
+
+def test_chunk_mutations_limits_records():
+    run = [_TableRecordsDeleteData(str(i)) for i in range(5)]
+
+    chunks = _chunk_mutations(run, max_records=2, max_bytes=1 << 20)
+
+    assert [[cast(_TableRecordsDeleteData, x).name for x in c] for c, _ in chunks] == [
+        ["0", "1"],
+        ["2", "3"],
+        ["4"],
+    ]
+    assert [size for _, size in chunks] == [6, 6, 3]
+
+
+def test_chunk_mutations_limits_bytes():
+    small = _upsert("a", x=1)
+    large = _upsert("b", x="x" * 100)
+    size = _mutation_size(small)
+
+    chunks = _chunk_mutations(
+        [small, small, large, small], max_records=100, max_bytes=2 * size
+    )
+
+    # a mutation larger than the limit is sent on its own
+    assert [len(c) for c, _ in chunks] == [2, 1, 1]
+    assert chunks[1] == ([large], _mutation_size(large))
+
+
+def test_coalesce_mutations_merges_records():
+    run: List[_TableRecordsMutationData] = [
+        _upsert("a", x=1),
+        _upsert("b", x=2),
+        _upsert("a", y=3),
+    ]
+
+    assert _coalesce_mutations(run) == [_upsert("a", x=1, y=3), _upsert("b", x=2)]
+    assert _coalesce_mutations([
+        _TableRecordsDeleteData("a"),
+        _TableRecordsDeleteData("a"),
+    ]) == [_TableRecordsDeleteData("a")]
+
+
+def test_mutation_runs_keeps_order():
+    muts: List[_TableRecordsMutationData] = [
+        _upsert("a"),
+        _upsert("b"),
+        _TableRecordsDeleteData("a"),
+        _upsert("c"),
+    ]
+
+    assert [len(x) for x in _mutation_runs(muts)] == [2, 1, 1]
+
+
+class _FailingExecute:
+    """Fails requests that upsert the record named `fail`."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: List[List[str]] = []
+
+    def __call__(self, document, variables):
+        printed = l.print_ast(document)
+        names = re.findall(r'"([^"]+)"', printed.split("argNames:")[1])
+        with self.lock:
+            self.requests.append(names)
+
+        if "fail" in names:
+            raise RuntimeError("upsert failed")
+
+        return {}
+
+
+def test_partial_commit_keeps_failed_mutations(monkeypatch: pytest.MonkeyPatch):
+    fake = _FailingExecute()
+    monkeypatch.setattr(table_mod, "execute", fake)
+
+    upd = TableUpdate(Table("1"))
+    for name in ["a", "b", "fail", "c"]:
+        upd.upsert_record_raw_unsafe(name=name, values={})
+
+    reported: List[CommitChunkResult] = []
+    with pytest.raises(PartialCommitError) as e:
+        upd.commit(atomic=False, max_chunk_records=2, progress=reported.append)
+
+    results = e.value.results
+    assert [x.index for x in results] == [0, 1]
+    assert [x.num_mutations for x in results] == [2, 2]
+    assert results[0].error is None
+    assert isinstance(results[1].error, RuntimeError)
+    assert sorted(x.index for x in reported) == [0, 1]
+    assert "1 of 2 requests failed" in str(e.value)
+
+    # only the failed chunk is left pending
+    assert upd._record_mutations == [
+        _TableRecordsUpsertData("fail", {}),
+        _TableRecordsUpsertData("c", {}),
+    ]
+
+    fake.requests.clear()
+    upd._record_mutations[0] = _TableRecordsUpsertData("retried", {})
+    assert len(upd.commit(atomic=False)) == 1
+    assert fake.requests == [["retried", "c"]]
+    assert upd._record_mutations == []
+
+
+def test_partial_commit_stops_after_failed_run(monkeypatch: pytest.MonkeyPatch):
+    fake = _FailingExecute()
+    monkeypatch.setattr(table_mod, "execute", fake)
+
+    upd = TableUpdate(Table("1"))
+    upd.upsert_record_raw_unsafe(name="a", values={})
+    upd.upsert_record_raw_unsafe(name="fail", values={})
+    upd.delete_record("b")
+    upd.upsert_record_raw_unsafe(name="c", values={})
+
+    with pytest.raises(PartialCommitError) as e:
+        upd.commit(atomic=False, max_chunk_records=1)
+
+    # the later runs may depend on the failed upsert
+    assert sorted(fake.requests) == [["a"], ["fail"]]
+    assert e.value.num_unsent == 2
+    assert "2 later updates were not sent" in str(e.value)
+    assert upd._record_mutations == [
+        _TableRecordsUpsertData("fail", {}),
+        _TableRecordsDeleteData("b"),
+        _TableRecordsUpsertData("c", {}),
+    ]
+
+
+def test_atomic_commit_sends_one_request(monkeypatch: pytest.MonkeyPatch):
+    fake = _FailingExecute()
+    monkeypatch.setattr(table_mod, "execute", fake)
+
+    def fail(*args):
+        raise AssertionError("must not be called")
+
+    monkeypatch.setattr(table_mod, "_mutation_size", fail)
+
+    upd = TableUpdate(Table("1"))
+    for name in ["a", "b", "c"]:
+        upd.upsert_record_raw_unsafe(name=name, values={})
+
+    (res,) = upd.commit(max_chunk_records=1)
+    assert res.num_mutations == 3
+    assert res.num_bytes is None
+    assert fake.requests == [["a", "b", "c"]]
+
+
+def test_upsert_dataframe_is_atomic_by_default(monkeypatch: pytest.MonkeyPatch):
+    fake = _FailingExecute()
+    monkeypatch.setattr(table_mod, "execute", fake)
+
+    table = _table({
+        "a": {"type": {"primitive": "string"}, "allowEmpty": True},
+        "b": {"type": {"primitive": "integer"}, "allowEmpty": True},
+    })
+
+    (res,) = table.upsert_dataframe(
+        {"Name": ["x", "y"], "a": ["1", None], "b": ["2", 3.0]}, max_chunk_records=1
+    )
+    assert res.num_mutations == 2
+    assert fake.requests == [["x", "y"]]
+    assert res._mutations == [
+        _TableRecordsUpsertData(
+            "x", {"a": {"valid": True, "value": "1"}, "b": {"valid": True, "value": 2}}
+        ),
+        _TableRecordsUpsertData("y", {"b": {"valid": True, "value": 3}}),
+    ]
+
+
+def test_upsert_dataframe_does_not_stringify(monkeypatch: pytest.MonkeyPatch):
+    fake = _FailingExecute()
+    monkeypatch.setattr(table_mod, "execute", fake)
+
+    table = _table({"a": {"type": {"primitive": "string"}, "allowEmpty": True}})
+
+    with pytest.raises(RegistryTransformerException, match="record 'x', column 'a'"):
+        table.upsert_dataframe({"Name": ["x"], "a": [1.0]})
+
+    assert fake.requests == []
+
+
+def test_upsert_dataframe_nan_leaves_cell_unchanged(monkeypatch: pytest.MonkeyPatch):
+    fake = _FailingExecute()
+    monkeypatch.setattr(table_mod, "execute", fake)
+
+    table = _table({
+        "a": {"type": {"primitive": "number"}, "allowEmpty": True},
+        "b": {"type": {"primitive": "string"}, "allowEmpty": True},
+    })
+
+    (res,) = table.upsert_dataframe({
+        "Name": ["x", "y"],
+        "a": [math.nan, 1.5],
+        "b": ["s", float("nan")],
+    })
+    assert res._mutations == [
+        _TableRecordsUpsertData("x", {"b": {"valid": True, "value": "s"}}),
+        _TableRecordsUpsertData("y", {"a": {"valid": True, "value": 1.5}}),
+    ]
+
+
+def test_upsert_dataframe_rejects_non_string_enum_values(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(table_mod, "execute", _FailingExecute())
+
+    table = _table({
+        "e": {"type": {"primitive": "enum", "members": ["1", "2"]}, "allowEmpty": True}
+    })
+
+    with pytest.raises(
+        RegistryTransformerException,
+        match="record 'x', column 'e': unable to convert 1 to registry enum",
+    ):
+        table.upsert_dataframe({"Name": ["x"], "e": [1]})
+
+
+_filter_columns = {
+    "n": {"type": {"primitive": "integer"}, "allowEmpty": True},
+    "tags": {"type": {"array": {"primitive": "string"}}, "allowEmpty": True},
+    "either": {
+        "type": {
+            "union": {
+                "one": {"primitive": "string"},
+                "many": {"array": {"primitive": "string"}},
+            }
+        },
+        "allowEmpty": True,
+    },
+}
+
+
+def _value_conds(where: RecordFilter) -> List[Dict[str, Any]]:
+    table = _table(_filter_columns)
+    res = _sample_filter(where, table.get_columns())
+    assert res is not None
+    return [
+        x["catalogSampleColumnDataBySampleId"]["some"] for x in cast(Any, res)["and"]
+    ]
+
+
+def test_sample_filter_scalars_use_containment():
+    (cond,) = _value_conds(RecordFilter(values={"n": 3}))
+    assert cond == {
+        "key": {"equalTo": "n"},
+        "data": {"contains": {"valid": True, "value": 3}},
+    }
+
+
+def test_sample_filter_arrays_use_equality():
+    (tags, either) = _value_conds(
+        RecordFilter(values={"tags": ["a", "b"], "either": "x"})
+    )
+    assert tags["data"] == {
+        "equalTo": [{"valid": True, "value": "a"}, {"valid": True, "value": "b"}]
+    }
+    assert "equalTo" in either["data"]
+
+
+def test_sample_filter_values_in():
+    table = _table(_filter_columns)
+    res = _sample_filter(
+        RecordFilter(names=["a"], values_in={"n": [1, 2]}), table.get_columns()
+    )
+
+    assert res == {
+        "and": [
+            {"name": {"in": ["a"]}},
+            {
+                "or": [
+                    {
+                        "catalogSampleColumnDataBySampleId": {
+                            "some": {
+                                "key": {"equalTo": "n"},
+                                "data": {"contains": {"valid": True, "value": x}},
+                            }
+                        }
+                    }
+                    for x in [1, 2]
+                ]
+            },
+        ]
+    }
+
+
+def test_sample_filter_unknown_column():
+    with pytest.raises(NoSuchColumnError):
+        _value_conds(RecordFilter(values={"missing": 1}))
+
+
+def test_sample_filter_empty():
+    assert _sample_filter(RecordFilter(), {}) is None
+
+
+def test_list_records_with_filter_and_columns(monkeypatch: pytest.MonkeyPatch):
+    table = _table(_filter_columns)
+
+    calls: List[Dict[str, Any]] = []
+    documents: List[str] = []
+    execute = _keyset_execute([_sample("1", {"n": 3})], calls)
+
+    def capture(document, variables):
+        documents.append(l.print_ast(document))
+        return execute(document, variables)
+
+    monkeypatch.setattr(table_mod, "execute", capture)
+
+    (page,) = table.list_records(
+        where=RecordFilter(values={"n": 3}), columns=["n"], page_size=10
+    )
+
+    assert page["1"].get_values() == {"n": 3}
+    assert calls == [
+        {
+            "filter": _sample_filter(
+                RecordFilter(values={"n": 3}), table.get_columns()
+            ),
+            "keys": ["n"],
+            "id": "1",
+            "first": 10,
+            "after": None,
+        }
+    ]
+    # filter values are passed as variables, never in the document
+    assert "filter: $filter" in documents[0]
+    assert (
+        "catalogSampleColumnDataBySampleId(filter: {key: {in: $keys}})" in documents[0]
+    )
+    assert '"n"' not in documents[0]
+
+    with pytest.raises(NoSuchColumnError):
+        next(table.list_records(columns=["missing"]))
+
+
+def test_keyset_query_documents_do_not_depend_on_filter_values():
+    cols = _table(_filter_columns).get_columns()
+
+    a, a_vars = _list_records_keyset_query(
+        _sample_filter(RecordFilter(values={"n": 1}), cols), ["n"]
+    )
+    b, b_vars = _list_records_keyset_query(
+        _sample_filter(RecordFilter(names=["x"]), cols), ["tags"]
+    )
+
+    assert a is b
+    assert a_vars != b_vars
+    assert _list_records_keyset_query() == _list_records_keyset_query()
@@ -0,0 +1,167 @@
+from datetime import date, datetime, timezone
+from typing import Any
+
+import pytest
+
+from latch.registry.record import Record
+from latch.registry.types import InvalidValue
+from latch.registry.upstream_types.types import RegistryType
+from latch.registry.utils import (
+    RegistryTransformerException,
+    to_python_literal,
+    to_python_literal_converter,
+    to_registry_literal_converter,
+)
+from latch.types.directory import LatchDir
+from latch.types.file import LatchFile
+
+
+def _valid(value: Any) -> Any:
+    return {"valid": True, "value": value}
+
+
+def _normalize(x: Any) -> Any:
+    # `Record` and the blob types do not compare by value
+    if isinstance(x, Record):
+        return ("record", x.id)
+    if isinstance(x, (LatchFile, LatchDir)):
+        return (type(x).__name__, x.remote_path)
+    if isinstance(x, list):
+        return [_normalize(y) for y in x]
+    return x
+
+
+_enum_type: RegistryType = {"primitive": "enum", "members": ["a", "b"]}
+
+_cases = [
+    ({"primitive": "string"}, _valid("hello"), "hello"),
+    ({"primitive": "integer"}, _valid(3), 3),
+    ({"primitive": "number"}, _valid(3), 3.0),
+    ({"primitive": "number"}, _valid(0.5), 0.5),
+    ({"primitive": "boolean"}, _valid(False), False),
+    ({"primitive": "null"}, _valid(None), None),
+    ({"primitive": "date"}, _valid("2023-04-05"), date(2023, 4, 5)),
+    (
+        {"primitive": "datetime"},
+        _valid("2023-04-05T06:07:08+00:00"),
+        datetime(2023, 4, 5, 6, 7, 8, tzinfo=timezone.utc),
+    ),
+    (
+        {"primitive": "blob"},
+        _valid({"ldataNodeId": "12"}),
+        ("LatchFile", "latch://12.node"),
+    ),
+    (
+        {"primitive": "blob", "metadata": {"nodeType": "dir"}},
+        _valid({"ldataNodeId": "12"}),
+        ("LatchDir", "latch://12.node"),
+    ),
+    (
+        {"primitive": "link", "experimentId": "1"},
+        _valid({"sampleId": 34}),
+        ("record", "34"),
+    ),
+    (
+        {"array": {"primitive": "integer"}},
+        [_valid(1), _valid(2), {"valid": False, "rawValue": "x"}],
+        [1, 2, InvalidValue("x")],
+    ),
+    (
+        {"array": {"primitive": "link", "experimentId": "1"}},
+        [_valid({"sampleId": 1}), _valid({"sampleId": 2})],
+        [("record", "1"), ("record", "2")],
+    ),
+    (
+        {"array": {"primitive": "string"}},
+        {"valid": False, "rawValue": "not a list"},
+        InvalidValue("not a list"),
+    ),
+    (
+        {"union": {"int": {"primitive": "integer"}, "str": {"primitive": "string"}}},
+        {"tag": "str", "value": _valid("x")},
+        "x",
+    ),
+    ({"primitive": "string"}, {"valid": False, "rawValue": ""}, InvalidValue("")),
+]
+
+
+@pytest.mark.parametrize("registry_type,literal,expected", _cases)
+def test_to_python_literal(registry_type: RegistryType, literal: Any, expected: Any):
+    converted = to_python_literal_converter(registry_type)(literal)
+    assert _normalize(converted) == expected
+    assert _normalize(to_python_literal(literal, registry_type)) == expected
+
+
+def test_to_python_literal_enum():
+    converted = to_python_literal_converter(_enum_type)(_valid("b"))
+    assert converted.name == "b"
+    assert to_python_literal(_valid("b"), _enum_type) is converted
+
+
+@pytest.mark.parametrize(
+    "registry_type,literal",
+    [
+        ({"primitive": "string"}, _valid(1)),
+        ({"primitive": "integer"}, _valid("1")),
+        ({"primitive": "number"}, _valid("1.0")),
+        ({"primitive": "boolean"}, _valid("true")),
+        ({"primitive": "null"}, _valid(0)),
+        ({"primitive": "date"}, _valid(20230405)),
+        ({"primitive": "datetime"}, _valid(0)),
+        ({"primitive": "blob"}, _valid("latch:///a")),
+        ({"primitive": "link", "experimentId": "1"}, _valid({})),
+        (_enum_type, _valid("c")),
+        ({"primitive": "enum"}, _valid("a")),
+        ({"array": {"primitive": "integer"}}, _valid(1)),
+        ({"union": {"int": {"primitive": "integer"}}}, {"tag": "str", "value": 1}),
+        ({}, _valid(1)),
+    ],
+)
+def test_to_python_literal_invalid(registry_type: RegistryType, literal: Any):
+    with pytest.raises(RegistryTransformerException):
+        to_python_literal_converter(registry_type)(literal)
+
+    with pytest.raises(RegistryTransformerException):
+        to_python_literal(literal, registry_type)
+
+
+@pytest.mark.parametrize(
+    "registry_type,value,expected",
+    [
+        ({"primitive": "string"}, "1.0", _valid("1.0")),
+        ({"primitive": "integer"}, "3", _valid(3)),
+        ({"primitive": "integer"}, 3.0, _valid(3)),
+        ({"primitive": "number"}, "0.5", _valid(0.5)),
+        ({"primitive": "boolean"}, True, _valid(True)),
+        ({"primitive": "boolean"}, "TRUE", _valid(True)),
+        ({"primitive": "boolean"}, "false", _valid(False)),
+        ({"primitive": "date"}, "2023-04-05", _valid("2023-04-05")),
+        ({"primitive": "link", "experimentId": "1"}, 12.0, _valid({"sampleId": "12"})),
+        ({"array": {"primitive": "integer"}}, "[1, 2]", [_valid(1), _valid(2)]),
+    ],
+)
+def test_to_registry_literal_converter(
+    registry_type: RegistryType, value: Any, expected: Any
+):
+    assert to_registry_literal_converter(registry_type)(value) == expected
+
+
+@pytest.mark.parametrize(
+    "registry_type,value",
+    [
+        ({"primitive": "string"}, 1.0),
+        ({"primitive": "string"}, 1),
+        ({"primitive": "string"}, True),
+        ({"primitive": "integer"}, 1.5),
+        ({"primitive": "integer"}, True),
+        ({"primitive": "boolean"}, "yes"),
+        ({"primitive": "boolean"}, "1"),
+        ({"primitive": "boolean"}, 1),
+        ({"primitive": "number"}, "abc"),
+        (_enum_type, 1),
+        (_enum_type, "c"),
+    ],
+)
+def test_to_registry_literal_converter_invalid(registry_type: RegistryType, value: Any):
+    with pytest.raises(RegistryTransformerException):
+        to_registry_literal_converter(registry_type)(value)
@@ -0,0 +1,270 @@
+import os
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+import latch_cli.services.sync as sync_mod
+import latch_cli.services.sync_state as state_mod
+from latch.ldata._transfer.progress import Progress
+from latch_cli.services.sync import _DirJob, _is_unchanged, _sync_and_upload, _SyncPlan
+from latch_cli.services.sync_state import FileState, SyncManifest
+
+
+@pytest.fixture
+def manifest(tmp_path: Path):
+    with SyncManifest(tmp_path / "state.sqlite") as res:
+        yield res
+
+
+def _write(p: Path, data: str = "data") -> os.stat_result:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(data)
+    return os.stat(p)
+
+
+def test_uploads_start_while_directories_are_visited(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    first_upload = threading.Event()
+    a_stat = _write(tmp_path / "a")
+    b_stat = _write(tmp_path / "b")
+
+    def fake_sync_dir(job: _DirJob, *, delete: bool, plan: _SyncPlan):
+        if job.level == 0:
+            plan.upload(tmp_path / "a", a_stat, "latch:///dest/a")
+            return [_DirJob("latch:///dest/sub", 1)]
+
+        # the uploader must have received the first file before the rest of
+        # the tree is visited
+        assert first_upload.wait(5)
+        plan.upload(tmp_path / "b", b_stat, "latch:///dest/sub/b")
+        return []
+
+    received: List[str] = []
+
+    def fake_upload_all(uploads, **kwargs):
+        for job in uploads:
+            received.append(job.dest)
+            first_upload.set()
+
+        return {}
+
+    monkeypatch.setattr(sync_mod, "_sync_dir", fake_sync_dir)
+    monkeypatch.setattr(sync_mod, "upload_all", fake_upload_all)
+
+    errors = _sync_and_upload(
+        [_DirJob("latch:///dest", 0, srcs={})],
+        delete=False,
+        manifest=None,
+        cores=1,
+        progress=Progress.none,
+    )
+
+    assert errors == {}
+    assert received == ["latch:///dest/a", "latch:///dest/sub/b"]
+
+
+def test_traversal_errors_are_raised(monkeypatch: pytest.MonkeyPatch):
+    def fake_sync_dir(job: _DirJob, *, delete: bool, plan: _SyncPlan):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(sync_mod, "_sync_dir", fake_sync_dir)
+    monkeypatch.setattr(
+        sync_mod, "upload_all", lambda uploads, **kwargs: {x.src: None for x in uploads}
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _sync_and_upload(
+            [_DirJob("latch:///dest", 0, srcs={})],
+            delete=False,
+            manifest=None,
+            cores=1,
+            progress=Progress.none,
+        )
+
+
+def test_record_does_not_query(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    def fail(*args, **kwargs):
+        raise AssertionError("must not be called")
+
+    monkeypatch.setattr(sync_mod, "execute", fail)
+    monkeypatch.setattr(state_mod, "execute", fail)
+
+    d = tmp_path / "src"
+    ok_stat = _write(d / "ok")
+    failed_stat = _write(d / "failed")
+    changed_stat = _write(d / "changed")
+
+    plan = _SyncPlan(manifest)
+    plan.upload(d / "ok", ok_stat, "latch:///dest/ok")
+    plan.upload(d / "failed", failed_stat, "latch:///dest/failed")
+    plan.upload(d / "changed", changed_stat, "latch:///dest/changed")
+    plan.dir_done(d, "latch:///dest", os.stat(d), [d / "ok", d / "changed"])
+
+    os.utime(d / "changed", ns=(0, 0))
+
+    errors: Dict[Path, BaseException] = {d / "failed": RuntimeError()}
+    plan.record(errors, {d / "ok": "v1", d / "changed": "v2"})
+
+    files = manifest.files_in(d)
+    assert list(files.keys()) == ["ok"]
+    assert files["ok"].matches("latch:///dest/ok", ok_stat)
+    assert files["ok"].node_id is None
+    assert files["ok"].version_id == "v1"
+    assert manifest.dir_matches(d, "latch:///dest", os.stat(d))
+
+
+def test_record_skips_dirs_with_failed_uploads(tmp_path: Path, manifest: SyncManifest):
+    d = tmp_path / "src"
+    p_stat = _write(d / "x")
+
+    plan = _SyncPlan(manifest)
+    plan.upload(d / "x", p_stat, "latch:///dest/x")
+    plan.dir_done(d, "latch:///dest", os.stat(d), [d / "x"])
+    plan.record({d / "x": RuntimeError()}, {})
+
+    assert manifest.files_in(d) == {}
+    assert not manifest.dir_matches(d, "latch:///dest", os.stat(d))
+
+
+def _live_nodes(monkeypatch: pytest.MonkeyPatch, live: Dict[str, str]) -> List[str]:
+    queried: List[str] = []
+
+    def execute(document, variables):
+        queried.extend(variables["ids"])
+        return {
+            "ldataNodes": {
+                "nodes": [
+                    {
+                        "id": x,
+                        "finalLinkTarget": {"ldataObjectMeta": {"versionId": live[x]}},
+                    }
+                    for x in variables["ids"]
+                    if x in live
+                ]
+            }
+        }
+
+    monkeypatch.setattr(state_mod, "execute", execute)
+    return queried
+
+
+def _synced_dir(tmp_path: Path, manifest: SyncManifest):
+    d = tmp_path / "src"
+    srcs = {}
+    for i, name in enumerate(["a", "b"]):
+        p = d / name
+        p_stat = _write(p, name)
+        srcs[name] = (p, p_stat)
+        manifest.put_files([
+            FileState(
+                path=str(p),
+                dest=f"latch:///dest/{name}",
+                size=p_stat.st_size,
+                mtime_ns=p_stat.st_mtime_ns,
+                inode=p_stat.st_ino,
+                node_id=str(i),
+                version_id="v",
+            )
+        ])
+
+    d_stat = os.stat(d)
+    manifest.put_dir(d, "latch:///dest", d_stat)
+    return _DirJob("latch:///dest", 1, src_dir=d, src_stat=d_stat), srcs
+
+
+def test_is_unchanged(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    queried = _live_nodes(monkeypatch, {"0": "v", "1": "v"})
+
+    job, srcs = _synced_dir(tmp_path, manifest)
+    assert job.src_dir is not None
+
+    assert _is_unchanged(job, srcs, manifest.files_in(job.src_dir), manifest)
+    assert sorted(queried) == ["0", "1"]
+
+
+def test_is_unchanged_remote_changed(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    _live_nodes(monkeypatch, {"0": "v", "1": "new"})
+
+    job, srcs = _synced_dir(tmp_path, manifest)
+    assert job.src_dir is not None
+
+    assert not _is_unchanged(job, srcs, manifest.files_in(job.src_dir), manifest)
+    assert list(manifest.files_in(job.src_dir).keys()) == ["a"]
+
+
+def test_is_unchanged_local_changes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    _live_nodes(monkeypatch, {"0": "v", "1": "v"})
+
+    job, srcs = _synced_dir(tmp_path, manifest)
+    assert job.src_dir is not None
+    known = manifest.files_in(job.src_dir)
+
+    # touched files are compared with the destination again
+    p, _ = srcs["a"]
+    os.utime(p, ns=(0, 0))
+    srcs["a"] = (p, os.stat(p))
+    assert not _is_unchanged(job, srcs, known, manifest)
+
+    # and neither are new files
+    srcs["new"] = (job.src_dir / "new", _write(job.src_dir / "new"))
+    assert not _is_unchanged(job, srcs, manifest.files_in(job.src_dir), manifest)
+
+
+def test_is_unchanged_directory_changed(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    queried = _live_nodes(monkeypatch, {"0": "v", "1": "v"})
+
+    job, srcs = _synced_dir(tmp_path, manifest)
+    assert job.src_dir is not None
+
+    moved = replace(job, dest="latch:///elsewhere")
+    assert not _is_unchanged(moved, srcs, manifest.files_in(job.src_dir), manifest)
+    assert queried == []
+
+
+def test_upload_all_reuses_given_executor(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    def fail(*args, **kwargs):
+        raise AssertionError("must not be called")
+
+    monkeypatch.setattr(sync_mod, "ProcessPoolExecutor", fail)
+    monkeypatch.setattr(sync_mod, "TransferStateManager", fail)
+
+    used = []
+
+    def upload_jobs(jobs, exec, man, **kwargs):
+        used.append((list(jobs), exec, man))
+        return {}
+
+    monkeypatch.setattr(sync_mod._upl, "upload_jobs", upload_jobs)
+    monkeypatch.setattr(sync_mod._upl, "get_ingress_source", lambda: None)
+
+    executor, man = object(), object()
+    job = sync_mod._upl.UploadJob(tmp_path / "a", "latch:///a")
+    for _ in range(2):
+        assert (
+            sync_mod.upload_all(
+                [job],
+                cores=1,
+                progress=Progress.none,
+                executor=executor,  # type: ignore
+                man=man,  # type: ignore
+            )
+            == {}
+        )
+
+    assert used == [([job], executor, man)] * 2
@@ -0,0 +1,205 @@
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+import latch_cli.services.sync_download as download_mod
+from latch_cli.services.sync_download import (
+    _compare,
+    _DownloadJob,
+    _RemoteDirJob,
+    _RemoteFile,
+    _sync_remote_dir,
+)
+
+
+def _write(p: Path, data: str = "data") -> os.stat_result:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(data)
+    return os.stat(p)
+
+
+def _mtime(p_stat: os.stat_result) -> datetime:
+    return datetime.fromtimestamp(p_stat.st_mtime).astimezone()
+
+
+@pytest.fixture
+def local_version(monkeypatch: pytest.MonkeyPatch) -> Dict[Path, str]:
+    versions: Dict[Path, str] = {}
+    monkeypatch.setattr(download_mod, "_local_version", versions.get)
+    return versions
+
+
+def test_compare_version_ids(tmp_path: Path, local_version: Dict[Path, str]):
+    p = tmp_path / "x"
+    p_stat = _write(p)
+    local_version[p] = "v1"
+
+    # matching versions win over differing sizes and times
+    assert _compare(p, p_stat, _RemoteFile(100, "v1", None)) == (False, "unmodified")
+    assert _compare(p, p_stat, _RemoteFile(p_stat.st_size, "v2", _mtime(p_stat))) == (
+        True,
+        "updated",
+    )
+
+
+def test_compare_without_version(tmp_path: Path, local_version: Dict[Path, str]):
+    p = tmp_path / "x"
+    p_stat = _write(p)
+    size = p_stat.st_size
+    mtime = _mtime(p_stat)
+
+    assert _compare(p, p_stat, _RemoteFile(size + 1, "v1", mtime)) == (True, "updated")
+    assert _compare(p, p_stat, _RemoteFile(size, "v1", None)) == (True, "updated")
+    assert _compare(p, p_stat, _RemoteFile(size, None, mtime)) == (False, "unmodified")
+    assert _compare(p, p_stat, _RemoteFile(None, None, mtime)) == (False, "unmodified")
+    assert _compare(
+        p, p_stat, _RemoteFile(size, None, mtime - timedelta(seconds=1))
+    ) == (False, "newer")
+    assert _compare(
+        p, p_stat, _RemoteFile(size, None, mtime + timedelta(seconds=1))
+    ) == (True, "updated")
+
+
+def _remote_node(
+    name: str,
+    type: str = "OBJ",
+    *,
+    size: Optional[int] = None,
+    version_id: Optional[str] = None,
+    time: Optional[str] = None,
+) -> Dict:
+    return {
+        "name": name,
+        "finalLinkTarget": {
+            "type": type,
+            "ldataObjectMeta": {"contentSize": size, "versionId": version_id},
+            "ldataNodeEvents": {"nodes": [] if time is None else [{"time": time}]},
+        },
+    }
+
+
+def _remote_dir(monkeypatch: pytest.MonkeyPatch, children: List[Dict]):
+    def list_remote(src: str) -> Dict:
+        return {
+            "type": "DIR",
+            "ldataObjectMeta": None,
+            "ldataNodeEvents": {"nodes": []},
+            "childLdataTreeEdges": {"nodes": [{"child": x} for x in children]},
+        }
+
+    monkeypatch.setattr(download_mod, "_list_remote", list_remote)
+
+
+def test_sync_remote_dir(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, local_version: Dict[Path, str]
+):
+    dest = tmp_path / "dest"
+    _write(dest / "same")
+    _write(dest / "changed")
+    _write(dest / "extra")
+    _write(dest / "x.latch-partial")
+    local_version[dest / "same"] = "v1"
+    local_version[dest / "changed"] = "v1"
+
+    _remote_dir(
+        monkeypatch,
+        [
+            _remote_node("same", version_id="v1"),
+            _remote_node("changed", version_id="v2"),
+            _remote_node("new", size=1, time="2023-04-05T06:07:08+00:00"),
+            _remote_node("sub", "DIR"),
+        ],
+    )
+
+    downloads: List[_DownloadJob] = []
+    children = _sync_remote_dir(
+        _RemoteDirJob("latch:///src", dest, 1), delete=True, downloads=downloads
+    )
+
+    assert children == [_RemoteDirJob("latch:///src/sub", dest / "sub", 2)]
+    assert [(x.src, x.dest) for x in downloads] == [
+        ("latch:///src/changed", dest / "changed"),
+        ("latch:///src/new", dest / "new"),
+    ]
+    # partial downloads are neither compared nor removed
+    assert sorted(x.name for x in dest.iterdir()) == [
+        "changed",
+        "same",
+        "x.latch-partial",
+    ]
+
+
+def test_sync_remote_dir_top_level_is_not_pruned(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, local_version: Dict[Path, str]
+):
+    dest = tmp_path / "dest"
+    _write(dest / "extra")
+    _remote_dir(monkeypatch, [])
+
+    downloads: List[_DownloadJob] = []
+    _sync_remote_dir(
+        _RemoteDirJob("latch:///src", dest, 0), delete=True, downloads=downloads
+    )
+
+    assert downloads == []
+    assert (dest / "extra").exists()
+
+
+def test_sync_remote_dir_type_conflicts(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, local_version: Dict[Path, str]
+):
+    dest = tmp_path / "dest"
+    _write(dest / "dir_remotely")
+    (dest / "file_remotely").mkdir()
+    _remote_dir(
+        monkeypatch,
+        [_remote_node("dir_remotely", "DIR"), _remote_node("file_remotely")],
+    )
+
+    downloads: List[_DownloadJob] = []
+    children = _sync_remote_dir(
+        _RemoteDirJob("latch:///src", dest, 1), delete=True, downloads=downloads
+    )
+
+    assert children == []
+    assert downloads == []
+
+
+def test_sync_download_lists_each_directory_once(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, local_version: Dict[Path, str]
+):
+    tree = {
+        "latch://1.account/src": [_remote_node("sub", "DIR")],
+        "latch://1.account/src/sub": [_remote_node("x", size=1)],
+    }
+    listed: List[str] = []
+
+    def list_remote(src: str) -> Dict:
+        listed.append(src)
+        return {
+            "type": "DIR",
+            "ldataObjectMeta": None,
+            "ldataNodeEvents": {"nodes": []},
+            "childLdataTreeEdges": {"nodes": [{"child": x} for x in tree[src]]},
+        }
+
+    downloaded: List[Path] = []
+
+    def download_jobs(jobs, **kwargs):
+        downloaded.extend(x.dest for x in jobs)
+        return {}
+
+    monkeypatch.setattr(download_mod, "_list_remote", list_remote)
+    monkeypatch.setattr(download_mod, "download_jobs", download_jobs)
+    monkeypatch.setattr(download_mod, "_finish_download", lambda job: None)
+
+    dest = tmp_path / "dest"
+    download_mod.sync_download(
+        ["latch://1.account/src"], str(dest), delete=False, cores=1
+    )
+
+    assert sorted(listed) == ["latch://1.account/src", "latch://1.account/src/sub"]
+    assert downloaded == [dest / "src" / "sub" / "x"]
@@ -0,0 +1,192 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+import latch_cli.services.sync_state as state_mod
+from latch_cli.services.sync_state import FileState, SyncManifest
+
+
+@pytest.fixture
+def manifest(tmp_path: Path):
+    with SyncManifest(tmp_path / "state.sqlite") as res:
+        yield res
+
+
+def _state(
+    p: Path, *, node_id: Optional[str] = "1", version_id: Optional[str] = "v1"
+) -> FileState:
+    return FileState(
+        path=str(p),
+        dest=f"latch:///dest/{p.name}",
+        size=1,
+        mtime_ns=2,
+        inode=3,
+        node_id=node_id,
+        version_id=version_id,
+    )
+
+
+class _FakeNodes:
+    def __init__(
+        self, versions: Dict[str, Optional[str]], paths: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.versions = versions
+        self.paths = {} if paths is None else paths
+        self.calls: List[List[str]] = []
+        self.resolved: List[List[str]] = []
+
+    def __call__(self, document, variables: Dict[str, Any]):
+        if "argPaths" in variables:
+            self.resolved.append(variables["argPaths"])
+            return {
+                "fastLdataMultiResolvePath": [
+                    self.paths.get(x) for x in variables["argPaths"]
+                ]
+            }
+
+        self.calls.append(variables["ids"])
+        return {
+            "ldataNodes": {
+                "nodes": [
+                    {
+                        "id": id,
+                        "finalLinkTarget": {
+                            "ldataObjectMeta": (
+                                None
+                                if self.versions[id] is None
+                                else {"versionId": self.versions[id]}
+                            )
+                        },
+                    }
+                    for id in variables["ids"]
+                    if id in self.versions
+                ]
+            }
+        }
+
+
+def test_manifest_round_trip(tmp_path: Path, manifest: SyncManifest):
+    d = tmp_path / "src"
+    d.mkdir()
+    a = _state(d / "a")
+
+    manifest.put_files([a, _state(d / "b")])
+    manifest.put_dir(d, "latch:///dest", os.stat(d))
+
+    assert set(manifest.files_in(d).keys()) == {"a", "b"}
+    assert manifest.files_in(d)["a"] == a
+    assert manifest.dir_matches(d, "latch:///dest", os.stat(d))
+    assert not manifest.dir_matches(d, "latch:///other", os.stat(d))
+
+    manifest.forget_dir(d, keep={"a"})
+    assert list(manifest.files_in(d).keys()) == ["a"]
+    assert not manifest.dir_matches(d, "latch:///dest", os.stat(d))
+
+
+def test_verify_remote_only_queries_given_files(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    fake = _FakeNodes({"1": "v1", "2": "v1"})
+    monkeypatch.setattr(state_mod, "execute", fake)
+
+    visited = tmp_path / "visited"
+    other = tmp_path / "other"
+    files = [_state(visited / "a", node_id="1"), _state(visited / "b", node_id="2")]
+    manifest.put_files([*files, _state(other / "c", node_id="3")])
+
+    assert manifest.verify_remote(files, batch_size=1) == []
+    assert fake.calls == [["1"], ["2"]]
+
+
+def test_verify_remote_forgets_stale_files(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    monkeypatch.setattr(
+        state_mod, "execute", _FakeNodes({"1": "v1", "2": "new", "4": None})
+    )
+
+    d = tmp_path / "src"
+    d.mkdir()
+
+    unchanged = _state(d / "unchanged", node_id="1")
+    changed = _state(d / "changed", node_id="2", version_id="old")
+    removed = _state(d / "removed", node_id="3")
+    unknown = _state(d / "unknown", node_id=None)
+    unversioned = _state(d / "unversioned", node_id="4", version_id=None)
+
+    files = [unchanged, changed, removed, unknown, unversioned]
+    manifest.put_files(files)
+    manifest.put_dir(d, "latch:///dest", os.stat(d))
+
+    stale = manifest.verify_remote(files)
+
+    assert sorted(x.path for x in stale) == sorted(
+        str(x.path) for x in [changed, removed, unknown]
+    )
+    assert set(manifest.files_in(d).keys()) == {"unchanged", "unversioned"}
+    # the directory has to be compared with the destination again
+    assert not manifest.dir_matches(d, "latch:///dest", os.stat(d))
+
+
+def test_verify_remote_resolves_uploaded_files(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, manifest: SyncManifest
+):
+    fake = _FakeNodes(
+        {"5": "v1", "6": "v2", "7": "v9"},
+        {
+            "latch:///dest/uploaded": "5",
+            "latch:///dest/empty": "6",
+            "latch:///dest/overwritten": "7",
+        },
+    )
+    monkeypatch.setattr(state_mod, "execute", fake)
+
+    d = tmp_path / "src"
+    d.mkdir()
+
+    uploaded = _state(d / "uploaded", node_id=None)
+    empty = _state(d / "empty", node_id=None, version_id=None)
+    overwritten = _state(d / "overwritten", node_id=None)
+
+    files = [uploaded, empty, overwritten]
+    manifest.put_files(files)
+
+    stale = manifest.verify_remote(files, batch_size=2)
+
+    assert [x.path for x in stale] == [overwritten.path]
+    assert fake.resolved == [
+        ["latch:///dest/uploaded", "latch:///dest/empty"],
+        ["latch:///dest/overwritten"],
+    ]
+
+    # the nodes are recorded so the next run does not resolve them again
+    known = manifest.files_in(d)
+    assert set(known.keys()) == {"uploaded", "empty"}
+    assert (known["uploaded"].node_id, known["uploaded"].version_id) == ("5", "v1")
+    assert (known["empty"].node_id, known["empty"].version_id) == ("6", "v2")
+
+    fake.resolved.clear()
+    assert manifest.verify_remote(known.values()) == []
+    assert fake.resolved == []
+
+
+def test_outdated_manifest_is_discarded(tmp_path: Path):
+    path = tmp_path / "state.sqlite"
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("create table files (path text primary key, hash text)")
+        conn.execute("insert into files values ('x', 'abc')")
+    conn.close()
+
+    with SyncManifest(path) as manifest:
+        assert manifest.files_in(tmp_path) == {}
+
+        a = _state(tmp_path / "a")
+        manifest.put_files([a])
+
+    # the current version is kept
+    with SyncManifest(path) as manifest:
+        assert manifest.files_in(tmp_path) == {"a": a}
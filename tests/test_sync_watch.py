@@ -0,0 +1,156 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+from watchfiles import Change
+
+import latch_cli.services.sync_watch as watch_mod
+from latch_cli.services.sync_watch import _Watcher
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    res = [1000.0]
+    monkeypatch.setattr(watch_mod.time, "monotonic", lambda: res[0])
+    return res
+
+
+@pytest.fixture
+def src(tmp_path: Path) -> Path:
+    res = tmp_path / "data"
+    res.mkdir()
+    return res
+
+
+@pytest.fixture
+def watcher(src: Path) -> _Watcher:
+    return _Watcher({"data": (src, os.stat(src))}, "latch:///dest", settle=2)
+
+
+def _write(p: Path, data: str = "data") -> None:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(data)
+
+
+def test_add(tmp_path: Path, src: Path, watcher: _Watcher, now: List[float]):
+    _write(src / "a")
+    watcher.add(Change.added, str(src / "a"))
+    assert watcher.dirs == {src}
+    assert watcher.unsettled == {
+        src / "a": ((4, os.stat(src / "a").st_mtime_ns), now[0])
+    }
+
+    (src / "sub").mkdir()
+    watcher.add(Change.added, str(src / "sub"))
+    assert watcher.dirs == {src, src / "sub"}
+    assert src / "sub" not in watcher.unsettled
+
+    (src / "a").unlink()
+    watcher.add(Change.deleted, str(src / "a"))
+    assert watcher.unsettled == {}
+
+    # events outside the sources are ignored
+    _write(tmp_path / "other")
+    watcher.add(Change.added, str(tmp_path / "other"))
+    assert watcher.dirs == {src, src / "sub"}
+    assert watcher.unsettled == {}
+
+    assert watcher.top == set()
+    watcher.add(Change.modified, str(src))
+    assert watcher.top == {"data"}
+
+
+def test_check_settled(src: Path, watcher: _Watcher, now: List[float]):
+    _write(src / "a")
+    _write(src / "b")
+    watcher.add(Change.added, str(src / "a"))
+    watcher.add(Change.added, str(src / "b"))
+
+    now[0] += 1
+    watcher.check_settled()
+    assert set(watcher.unsettled) == {src / "a", src / "b"}
+
+    # writes restart the wait, removed files are dropped
+    _write(src / "a", "more data")
+    (src / "b").unlink()
+    watcher.check_settled()
+    assert set(watcher.unsettled) == {src / "a"}
+
+    now[0] += 1
+    watcher.check_settled()
+    assert set(watcher.unsettled) == {src / "a"}
+
+    now[0] += 1
+    watcher.check_settled()
+    assert watcher.unsettled == {}
+
+
+def test_take_ready(src: Path, watcher: _Watcher, now: List[float]):
+    _write(src / "sub" / "a")
+    watcher.add(Change.added, str(src / "sub" / "a"))
+
+    jobs, ready = watcher.take_ready()
+    assert jobs == []
+    assert ready == set()
+
+    now[0] += 2
+    watcher.check_settled()
+
+    jobs, ready = watcher.take_ready()
+    assert ready == {src / "sub"}
+    assert [(x.dest, x.level, x.src_dir) for x in jobs] == [
+        ("latch:///dest/data/sub", 2, src / "sub")
+    ]
+    assert watcher.dirs == set()
+
+
+def test_take_ready_waits_for_new_directories(
+    src: Path, watcher: _Watcher, now: List[float]
+):
+    # `run1` is new, so syncing `data` would follow it into the destination
+    (src / "run1").mkdir()
+    watcher.add(Change.added, str(src / "run1"))
+    _write(src / "run1" / "nested" / "a")
+    watcher.add(Change.added, str(src / "run1" / "nested"))
+    watcher.add(Change.added, str(src / "run1" / "nested" / "a"))
+    _write(src / "b")
+    watcher.add(Change.added, str(src / "b"))
+
+    now[0] += 2
+    _write(src / "run1" / "nested" / "a", "more data")
+    watcher.check_settled()
+    assert set(watcher.unsettled) == {src / "run1" / "nested" / "a"}
+
+    jobs, ready = watcher.take_ready()
+    assert jobs == []
+    assert ready == set()
+
+    now[0] += 2
+    watcher.check_settled()
+
+    jobs, ready = watcher.take_ready()
+    assert ready == {src, src / "run1", src / "run1" / "nested"}
+    # `data` visits its changed subdirectories itself
+    assert [(x.dest, x.src_dir) for x in jobs] == [("latch:///dest/data", src)]
+
+
+def test_take_ready_waits_for_new_sources(
+    src: Path, watcher: _Watcher, now: List[float]
+):
+    _write(src / "sub" / "a")
+    watcher.add(Change.added, str(src))
+    watcher.add(Change.added, str(src / "sub" / "a"))
+
+    jobs, _ = watcher.take_ready()
+    assert jobs == []
+    assert watcher.top == {"data"}
+
+    now[0] += 2
+    watcher.check_settled()
+
+    jobs, _ = watcher.take_ready()
+    assert watcher.top == set()
+    (top,) = [x for x in jobs if x.level == 0]
+    assert top.dest == "latch:///dest"
+    assert top.srcs is not None and list(top.srcs.keys()) == ["data"]
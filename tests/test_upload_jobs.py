@@ -0,0 +1,119 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pytest
+
+import latch.ldata._transfer.upload as upload_mod
+from latch.ldata._transfer.progress import ProgressBars
+from latch.ldata._transfer.upload import StartUploadReturnType, UploadJob, upload_jobs
+
+
+class _FakeManager:
+    """In-process stand-in for `TransferStateManager`."""
+
+    def dict(self):
+        return {}
+
+    def list(self):
+        return []
+
+    def Queue(self):
+        return queue.Queue()
+
+    def Throttle(self):
+        return None
+
+    def ProgressBars(self, num_task_bars: int, **kwargs) -> ProgressBars:
+        return ProgressBars(num_task_bars, show_total_progress=False)
+
+
+@pytest.fixture
+def fake_transfer(monkeypatch: pytest.MonkeyPatch):
+    started: List[Path] = []
+    uploaded: List[Path] = []
+    lock = threading.Lock()
+
+    def start_upload(src: Path, dest: str, *args) -> Optional[StartUploadReturnType]:
+        with lock:
+            started.append(src)
+
+        if src.name.startswith("fail"):
+            raise RuntimeError("start failed")
+        if src.name.startswith("empty"):
+            return None
+
+        return StartUploadReturnType(
+            upload_id="u",
+            urls=["a", "b"],
+            part_count=2,
+            part_size=1,
+            src=src,
+            dest=dest,
+        )
+
+    def upload_file_chunk(*, src: Path, part_index: int, **kwargs):
+        with lock:
+            uploaded.append(src)
+
+        return upload_mod.CompletedPart(src, "etag", part_index + 1)
+
+    def throttler(t, q):
+        while q.get() is not None:
+            pass
+
+    monkeypatch.setattr(upload_mod, "start_upload", start_upload)
+    monkeypatch.setattr(upload_mod, "upload_file_chunk", upload_file_chunk)
+    monkeypatch.setattr(upload_mod, "throttler", throttler)
+
+    return started, uploaded
+
+
+def _file(tmp_path: Path, name: str) -> Path:
+    res = tmp_path / name
+    res.write_text("xy")
+    return res
+
+
+def test_upload_jobs_consumes_generator_lazily(fake_transfer, tmp_path: Path):
+    started, uploaded = fake_transfer
+    first_started: List[bool] = []
+    paths = [_file(tmp_path, x) for x in "123"]
+
+    def jobs() -> Iterator[UploadJob]:
+        yield UploadJob(paths[0], "latch:///1")
+        yield UploadJob(paths[1], "latch:///2")
+
+        # the first files were handed to the executor before the generator
+        # finished
+        deadline = time.monotonic() + 5
+        while len(started) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        first_started.append(len(started) > 0)
+        yield UploadJob(paths[2], "latch:///3")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        errors = upload_jobs(jobs(), pool, _FakeManager(), num_bars=0)
+
+    assert errors == {}
+    assert first_started == [True]
+    assert sorted(uploaded) == sorted(paths + paths)
+
+
+def test_upload_jobs_reports_errors(fake_transfer, tmp_path: Path):
+    _, uploaded = fake_transfer
+
+    fail, empty, ok = (_file(tmp_path, x) for x in ["fail", "empty", "ok"])
+    jobs = [
+        UploadJob(fail, "latch:///fail"),
+        UploadJob(empty, "latch:///empty"),
+        UploadJob(ok, "latch:///ok"),
+    ]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        errors = upload_jobs(iter(jobs), pool, _FakeManager(), num_bars=2)
+
+    assert list(errors.keys()) == [fail]
+    assert uploaded == [ok, ok]